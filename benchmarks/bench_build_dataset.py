@@ -0,0 +1,76 @@
+"""
+Benchmarks the sliding-window step of build_dataset.
+
+Compares the original per-row ``iloc`` loop against the strided
+``lagged_windows`` engine on synthetic (return, sentiment) frames and checks
+that both produce identical output.
+
+Usage:
+    python -m benchmarks.bench_build_dataset
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline.features import lagged_windows
+
+
+def loop_windows(combined: pd.DataFrame, lookback: int, horizon: int):
+    """
+    Reference implementation: the window loop build_dataset used before vectorization.
+    """
+    X, y = [], []
+    for i in range(lookback, len(combined) - horizon):
+        window = combined.iloc[i - lookback:i]
+        X.append(window.values.flatten())
+        y.append(combined['return'].iloc[i + horizon])
+    return np.array(X), np.array(y)
+
+
+def make_combined(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2000-01-01", periods=n_rows, freq="min")
+    return pd.DataFrame({
+        "return": rng.normal(0, 0.01, n_rows),
+        "sentiment": rng.uniform(-1, 1, n_rows),
+    }, index=index)
+
+
+def run(sizes, lookback: int = 5, horizon: int = 1, loop_limit: int = 100_000):
+    print(f"{'rows':>10} {'loop (s)':>10} {'strided (s)':>12} {'view (s)':>10} {'speedup':>9}")
+    for n in sizes:
+        combined = make_combined(n)
+
+        start = time.perf_counter()
+        X_fast = lagged_windows(combined.to_numpy(), lookback, horizon)
+        y_fast = combined['return'].to_numpy()[lookback + horizon:]
+        t_fast = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lagged_windows(combined.to_numpy(), lookback, horizon, copy=False)
+        t_view = time.perf_counter() - start
+
+        if n <= loop_limit:
+            start = time.perf_counter()
+            X_loop, y_loop = loop_windows(combined, lookback, horizon)
+            t_loop = time.perf_counter() - start
+            assert np.array_equal(X_loop, X_fast) and np.array_equal(y_loop, y_fast)
+            loop_cell, speedup = f"{t_loop:10.3f}", f"{t_loop / t_fast:8.0f}x"
+        else:
+            # the loop takes minutes at this size; report the strided engine only
+            loop_cell, speedup = f"{'skipped':>10}", f"{'-':>9}"
+
+        print(f"{n:>10} {loop_cell} {t_fast:12.4f} {t_view:10.6f} {speedup}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookback", type=int, default=5)
+    parser.add_argument("--loop-limit", type=int, default=100_000,
+                        help="Largest size for which the slow loop is also timed.")
+    args = parser.parse_args()
+    run(args.sizes, args.lookback, loop_limit=args.loop_limit)
@@ -0,0 +1,143 @@
+"""
+Compares FinBERT inference backends against fp32.
+
+For each backend ('finbert', 'finbert-int8', 'finbert-onnx') this reports:
+- texts/sec over a holdout set of headlines
+- peak RSS and load time, each backend measured in a fresh process
+- accuracy drift against fp32 scores: max and mean absolute difference,
+  sign agreement and rank correlation
+
+The run fails (exit code 1) when a backend drifts past ``--max-drift``.
+
+Usage:
+    python -m benchmarks.bench_finbert_backends --tiny            # offline, random tiny BERT
+    python -m benchmarks.bench_finbert_backends --n 2000          # real FinBERT, headlines from the news store
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("finbert", "finbert-int8", "finbert-onnx")
+
+
+def _score_in_process(backend: str, texts: List[str], batch_size: int, tiny_path: Optional[str]) -> dict:
+    from pipeline.instrument import peak_rss_mb
+    from pipeline.sentiment import compute_finbert_sentiment, get_model, register_model
+
+    rss_start = peak_rss_mb()
+    start = time.perf_counter()
+    if tiny_path:
+        from benchmarks.synthetic import load_tiny_bert
+        register_model("finbert", load_tiny_bert(tiny_path))
+    get_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    news = pd.DataFrame({"title": texts})
+    compute_finbert_sentiment(news.head(batch_size), batch_size=batch_size, backend=backend)  # warm-up
+    scores = compute_finbert_sentiment(news, batch_size=batch_size, backend=backend)
+    return {
+        "backend": backend,
+        "scores": scores.to_numpy(),
+        "texts_per_sec": scores.attrs["throughput"],
+        "load_seconds": load_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_growth_mb": peak_rss_mb() - rss_start if rss_start is not None else None,
+    }
+
+
+def drift(reference: np.ndarray, scores: np.ndarray) -> dict:
+    """
+    Measures how far a backend's scores are from the fp32 reference.
+
+    Args:
+        reference (np.ndarray): fp32 scores.
+        scores (np.ndarray): Scores of the backend under test.
+
+    Returns:
+        dict: max_abs_diff, mean_abs_diff, sign_agreement and spearman.
+    """
+    from scipy.stats import spearmanr
+
+    diff = np.abs(scores - reference)
+    return {
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "sign_agreement": float(np.mean(np.sign(scores) == np.sign(reference))),
+        "spearman": float(spearmanr(reference, scores)[0]) if len(scores) > 1 else float("nan"),
+    }
+
+
+def compare_backends(texts: Sequence[str], backends: Sequence[str] = BACKENDS, batch_size: int = 32,
+                     tiny_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Scores the holdout texts with every backend, each in a fresh process.
+
+    Args:
+        texts (Sequence[str]): Holdout headlines.
+        backends (Sequence[str]): Backends to compare; 'finbert' is always
+            included as the reference.
+        batch_size (int): Headlines per forward pass.
+        tiny_path (Optional[str]): Directory of a model from
+            ``synthetic.make_tiny_bert`` to use instead of the real FinBERT.
+
+    Returns:
+        pd.DataFrame: One row per backend with throughput, memory, load time
+        and drift against fp32.
+    """
+    backends = ["finbert"] + [b for b in backends if b != "finbert"]
+    ctx = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in backends:
+        with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+            rows.append(pool.submit(_score_in_process, backend, list(texts), batch_size, tiny_path).result())
+
+    reference = rows[0]["scores"]
+    for row in rows:
+        row.update(drift(reference, row.pop("scores")))
+    return pd.DataFrame(rows).set_index("backend")
+
+
+def _holdout_texts(n: int, tiny: bool, seed: int = 0) -> List[str]:
+    if tiny:
+        from benchmarks.synthetic import generate_headlines
+        return generate_headlines(n, seed=seed)
+
+    from pipeline.news_store import load_news
+    titles = load_news(columns=["title"])["title"].dropna().astype(str)
+    titles = titles[titles.str.len() > 0].drop_duplicates()
+    if titles.empty:
+        sys.exit("No headlines in the news store; run main.py first or use --tiny.")
+    return titles.sample(min(n, len(titles)), random_state=seed).tolist()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiny", action="store_true", help="Use a random tiny BERT and synthetic headlines.")
+    parser.add_argument("--tiny-path", default="data/cache/tiny_bert")
+    parser.add_argument("--n", type=int, default=1000, help="Holdout size.")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--max-drift", type=float, default=0.05,
+                        help="Largest allowed mean absolute score difference from fp32.")
+    args = parser.parse_args()
+
+    tiny_path = None
+    if args.tiny:
+        from benchmarks.synthetic import make_tiny_bert
+        tiny_path = make_tiny_bert(args.tiny_path)
+
+    result = compare_backends(_holdout_texts(args.n, args.tiny), args.backends, args.batch_size, tiny_path)
+    with pd.option_context("display.width", 160, "display.float_format", "{:.4f}".format):
+        print(result)
+
+    failed = result.index[result["mean_abs_diff"] > args.max_drift].tolist()
+    if failed:
+        print(f"[Bench] Drift above {args.max_drift} for: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,204 @@
+"""
+Load generator for the prediction service (see pipeline.serving).
+
+Starts the service in a subprocess on a temporary Unix socket (or TCP port)
+with a linear model trained on synthetic windows, or targets a running
+service with ``--url``. Client processes then send closed-loop
+``POST /predict`` requests, each with the latest windows for
+``--tickers-per-request`` tickers, for ``--duration`` seconds after a short
+warm-up.
+
+Reports client-side p50/p90/p99 latency, requests/sec and predictions/sec,
+plus the service's own ``/stats`` (queueing + predict latency and mean batch
+size), so the effect of micro-batching shows up directly.
+
+Usage:
+    python -m benchmarks.bench_serving --clients 16 --tickers-per-request 50 --duration 10
+    python -m benchmarks.bench_serving --url http://127.0.0.1:8765 --clients 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+
+def synthetic_model(path: str, lookback: int = 5, horizon: int = 1, seed: int = 0):
+    """
+    Trains a linear model on random windows and saves it with its feature spec.
+    """
+    from pipeline.features import feature_spec
+    from pipeline.trainer import save_model, train_model
+
+    spec = feature_spec(lookback, horizon, ["sentiment"])
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 0.02, (5_000, len(spec["columns"])))
+    y = X @ rng.normal(0, 0.1, X.shape[1]) + rng.normal(0, 0.01, len(X))
+    model = train_model(X, y, model_type="linear")[0]
+    save_model(model, path, spec=dict(spec, model_type="linear"))
+
+
+def make_payloads(n: int, tickers_per_request: int, lookback: int, features: List[str], seed: int = 0) -> List[dict]:
+    """
+    Builds ``n`` request bodies with random windows for synthetic tickers.
+    """
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(n):
+        windows = {}
+        for t in rng.choice(10_000, tickers_per_request, replace=False):
+            windows[f"T{t:04d}"] = {f: rng.normal(0, 0.02, lookback).round(6).tolist() for f in features}
+        payloads.append({"windows": windows})
+    return payloads
+
+
+def run_client(address: str, payloads: List[dict], warmup: float, duration: float) -> List[float]:
+    """
+    Sends requests back to back on one connection.
+
+    Returns:
+        List[float]: Latencies in seconds of requests sent after the warm-up.
+    """
+    from pipeline.serving import connect
+
+    bodies = [json.dumps(p).encode() for p in payloads]
+    conn = connect(address)
+    latencies, k = [], 0
+    start = time.perf_counter()
+    measure_from, stop_at = start + warmup, start + warmup + duration
+    while True:
+        sent = time.perf_counter()
+        if sent >= stop_at:
+            break
+        conn.request("POST", "/predict", body=bodies[k % len(bodies)],
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"/predict returned {response.status}")
+        if sent >= measure_from:
+            latencies.append(time.perf_counter() - sent)
+        k += 1
+    conn.close()
+    return latencies
+
+
+def start_server(model_path: str, address: str, max_batch: int, max_wait: float) -> subprocess.Popen:
+    """
+    Launches ``pipeline.serving`` and waits until ``/health`` answers.
+    """
+    from pipeline.serving import connect, request
+
+    cmd = [sys.executable, "-m", "pipeline.serving", "--model", model_path,
+           "--max-batch", str(max_batch), "--max-wait", str(max_wait), "--stats-every", "0"]
+    if address.startswith("unix:"):
+        cmd += ["--unix", address[len("unix:"):]]
+    else:
+        host, _, port = address.replace("http://", "").partition(":")
+        cmd += ["--host", host, "--port", port]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen(cmd, cwd=root, stdout=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"service exited with code {proc.returncode}")
+        try:
+            request(connect(address, timeout=1), "GET", "/health")
+            return proc
+        except (OSError, RuntimeError):
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("service did not come up within 30s")
+
+
+def bench(address: str, clients: int, tickers_per_request: int, warmup: float, duration: float,
+          seed: int = 0) -> dict:
+    """
+    Runs the load against a live service and collects client and server numbers.
+    """
+    from pipeline.serving import connect, request
+
+    spec = request(connect(address), "GET", "/health")["spec"]
+    lookback, features = spec["lookback"], spec["features"]
+    payloads = [make_payloads(64, tickers_per_request, lookback, features, seed + c) for c in range(clients)]
+
+    with ProcessPoolExecutor(clients) as pool:
+        futures = [pool.submit(run_client, address, p, warmup, duration) for p in payloads]
+        time.sleep(warmup)
+        request(connect(address), "GET", "/stats?reset=1")
+        latencies = np.concatenate([f.result() for f in futures]) * 1000
+    server = request(connect(address), "GET", "/stats")
+
+    n = len(latencies)
+    return {
+        "clients": clients,
+        "tickers_per_request": tickers_per_request,
+        "seconds": duration,
+        "requests": n,
+        "requests_per_sec": n / duration,
+        "predictions_per_sec": n * tickers_per_request / duration,
+        "p50_ms": float(np.percentile(latencies, 50)) if n else None,
+        "p90_ms": float(np.percentile(latencies, 90)) if n else None,
+        "p99_ms": float(np.percentile(latencies, 99)) if n else None,
+        "max_ms": float(latencies.max()) if n else None,
+        "server": server,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default=None, help="Running service: 'http://host:port' or 'unix:/path'.")
+    parser.add_argument("--model", default=None, help="Model to serve. A synthetic one if omitted.")
+    parser.add_argument("--tcp", action="store_true", help="Serve on 127.0.0.1:--port instead of a Unix socket.")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--tickers-per-request", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the results as JSON.")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory(prefix="bench_serving_")
+    proc: Optional[subprocess.Popen] = None
+    address = args.url
+    try:
+        if address is None:
+            model_path = args.model
+            if model_path is None:
+                model_path = os.path.join(tmp.name, "model.pkl")
+                synthetic_model(model_path, seed=args.seed)
+            address = f"http://127.0.0.1:{args.port}" if args.tcp else f"unix:{os.path.join(tmp.name, 'serve.sock')}"
+            proc = start_server(model_path, address, args.max_batch, args.max_wait)
+
+        result = bench(address, args.clients, args.tickers_per_request, args.warmup, args.duration, args.seed)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+        tmp.cleanup()
+
+    server = result["server"]
+    print(f"[Bench] {result['clients']} clients x {result['tickers_per_request']} tickers/request "
+          f"over {address}")
+    print(f"[Bench] client  {result['requests_per_sec']:>10,.0f} req/s {result['predictions_per_sec']:>12,.0f} "
+          f"predictions/s  p50 {result['p50_ms']:.2f} ms  p90 {result['p90_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms")
+    print(f"[Bench] server  {server['requests_per_sec']:>10,.0f} req/s {server['predictions_per_sec']:>12,.0f} "
+          f"predictions/s  p50 {server['p50_ms']:.2f} ms  p99 {server['p99_ms']:.2f} ms  "
+          f"{server['mean_batch_requests']:.1f} requests/batch")
+    if args.output:
+        if os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"[Bench] Results written to {args.output}")
@@ -0,0 +1,114 @@
+"""
+Checks and times the VADER scoring modes.
+
+Scores a regression corpus with:
+- 'row': ``polarity_scores`` row by row (the reference)
+- 'fast': the vectorized lexicon path in ``pipeline.vader_fast``
+- 'parallel': chunks over a process pool, one analyzer per worker
+- 'parallel-fast': both
+
+and reports texts/sec per mode. Every mode must reproduce the reference
+scores exactly; the run fails (exit code 1) on any mismatch.
+
+The corpus mixes synthetic headlines with randomized texts built from the
+VADER lexicon and the words its rules react to (boosters, negations, "but",
+"least", "kind of", idioms), in random case and with punctuation attached.
+
+Usage:
+    python -m benchmarks.bench_vader --n 100000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+MODES = ("row", "fast", "parallel", "parallel-fast")
+# words VADER's context rules look at, besides the lexicon
+RULE_WORDS = ["never", "so", "this", "least", "at", "very", "kind", "of", "but", "just", "enough", "sort",
+              "the", "shit", "bomb", "bad", "ass", "yeah", "right", "cut", "mustard", "kiss", "death",
+              "hand", "to", "mouth", ":)", ":(", "<3", "!!", "?", "I", "a"]
+AFFIXES = [".", "!", "?", ",", ";", ":", "-", "'", '"', "!!", "!!!", "??", "???", "?!?", "!?!", "?!", "''", "#", "$"]
+
+
+def regression_corpus(n: int, seed: int = 0) -> List[str]:
+    """
+    Builds texts exercising every VADER rule, plus synthetic headlines.
+
+    Args:
+        n (int): Number of randomized texts; as many headlines are added.
+        seed (int): Random seed.
+
+    Returns:
+        List[str]: Texts, including empty and punctuation-only ones.
+    """
+    from benchmarks.synthetic import generate_headlines
+    from pipeline.sentiment import get_model
+
+    constants = get_model("vader").constants
+    rng = np.random.default_rng(seed)
+    lexicon = np.asarray(sorted(get_model("vader").lexicon), dtype=object)
+    rules = np.asarray(sorted(constants.NEGATE) + sorted(constants.BOOSTER_DICT) + RULE_WORDS, dtype=object)
+    affixes = np.asarray(AFFIXES, dtype=object)
+
+    lengths = rng.integers(0, 26, n)
+    words = np.where(rng.random(lengths.sum()) < 0.5,
+                     lexicon[rng.integers(0, len(lexicon), lengths.sum())],
+                     rules[rng.integers(0, len(rules), lengths.sum())])
+    case = rng.random(len(words))
+    words = np.where(case < 0.1, [w.upper() for w in words],
+                     np.where(case < 0.15, [w.capitalize() for w in words], words))
+    affix = rng.random(len(words))
+    pre, post = affixes[rng.integers(0, len(affixes), len(words))], affixes[rng.integers(0, len(affixes), len(words))]
+    words = np.where(affix < 0.15, words + post,
+                     np.where(affix < 0.25, pre + words, np.where(affix < 0.27, pre + words + post, words)))
+
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    texts = [" ".join(words[bounds[k]:bounds[k + 1]]) for k in range(n)]
+    return texts + generate_headlines(n, seed=seed) + ["", "   ", "!!!", "not bad at all", "kind of good",
+                                                       "at least good", "never so good", "good but BAD!!"]
+
+
+def score(texts: List[str], mode: str, workers: int) -> pd.Series:
+    from pipeline.sentiment import compute_vader_sentiment
+
+    news = pd.DataFrame({"title": texts})
+    parallel = mode.startswith("parallel")
+    return compute_vader_sentiment(
+        news,
+        n_jobs=workers if parallel else 1,
+        chunk_size=max(1, -(-len(texts) // (4 * workers))) if parallel else len(texts) or 1,
+        fast=mode.endswith("fast")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=50_000, help="Randomized texts in the corpus.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for parallel modes.")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    texts = regression_corpus(args.n, args.seed)
+    modes = ["row"] + [m for m in args.modes if m != "row"]
+
+    reference, failed = None, []
+    for mode in modes:
+        start = time.perf_counter()
+        scores = score(texts, mode, workers).to_numpy()
+        elapsed = time.perf_counter() - start
+        mismatches = 0 if reference is None else int(np.sum(scores != reference))
+        reference = scores if reference is None else reference
+        print(f"[Bench] {mode:<14}{elapsed:>8.2f}s {len(texts) / elapsed:>12,.0f} texts/s  {mismatches} mismatches")
+        if mismatches:
+            failed.append(mode)
+
+    if failed:
+        print(f"[Bench] Scores differ from polarity_scores for: {', '.join(failed)}")
+        sys.exit(1)
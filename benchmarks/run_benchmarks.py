@@ -0,0 +1,391 @@
+"""
+Benchmark suite with machine-readable baselines.
+
+Times the pipeline's main steps on synthetic data (see benchmarks.synthetic):
+- news_compact / news_load: raw JSON dumps -> Parquet store -> DataFrame,
+  the local part of ``fetch_news_data``
+- entity_index / entity_load: tagging the store into the ticker -> article
+  index, and reading one ticker's mentions through it
+- vader / vader_fast / vader_parallel: VADER headline scoring, row by row,
+  vectorized, and chunked over a process pool
+- finbert / finbert_int8 / finbert_onnx: headline scoring; FinBERT backends
+  use a tiny randomly initialized BERT so no download is needed
+- finbert_documents: whole-article scoring in overlapping windows packed
+  across documents
+- build_dataset / build_panel_dataset: feature windows
+- feature_store_load: mapping a stored panel feature matrix instead of building it
+- train_model / evaluate_model / evaluate_panel: fitting and metrics
+
+Each benchmark runs ``--repeat`` times after setup; the median and minimum
+wall time and items/sec are reported. Results are saved as JSON and can be
+compared against a stored baseline, failing when any benchmark is slower
+than the baseline by more than ``--tolerance``.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scale small --save-baseline main
+    python -m benchmarks.run_benchmarks --scale small --compare main
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks import synthetic
+
+BASELINE_DIR = "benchmarks/baselines"
+RESULTS_PATH = "benchmarks/results/latest.json"
+
+SCALES = {
+    "small": {"tickers": 10, "days": 60, "per_day": 5, "texts": 2_000, "finbert_texts": 256,
+              "price_days": 2_000, "panel_tickers": 50},
+    "medium": {"tickers": 50, "days": 250, "per_day": 10, "texts": 50_000, "finbert_texts": 2_000,
+               "price_days": 5_000, "panel_tickers": 200},
+    "large": {"tickers": 200, "days": 500, "per_day": 20, "texts": 500_000, "finbert_texts": 10_000,
+              "price_days": 10_000, "panel_tickers": 500},
+}
+
+# name -> setup(params, workdir) returning (timed callable, item count, unit)
+BENCHMARKS: Dict[str, Callable[[dict, str], Tuple[Callable[[], object], int, str]]] = {}
+
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def _raw_corpus(params: dict, workdir: str) -> Tuple[str, int]:
+    raw_root = os.path.join(workdir, "raw")
+    count_file = os.path.join(workdir, "raw_count")
+    if not os.path.exists(count_file):
+        tickers = synthetic.make_tickers(params["tickers"])
+        n = synthetic.write_raw_corpus(raw_root, tickers, params["days"], params["per_day"])
+        with open(count_file, "w") as f:
+            f.write(str(n))
+    with open(count_file) as f:
+        return raw_root, int(f.read())
+
+
+@benchmark("news_compact")
+def bench_news_compact(params, workdir):
+    from pipeline.news_store import compact_raw_news
+
+    raw_root, n_items = _raw_corpus(params, workdir)
+    store_root = os.path.join(workdir, "store_compact")
+
+    def run():
+        shutil.rmtree(store_root, ignore_errors=True)
+        compact_raw_news(raw_root, store_root)
+    return run, n_items, "articles"
+
+
+@benchmark("news_load")
+def bench_news_load(params, workdir):
+    from pipeline.news_store import compact_raw_news, load_news
+
+    raw_root, n_items = _raw_corpus(params, workdir)
+    store_root = os.path.join(workdir, "store_load")
+    if not os.path.isdir(store_root):
+        compact_raw_news(raw_root, store_root)
+    return lambda: load_news(store_root=store_root), n_items, "rows"
+
+
+@benchmark("entity_index")
+def bench_entity_index(params, workdir):
+    from pipeline.entities import update_entity_index
+    from pipeline.news_store import compact_raw_news
+
+    raw_root, n_items = _raw_corpus(params, workdir)
+    store_root = os.path.join(workdir, "store_load")
+    index_root = os.path.join(workdir, "entities")
+    if not os.path.isdir(store_root):
+        compact_raw_news(raw_root, store_root)
+    entities = {t: [] for t in synthetic.make_tickers(params["tickers"])}
+
+    def run():
+        shutil.rmtree(index_root, ignore_errors=True)
+        update_entity_index(entities, store_root, index_root)
+    return run, n_items, "articles"
+
+
+@benchmark("entity_load")
+def bench_entity_load(params, workdir):
+    from pipeline.entities import load_mentions, update_entity_index
+    from pipeline.news_store import compact_raw_news
+
+    raw_root, _ = _raw_corpus(params, workdir)
+    store_root = os.path.join(workdir, "store_load")
+    index_root = os.path.join(workdir, "entities_load")
+    if not os.path.isdir(store_root):
+        compact_raw_news(raw_root, store_root)
+    tickers = synthetic.make_tickers(params["tickers"])
+    update_entity_index({t: [] for t in tickers}, store_root, index_root)
+    n_rows = len(load_mentions(tickers[:1], news_root=store_root, index_root=index_root))
+    return lambda: load_mentions(tickers[:1], news_root=store_root, index_root=index_root), n_rows, "rows"
+
+
+def _vader_benchmark(**options):
+    def setup(params, workdir):
+        from pipeline.sentiment import compute_vader_sentiment, get_model
+
+        get_model("vader")
+        news = synthetic.generate_news_frame(params["texts"], synthetic.make_tickers(20))
+        return lambda: compute_vader_sentiment(news, **options), len(news), "texts"
+    return setup
+
+
+BENCHMARKS["vader"] = _vader_benchmark()
+BENCHMARKS["vader_fast"] = _vader_benchmark(fast=True)
+BENCHMARKS["vader_parallel"] = _vader_benchmark(n_jobs=None, chunk_size=5_000)
+
+
+def _finbert_benchmark(backend: str):
+    def setup(params, workdir):
+        from pipeline import sentiment
+
+        path = synthetic.make_tiny_bert(os.path.join(workdir, "tiny_bert"))
+        sentiment.register_model("finbert", synthetic.load_tiny_bert(path))
+        sentiment.ONNX_DIR = os.path.join(workdir, "onnx")
+        sentiment.get_model(backend)
+        news = synthetic.generate_news_frame(params["finbert_texts"], synthetic.make_tickers(20))
+        return lambda: sentiment.compute_finbert_sentiment(news, backend=backend), len(news), "texts"
+    return setup
+
+
+for _backend in ("finbert", "finbert-int8", "finbert-onnx"):
+    BENCHMARKS[_backend.replace("-", "_")] = _finbert_benchmark(_backend)
+
+
+@benchmark("finbert_documents")
+def bench_finbert_documents(params, workdir):
+    from pipeline import sentiment
+
+    path = synthetic.make_tiny_bert(os.path.join(workdir, "tiny_bert"))
+    sentiment.register_model("finbert", synthetic.load_tiny_bert(path))
+    n = max(params["finbert_texts"] // 4, 1)
+    news = synthetic.generate_news_frame(n, synthetic.make_tickers(20))
+    # article bodies of 5-80 headlines, so most documents span several windows
+    rng = np.random.default_rng(0)
+    body = synthetic.generate_headlines(80 * n, seed=2)
+    lengths = rng.integers(5, 81, n)
+    news["content"] = [" ".join(body[80 * i:80 * i + k]) for i, k in enumerate(lengths)]
+    return lambda: sentiment.compute_finbert_document_sentiment(news), n, "documents"
+
+
+def _daily_sentiment(prices, seed: int = 0):
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "date": np.repeat(prices.index, prices.shape[1]),
+        "ticker": np.tile(prices.columns, len(prices)),
+        "sentiment": rng.uniform(-1, 1, prices.size),
+    })
+
+
+@benchmark("build_dataset")
+def bench_build_dataset(params, workdir):
+    from pipeline.features import build_dataset
+
+    prices = synthetic.generate_prices(["AAA"], params["price_days"])
+    sentiment = _daily_sentiment(prices)[["date", "sentiment"]]
+    return lambda: build_dataset(prices["AAA"], sentiment.copy()), len(prices), "rows"
+
+
+@benchmark("build_panel_dataset")
+def bench_build_panel_dataset(params, workdir):
+    from pipeline.features import build_panel_dataset
+
+    prices = synthetic.generate_prices(synthetic.make_tickers(params["panel_tickers"]), params["days"])
+    sentiment = _daily_sentiment(prices)
+    return lambda: build_panel_dataset(prices, sentiment), prices.size, "rows"
+
+
+@benchmark("feature_store_load")
+def bench_feature_store_load(params, workdir):
+    from pipeline.feature_store import panel_features
+
+    prices = synthetic.generate_prices(synthetic.make_tickers(params["panel_tickers"]), params["days"])
+    features = panel_features(prices, _daily_sentiment(prices), store_root=os.path.join(workdir, "features"))
+
+    def run():
+        X, y, _, _ = features.load()
+        return float(X[-1].sum() + y[-1])
+    return run, len(features), "rows"
+
+
+def _panel(params):
+    from pipeline.features import build_panel_dataset
+
+    prices = synthetic.generate_prices(synthetic.make_tickers(params["panel_tickers"]), params["days"])
+    return build_panel_dataset(prices, _daily_sentiment(prices))
+
+
+@benchmark("train_model")
+def bench_train_model(params, workdir):
+    from pipeline.trainer import train_model
+
+    X, y, _, _ = _panel(params)
+    return lambda: train_model(X, y, model_type="linear"), len(y), "rows"
+
+
+@benchmark("evaluate_model")
+def bench_evaluate_model(params, workdir):
+    from pipeline.evaluator import evaluate_model
+
+    _, y, _, _ = _panel(params)
+    y_pred = y + np.random.default_rng(0).normal(0, y.std(), len(y))
+    return lambda: evaluate_model(None, None, y, y_pred), len(y), "rows"
+
+
+@benchmark("evaluate_panel")
+def bench_evaluate_panel(params, workdir):
+    from pipeline.evaluator import evaluate_panel
+
+    _, y, dates, tickers = _panel(params)
+    y_pred = y + np.random.default_rng(0).normal(0, y.std(), len(y))
+    return lambda: evaluate_panel(dates, tickers, y, y_pred), len(y), "rows"
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(scale: str = "small", names: Optional[List[str]] = None, repeat: int = 3,
+              workdir: Optional[str] = None) -> dict:
+    """
+    Runs the selected benchmarks and returns a results document.
+
+    Args:
+        scale (str): Key of ``SCALES``.
+        names (Optional[List[str]]): Benchmarks to run. All by default.
+        repeat (int): Timed runs per benchmark.
+        workdir (Optional[str]): Directory for generated data. Reusing it
+            across runs skips corpus generation. A temporary one by default.
+
+    Returns:
+        dict: {"meta": ..., "results": {name: {...}}}.
+    """
+    params = SCALES[scale]
+    names = names or list(BENCHMARKS)
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = {}
+    try:
+        for name in names:
+            try:
+                fn, items, unit = BENCHMARKS[name](params, workdir)
+            except ImportError as e:
+                print(f"[Bench] Skipping {name}: {e}")
+                continue
+            fn()  # warm-up: imports, lazy loads, caches
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+            median = statistics.median(times)
+            results[name] = {
+                "items": items,
+                "unit": unit,
+                "median_seconds": median,
+                "min_seconds": min(times),
+                "items_per_second": items / median if median > 0 else None,
+                "repeat": repeat,
+            }
+            print(f"[Bench] {name:<22}{median:>10.4f}s  {items / median:>14,.1f} {unit}/s")
+    finally:
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": _git_revision(),
+        "scale": scale,
+        "params": params,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def save_results(doc: dict, path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Compares median times against a baseline.
+
+    Args:
+        current (dict): Results document from ``run_suite``.
+        baseline (dict): Stored results document.
+        tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        List[str]: Names of benchmarks that regressed.
+    """
+    if current["meta"]["scale"] != baseline["meta"]["scale"]:
+        print(f"[Bench] Warning: comparing scale {current['meta']['scale']} "
+              f"against baseline scale {baseline['meta']['scale']}")
+
+    regressions = []
+    print(f"{'benchmark':<22}{'baseline s':>12}{'current s':>12}{'change':>9}")
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<22}{'-':>12}{cur['median_seconds']:>12.4f}{'new':>9}")
+            continue
+        ratio = cur["median_seconds"] / base["median_seconds"]
+        flag = "  REGRESSION" if ratio > 1 + tolerance else ""
+        print(f"{name:<22}{base['median_seconds']:>12.4f}{cur['median_seconds']:>12.4f}{ratio - 1:>+9.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workdir", help="Reusable directory for generated data.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write this run's results.")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Also store the results as a named baseline.")
+    parser.add_argument("--compare", metavar="NAME", help="Baseline to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown.")
+    args = parser.parse_args()
+
+    doc = run_suite(args.scale, args.only, args.repeat, args.workdir)
+    save_results(doc, args.output)
+    if args.save_baseline:
+        save_results(doc, os.path.join(BASELINE_DIR, f"{args.save_baseline}.json"))
+        print(f"[Bench] Saved baseline '{args.save_baseline}'")
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as f:
+            regressions = compare(doc, json.load(f), args.tolerance)
+        if regressions:
+            print(f"[Bench] {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
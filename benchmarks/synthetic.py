@@ -0,0 +1,300 @@
+"""
+Synthetic data generator for benchmarks.
+
+Includes:
+- Price panels for hundreds of tickers from a one-factor geometric random walk
+- Headlines built from a small financial vocabulary with positive and
+  negative cue words, so VADER and FinBERT do real work
+- A tiny randomly initialized BERT classifier saved in the FinBERT format,
+  so FinBERT code paths run offline without downloading the real model
+- Raw JSON dumps shaped like the NewsAPI, Reddit and Twitter fetchers' output
+  (``{raw_root}/{source}/{TICKER}_{YYYY-MM-DD}.json``), written in parallel so
+  corpora of millions of items are practical
+
+Usage:
+    python -m benchmarks.synthetic --out data/synthetic --tickers 200 --days 250 --per-day 20
+"""
+
+import argparse
+import json
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+SOURCES = ("newsapi", "reddit", "twitter")
+
+SUBJECTS = ["shares", "stock", "revenue", "earnings", "guidance", "margins", "sales", "outlook",
+            "profit", "demand", "dividend", "buyback", "forecast", "valuation"]
+POSITIVE = ["surge", "beat", "rally", "soar", "gain", "upgrade", "strong", "record", "boost", "jump"]
+NEGATIVE = ["plunge", "miss", "fall", "slump", "drop", "downgrade", "weak", "loss", "cut", "crash"]
+NEUTRAL = ["update", "report", "announce", "expect", "review", "plan", "hold", "trade", "meet", "note"]
+FILLER = ["after", "the", "quarter", "analysts", "said", "on", "amid", "market", "investors", "as",
+          "results", "this", "week", "in", "early", "trading", "from", "a", "new", "deal"]
+
+# every word the generator can emit, e.g. for building a tiny tokenizer vocab
+VOCABULARY = sorted(set(SUBJECTS + POSITIVE + NEGATIVE + NEUTRAL + FILLER))
+
+
+def make_tickers(n: int) -> List[str]:
+    """
+    Returns ``n`` distinct synthetic tickers ("AAA", "AAB", ...).
+    """
+    letters = string.ascii_uppercase
+    return ["".join(letters[(i // 26 ** k) % 26] for k in (2, 1, 0)) for i in range(n)]
+
+
+def generate_prices(tickers: Sequence[str], n_days: int, start: str = "2020-01-01", seed: int = 0) -> pd.DataFrame:
+    """
+    Simulates adjusted closes for a panel of tickers.
+
+    Args:
+        tickers (Sequence[str]): Column names.
+        n_days (int): Number of business days.
+        start (str): First date.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Closes with a business-day DatetimeIndex, one column per ticker.
+    """
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0003, 0.01, (n_days, 1))
+    beta = rng.uniform(0.5, 1.5, len(tickers))
+    returns = market * beta + rng.normal(0, 0.015, (n_days, len(tickers)))
+    closes = 100 * np.exp(np.cumsum(returns, axis=0))
+    return pd.DataFrame(closes, index=pd.bdate_range(start, periods=n_days), columns=list(tickers))
+
+
+def generate_headlines(n: int, seed: int = 0, min_words: int = 6, max_words: int = 14) -> List[str]:
+    """
+    Generates ``n`` headlines mixing a subject, a sentiment cue and filler words.
+
+    Args:
+        n (int): Number of headlines.
+        seed (int): Random seed.
+        min_words (int): Minimum words per headline.
+        max_words (int): Maximum words per headline.
+
+    Returns:
+        List[str]: Headlines.
+    """
+    rng = np.random.default_rng(seed)
+    tone = rng.integers(0, 3, n)
+    cues = np.stack([
+        np.asarray(NEUTRAL)[rng.integers(0, len(NEUTRAL), n)],
+        np.asarray(POSITIVE)[rng.integers(0, len(POSITIVE), n)],
+        np.asarray(NEGATIVE)[rng.integers(0, len(NEGATIVE), n)],
+    ])[tone, np.arange(n)]
+    subjects = np.asarray(SUBJECTS)[rng.integers(0, len(SUBJECTS), n)]
+    lengths = rng.integers(min_words, max_words + 1, n)
+    filler = np.asarray(FILLER)[rng.integers(0, len(FILLER), (n, max_words))]
+    return [
+        f"{subjects[i].capitalize()} {cues[i]} {' '.join(filler[i, :lengths[i] - 2])}"
+        for i in range(n)
+    ]
+
+
+def generate_news_frame(n: int, tickers: Sequence[str], start: str = "2020-01-01",
+                        n_days: int = 250, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds an in-memory news frame in the format returned by ``load_news``.
+
+    Args:
+        n (int): Number of rows.
+        tickers (Sequence[str]): Tickers to spread rows over.
+        start (str): First date.
+        n_days (int): Number of business days to spread rows over.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: Rows with date, title, description, content, source and ticker.
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start, periods=n_days)
+    titles = generate_headlines(n, seed)
+    return pd.DataFrame({
+        "date": days[rng.integers(0, n_days, n)],
+        "title": titles,
+        "description": generate_headlines(n, seed + 1),
+        "content": "",
+        "source": pd.Categorical(np.asarray(["NewsAPI", "Reddit", "Twitter"])[rng.integers(0, 3, n)]),
+        "ticker": pd.Categorical(np.asarray(tickers)[rng.integers(0, len(tickers), n)]),
+    })
+
+
+def make_tiny_bert(path: str, hidden_size: int = 64, num_layers: int = 2, seed: int = 0) -> str:
+    """
+    Saves a small randomly initialized 3-label BERT and its tokenizer.
+
+    The vocabulary covers the generator's words, and the output loads with
+    ``AutoModelForSequenceClassification`` like FinBERT, so it can be passed
+    to ``pipeline.sentiment.register_model("finbert", ...)``.
+
+    Args:
+        path (str): Output directory. Reused if it already holds a model.
+        hidden_size (int): Hidden size.
+        num_layers (int): Number of transformer layers.
+        seed (int): Seed for the random weights.
+
+    Returns:
+        str: ``path``.
+    """
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    os.makedirs(path, exist_ok=True)
+    specials = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab = specials + VOCABULARY + list(string.ascii_lowercase) + list(string.digits) + ["$", "."]
+    with open(os.path.join(path, "vocab.txt"), "w") as f:
+        f.write("\n".join(vocab))
+    BertTokenizerFast(vocab_file=os.path.join(path, "vocab.txt")).save_pretrained(path)
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=hidden_size,
+        num_hidden_layers=num_layers,
+        num_attention_heads=2,
+        intermediate_size=hidden_size * 4,
+        max_position_embeddings=512,
+        num_labels=3,
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    return path
+
+
+def load_tiny_bert(path: str):
+    """
+    Loads a model saved by ``make_tiny_bert`` as a (tokenizer, model) pair.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = AutoModelForSequenceClassification.from_pretrained(path)
+    model.eval()
+    return tokenizer, model
+
+
+def _newsapi_item(title: str, body: str, ts: datetime, ticker: str, i: int) -> dict:
+    return {
+        "source": {"id": None, "name": "Synthetic Wire"},
+        "author": f"author{i % 50}",
+        "title": f"{ticker} {title}",
+        "description": body,
+        "url": f"https://example.com/{ticker}/{ts:%Y%m%d}/{i}",
+        "urlToImage": None,
+        "publishedAt": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "content": f"{body} {title}",
+    }
+
+
+def _reddit_item(title: str, body: str, ts: datetime, ticker: str, i: int) -> dict:
+    return {
+        "id": f"t3_{ticker.lower()}{i}",
+        "subreddit": "stocks",
+        "title": f"${ticker} {title}",
+        "selftext": body,
+        "created_utc": ts.timestamp(),
+        "score": i % 100,
+        "num_comments": i % 17,
+    }
+
+
+def _twitter_item(title: str, body: str, ts: datetime, ticker: str, i: int) -> dict:
+    return {
+        "id": str(10 ** 15 + i),
+        "author_id": str(i % 997),
+        "created_at": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "text": f"${ticker} {title}",
+    }
+
+
+_ITEM_BUILDERS = {
+    "newsapi": _newsapi_item,
+    "reddit": _reddit_item,
+    "twitter": _twitter_item,
+}
+
+
+def _write_ticker(raw_root: str, ticker: str, days: Sequence[str], per_day: int,
+                  sources: Sequence[str], seed: int) -> int:
+    n = len(days) * per_day
+    rng = np.random.default_rng(seed)
+    written = 0
+    for s, source in enumerate(sources):
+        titles = generate_headlines(n, seed * 31 + s)
+        bodies = generate_headlines(n, seed * 31 + s + 7, min_words=12, max_words=30)
+        seconds = rng.integers(13 * 3600, 21 * 3600, n)
+        build = _ITEM_BUILDERS[source]
+        os.makedirs(os.path.join(raw_root, source), exist_ok=True)
+        for d, day in enumerate(days):
+            base = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            items = []
+            for i in range(d * per_day, (d + 1) * per_day):
+                ts = datetime.fromtimestamp(base.timestamp() + int(seconds[i]), tz=timezone.utc)
+                items.append(build(titles[i], bodies[i], ts, ticker, i))
+            with open(os.path.join(raw_root, source, f"{ticker}_{day}.json"), "w") as f:
+                json.dump(items, f)
+            written += len(items)
+    return written
+
+
+def write_raw_corpus(
+    raw_root: str,
+    tickers: Sequence[str],
+    n_days: int,
+    per_day: int,
+    start: str = "2020-01-01",
+    sources: Sequence[str] = SOURCES,
+    max_workers: int = None,
+    seed: int = 0
+) -> int:
+    """
+    Writes raw JSON dumps in the layout produced by the fetch scripts.
+
+    Args:
+        raw_root (str): Root directory (e.g. a temporary copy of data/raw).
+        tickers (Sequence[str]): Tickers to generate.
+        n_days (int): Business days per ticker.
+        per_day (int): Items per (source, ticker, day) file.
+        start (str): First date.
+        sources (Sequence[str]): Any of 'newsapi', 'reddit', 'twitter'.
+        max_workers (int): Worker processes, one ticker per task.
+        seed (int): Random seed.
+
+    Returns:
+        int: Number of items written.
+    """
+    days = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(start, periods=n_days)]
+    with ProcessPoolExecutor(max_workers) as pool:
+        futures = [
+            pool.submit(_write_ticker, raw_root, ticker, days, per_day, list(sources), seed + k)
+            for k, ticker in enumerate(tickers)
+        ]
+        return sum(f.result() for f in futures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="data/synthetic", help="Output root; raw dumps go under raw/.")
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--per-day", type=int, default=10)
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--sources", nargs="+", default=list(SOURCES), choices=SOURCES)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tickers = make_tickers(args.tickers)
+    n_items = write_raw_corpus(os.path.join(args.out, "raw"), tickers, args.days, args.per_day,
+                               args.start, args.sources, args.workers, args.seed)
+    prices = generate_prices(tickers, args.days, args.start, args.seed)
+    prices.to_parquet(os.path.join(args.out, "prices.parquet"))
+    print(f"[Synthetic] Wrote {n_items} items and a {prices.shape} price panel to {args.out}")
@@ -16,15 +16,88 @@ START_DATE = "2022-01-01"
 END_DATE = "2024-12-31"
 TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA"]
 NEWS_SOURCES = ["NewsAPI", "Reddit"]
+FETCH_MAX_WORKERS = 4  # concurrent requests per source
+
+# entity tagging at ingest time (see pipeline.entities); tickers are matched as
+# cashtags and upper-case symbols, plus these company aliases
+ENTITY_ALIASES = {
+    "AAPL": ["Apple"],
+    "MSFT": ["Microsoft"],
+    "GOOGL": ["Alphabet", "Google"],
+    "AMZN": ["Amazon"],
+    "NVDA": ["Nvidia"],
+}
+NEWS_BY_MENTION = False  # assign articles to the tickers they mention, not the ticker they were fetched for
 
 # sentiment model parameters
 USE_TRANSFORMER = False  # If False, use Vader or FinBERT
+SENTIMENT_MODEL = "finbert"  # 'vader', 'finbert' (fp32), 'finbert-int8' or 'finbert-onnx'
+FINBERT_BATCH_SIZE = 32
+FINBERT_NUM_THREADS = None  # None keeps the torch default
+VADER_WORKERS = 1  # processes scoring VADER chunks; None uses every core
+VADER_FAST = False  # vectorized VADER lexicon path, same scores as polarity_scores
+SENTIMENT_CACHE_PATH = "data/cache/sentiment.sqlite"
+SENTIMENT_CACHE_MAX_ENTRIES = 5_000_000
+SENTIMENT_TEXT = "title"  # 'title' (headline only) or 'document' (title, description and content)
+DOC_WINDOW_TOKENS = 256  # FinBERT window per document chunk, special tokens included
+DOC_WINDOW_OVERLAP = 64  # tokens shared by consecutive windows
+DOC_POOLING = "length"  # window scores weighted by token count ('length') or equally ('mean')
+
+# deduplication before sentiment scoring
+DEDUP_NEAR_DUPLICATES = True
+DEDUP_THRESHOLD = 0.8  # estimated Jaccard similarity of word shingles
+
+# daily sentiment aggregation (see pipeline.aggregate)
+SENTIMENT_DECAY_HALFLIFE = 3.0  # calendar days
+SENTIMENT_SOURCE_WEIGHTS = {"NewsAPI": 1.0, "Reddit": 0.5, "Twitter": 0.5}
+# model inputs per day besides the return; the streaming daemon supports ["sentiment"]
+SENTIMENT_FEATURES = ["sentiment"]
 
 # return computation
 RETURN_HORIZON = 1  # next-day return
+LOOKBACK = 5  # past days of returns and sentiment per sample
+FEATURE_STORE_PATH = "data/store/features"  # memory-mapped feature matrices (see pipeline.feature_store)
+
+# instrumentation (see pipeline.instrument)
+INSTRUMENT_REPORT_PATH = "data/reports/run_report.json"
+PROFILE_DIR = "data/reports/profiles"  # .prof files written by --profile
 
 # train/test split
 TEST_SPLIT_RATIO = 0.2
+MODEL_PATH = "data/models/model.pkl"  # trained model and feature spec saved by main.py
+
+# streaming daemon (see pipeline.streaming)
+STREAM_POLL_SECONDS = 2.0
+STREAM_BATCH_SIZE = 32
+STREAM_MAX_WAIT = 0.5  # seconds a micro-batch waits to fill
+STREAM_QUEUE_SIZE = 10_000  # producers block beyond this many queued items
+STREAM_PREDICTIONS_PATH = "data/stream/predictions.jsonl"
+STREAM_REPORT_SECONDS = 300.0  # interval of the daemon's instrumentation report; spans are reset after each
+STREAM_REPORT_PATH = "data/reports/stream_report.json"
+
+# prediction service (see pipeline.serving)
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+SERVE_MAX_BATCH = 512  # rows per predict call
+SERVE_MAX_WAIT = 0.002  # seconds a batch waits for more concurrent requests
+
+# walk-forward backtest
+WALK_FORWARD_MIN_TRAIN = 252  # trading days before the first prediction
+WALK_FORWARD_RETRAIN_EVERY = 21  # trading days between refits
+WALK_FORWARD_WINDOW = "expanding"  # or "rolling"
+WALK_FORWARD_EMBARGO = RETURN_HORIZON  # must be >= RETURN_HORIZON
+
+# hyperparameter sweep (see pipeline.sweep)
+SWEEP_SPACE = {
+    "model_type": ["linear", "xgboost"],
+    "lookback": [3, 5, 10],
+    "horizon": [1, 5],
+    "max_depth": [2, 3, 5],
+    "learning_rate": [0.05, 0.1],
+    "n_estimators": [500],
+}
+SWEEP_TRIAL_SECONDS = 60
+SWEEP_EARLY_STOPPING_ROUNDS = 20
 
 # ml training params
 EPOCHS = 10
@@ -2,40 +2,229 @@
 Main script for sentiment-based return prediction.
 
 Steps:
-1. Ingest price and news data
-2. Compute sentiment scores
-3. Generate sentiment-return pairs
-4. Train ML model to predict returns using sentiment features
-5. Evaluate predictive performance
+1. Ingest price and news data (concurrently)
+2. Collapse duplicate texts and compute sentiment scores
+3. Aggregate daily sentiment features per ticker
+4. Generate sentiment-return pairs
+5. Train ML model to predict returns using sentiment features
+6. Evaluate predictive performance
+7. With --backtest, walk-forward backtest with embargoed, time-ordered folds
+
+Each step is a stage in pipeline.dag; its output is cached under
+data/cache/stages and only recomputed when its code, settings or inputs change.
 """
 
-from pipeline.ingestion import fetch_price_data, fetch_news_data
-from pipeline.sentiment import compute_sentiment_scores
-from pipeline.features import build_dataset
-from pipeline.trainer import train_model
-from pipeline.evaluator import evaluate_model
+import argparse
+import os
+
 import config
 
-def main():
-    print("Loading price data...")
-    price_df = fetch_price_data(config.TICKERS, config.START_DATE, config.END_DATE)
 
-    print("Loading news data...")
-    news_df = fetch_news_data(config.TICKERS, config.START_DATE, config.END_DATE)
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sentiment-based return prediction pipeline.")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve prices from the local cache without downloading."
+    )
+    parser.add_argument(
+        "--sentiment-model",
+        choices=["vader", "finbert", "finbert-int8", "finbert-onnx"],
+        default=config.SENTIMENT_MODEL,
+        help="Sentiment model used to score headlines."
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        help="Recompute a stage even if its cached output is current (repeatable)."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Capture a cProfile per stage (stages then run one at a time)."
+    )
+    parser.add_argument(
+        "--backtest",
+        action="store_true",
+        help="Also run a walk-forward backtest over the feature store (see WALK_FORWARD_*)."
+    )
+    return parser.parse_args(argv)
+
+
+def load_prices(offline: bool = False):
+    from pipeline.ingestion import fetch_price_data
+    return fetch_price_data(config.TICKERS, config.START_DATE, config.END_DATE, offline=offline)
+
+
+def load_news():
+    from pipeline.ingestion import fetch_news_data
+    return fetch_news_data(
+        config.TICKERS, config.START_DATE, config.END_DATE, max_workers=config.FETCH_MAX_WORKERS,
+        entities={t: config.ENTITY_ALIASES.get(t, []) for t in config.TICKERS},
+        by_mention=config.NEWS_BY_MENTION
+    )
+
+
+def score_news(news, sentiment_model: str = config.SENTIMENT_MODEL):
+    import pandas as pd
+    from pipeline.sentiment import compute_sentiment_scores, document_texts
+    from pipeline.cache import SentimentCache
+    from pipeline.dedup import drop_boilerplate, deduplicate_texts, expand_scores
+
+    news_df = drop_boilerplate(news)
+    documents = config.SENTIMENT_TEXT == "document"
+    if documents:
+        news_df = news_df.assign(document=document_texts(news_df))
+    unique_df, inverse = deduplicate_texts(
+        news_df,
+        column="document" if documents else "title",
+        near_duplicates=config.DEDUP_NEAR_DUPLICATES,
+        threshold=config.DEDUP_THRESHOLD
+    )
+    with SentimentCache(config.SENTIMENT_CACHE_PATH, config.SENTIMENT_CACHE_MAX_ENTRIES) as cache:
+        unique_scores = compute_sentiment_scores(
+            unique_df,
+            model=sentiment_model,
+            batch_size=config.FINBERT_BATCH_SIZE,
+            num_threads=config.FINBERT_NUM_THREADS,
+            cache=cache,
+            vader_workers=config.VADER_WORKERS,
+            vader_fast=config.VADER_FAST,
+            documents=documents,
+            window=config.DOC_WINDOW_TOKENS,
+            overlap=config.DOC_WINDOW_OVERLAP,
+            pooling=config.DOC_POOLING
+        )
+    return pd.DataFrame({
+        "date": news_df["date"].to_numpy(),
+        "ticker": news_df["ticker"].astype(str).to_numpy(),
+        "source": news_df["source"].astype(str).to_numpy(),
+        "sentiment": expand_scores(unique_scores, inverse, news_df.index).to_numpy(),
+    })
+
+
+def aggregate_sentiment(sentiment):
+    from pipeline.aggregate import aggregate_daily_sentiment
+    return aggregate_daily_sentiment(
+        sentiment, config.SENTIMENT_DECAY_HALFLIFE, config.SENTIMENT_SOURCE_WEIGHTS
+    )
+
+
+def make_features(prices, daily_sentiment):
+    from pipeline.feature_store import panel_features
+    columns = ["date", "ticker"] + config.SENTIMENT_FEATURES
+    return panel_features(prices, daily_sentiment[columns], config.LOOKBACK, config.RETURN_HORIZON,
+                          store_root=config.FEATURE_STORE_PATH)
+
 
-    print("Computing sentiment scores...")
-    sentiment_df = compute_sentiment_scores(news_df)
+def fit_model(features, model_type: str = "linear"):
+    from pipeline.trainer import train_model
+    X, y, _, _ = features.load()
+    return train_model(X, y, model_type=model_type, test_size=config.TEST_SPLIT_RATIO)
 
-    print("Building dataset...")
-    X, y = build_dataset(sentiment_df, price_df, config.RETURN_HORIZON)
 
-    print("Training model...")
-    model, X_test, y_test, y_pred = train_model(X, y, model_type="linear", test_size=config.TEST_SPLIT_RATIO)
+def evaluate(train):
+    from pipeline.evaluator import evaluate_model
+    return evaluate_model(*train)
 
-    print("Evaluating model...")
-    metrics = evaluate_model(model, X_test, y_test, y_pred)
-    print("Evaluation metrics:", metrics)
+
+def backtest(features, model_type: str = "linear"):
+    from pipeline.backtest import walk_forward
+    from pipeline.evaluator import evaluate_panel
+    X, y, dates, tickers = features.load()
+    predictions = walk_forward(
+        X, y, dates, tickers,
+        model_type=model_type,
+        horizon=config.RETURN_HORIZON,
+        min_train=config.WALK_FORWARD_MIN_TRAIN,
+        retrain_every=config.WALK_FORWARD_RETRAIN_EVERY,
+        window=config.WALK_FORWARD_WINDOW,
+        embargo=config.WALK_FORWARD_EMBARGO
+    )
+    metrics, _ = evaluate_panel(predictions["date"], predictions["ticker"],
+                                predictions["y_true"].to_numpy(), predictions["y_pred"].to_numpy())
+    return predictions, metrics
+
+
+def build_stages(args: argparse.Namespace) -> list:
+    """
+    Declares the pipeline as a DAG of cached stages.
+
+    Prices and news are fetched incrementally by their stores, so those stages
+    always run and are fingerprinted by their output; the rest reuse cached
+    outputs until their code, config slice or inputs change. Features live in
+    the memory-mapped feature store, which does its own caching, so that
+    stage also always runs and only passes a handle downstream.
+    """
+    from pipeline.dag import Stage
+
+    return [
+        Stage("prices", load_prices, config_keys=["TICKERS", "START_DATE", "END_DATE"],
+              params={"offline": args.offline}, volatile=True),
+        Stage("news", load_news,
+              config_keys=["TICKERS", "START_DATE", "END_DATE", "ENTITY_ALIASES", "NEWS_BY_MENTION"],
+              volatile=True),
+        Stage("sentiment", score_news, deps=["news"],
+              config_keys=["DEDUP_NEAR_DUPLICATES", "DEDUP_THRESHOLD", "SENTIMENT_TEXT",
+                           "DOC_WINDOW_TOKENS", "DOC_WINDOW_OVERLAP", "DOC_POOLING"],
+              params={"sentiment_model": args.sentiment_model},
+              modules=["pipeline.dedup", "pipeline.sentiment", "pipeline.vader_fast"]),
+        Stage("daily_sentiment", aggregate_sentiment, deps=["sentiment"],
+              config_keys=["SENTIMENT_DECAY_HALFLIFE", "SENTIMENT_SOURCE_WEIGHTS"],
+              modules=["pipeline.aggregate"]),
+        Stage("features", make_features, deps=["prices", "daily_sentiment"],
+              config_keys=["LOOKBACK", "RETURN_HORIZON", "SENTIMENT_FEATURES"],
+              modules=["pipeline.features", "pipeline.feature_store"], volatile=True),
+        Stage("train", fit_model, deps=["features"], config_keys=["TEST_SPLIT_RATIO"],
+              params={"model_type": "linear"}, modules=["pipeline.trainer"]),
+        Stage("evaluate", evaluate, deps=["train"], modules=["pipeline.evaluator"]),
+        Stage("backtest", backtest, deps=["features"],
+              config_keys=["RETURN_HORIZON", "WALK_FORWARD_MIN_TRAIN", "WALK_FORWARD_RETRAIN_EVERY",
+                           "WALK_FORWARD_WINDOW", "WALK_FORWARD_EMBARGO"],
+              params={"model_type": "linear"}, modules=["pipeline.backtest", "pipeline.evaluator"]),
+    ]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # pipeline modules pull in pandas/sklearn/yfinance, so import them only
+    # once we know we are running the pipeline (keeps --help instant)
+    from pipeline import instrument
+    from pipeline.dag import run_pipeline
+    from pipeline.sentiment import prewarm_models
+    from pipeline.features import feature_spec
+    from pipeline.trainer import save_model
+
+    if args.profile:
+        instrument.enable_profiling(config.PROFILE_DIR)
+
+    # on a cold score cache, load the sentiment model while prices and news are
+    # fetched; with a warm one most reruns are all hits and never need it
+    if not os.path.exists(config.SENTIMENT_CACHE_PATH):
+        prewarm_models([args.sentiment_model])
+
+    outputs = run_pipeline(
+        build_stages(args),
+        targets=["train", "evaluate"] + (["backtest"] if args.backtest else []),
+        force=args.force,
+        max_workers=1 if args.profile else 4
+    )
+    print("Evaluation metrics:", outputs["evaluate"])
+    if args.backtest:
+        predictions, metrics = outputs["backtest"]
+        print(f"Walk-forward metrics ({predictions['fold'].nunique()} folds, {len(predictions)} predictions):",
+              metrics)
+    spec = feature_spec(config.LOOKBACK, config.RETURN_HORIZON, config.SENTIMENT_FEATURES)
+    save_model(outputs["train"][0], config.MODEL_PATH, spec=dict(spec, model_type="linear"))
+
+    instrument.write_report(config.INSTRUMENT_REPORT_PATH, extra={"args": vars(args)})
+    print(instrument.format_summary())
+    print(f"[Instrument] Report written to {config.INSTRUMENT_REPORT_PATH}")
     print("Evaluation complete.")
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,215 @@
+"""
+Daily sentiment aggregation per (date, ticker).
+
+Turns scored news items into a daily feature panel in one segment-reduce
+pass (``np.bincount`` over combined date/ticker codes) instead of a Python
+groupby per ticker.
+
+Features per (date, ticker):
+- sentiment: mean item score, as ``build_dataset`` computes with ``resample('D').mean()``
+- sentiment_count: number of items
+- sentiment_std: population standard deviation of item scores
+- sentiment_weighted: mean weighted by source (e.g. NewsAPI over Twitter)
+- sentiment_decay: exponentially time-decayed mean over all past items,
+  with weights halving every ``halflife`` calendar days
+
+The aggregator keeps per-day sufficient statistics (sums, squared sums,
+counts, decayed sums), so new or late items only recompute the days from the
+earliest affected date onward, never the full history.
+"""
+
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+FEATURE_COLUMNS = ["sentiment", "sentiment_count", "sentiment_std", "sentiment_weighted", "sentiment_decay"]
+_BASE_STATS = ["sum", "sum_sq", "count", "weighted_sum", "weight"]
+_DECAY_STATS = ["decay_sum", "decay_count"]
+
+
+def _daily_stats(scored_df: pd.DataFrame, source_weights: Dict[str, float]) -> pd.DataFrame:
+    """
+    Reduces scored items to per-(date, ticker) sums in one pass.
+    """
+    dates = pd.to_datetime(scored_df["date"]).dt.normalize().to_numpy()
+    tickers = scored_df["ticker"].astype(str).to_numpy()
+    scores = scored_df["sentiment"].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(scores) & ~pd.isna(dates)
+    dates, tickers, scores = dates[valid], tickers[valid], scores[valid]
+
+    if "source" in scored_df.columns:
+        sources = scored_df["source"].astype(str).to_numpy()[valid]
+        weights = pd.Series(sources).map(source_weights).fillna(1.0).to_numpy(dtype=np.float64)
+    else:
+        weights = np.ones(len(scores))
+
+    date_values, date_codes = np.unique(dates, return_inverse=True)
+    ticker_values, ticker_codes = np.unique(tickers, return_inverse=True)
+    keys, segment = np.unique(date_codes * len(ticker_values) + ticker_codes, return_inverse=True)
+    n = len(keys)
+
+    return pd.DataFrame({
+        "date": date_values[keys // max(len(ticker_values), 1)],
+        "ticker": ticker_values[keys % max(len(ticker_values), 1)],
+        "sum": np.bincount(segment, weights=scores, minlength=n),
+        "sum_sq": np.bincount(segment, weights=scores ** 2, minlength=n),
+        "count": np.bincount(segment, minlength=n).astype(np.float64),
+        "weighted_sum": np.bincount(segment, weights=weights * scores, minlength=n),
+        "weight": np.bincount(segment, weights=weights, minlength=n),
+    })
+
+
+def _features(stats: pd.DataFrame) -> pd.DataFrame:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = stats["sum"] / stats["count"]
+        var = (stats["sum_sq"] / stats["count"] - mean ** 2).clip(lower=0)
+        return pd.DataFrame({
+            "date": stats["date"].to_numpy(),
+            "ticker": stats["ticker"].to_numpy(),
+            "sentiment": mean.to_numpy(),
+            "sentiment_count": stats["count"].to_numpy().astype(np.int64),
+            "sentiment_std": np.sqrt(var).to_numpy(),
+            "sentiment_weighted": (stats["weighted_sum"] / stats["weight"]).to_numpy(),
+            "sentiment_decay": (stats["decay_sum"] / stats["decay_count"]).to_numpy(),
+        })
+
+
+class DailySentimentAggregator:
+    """
+    Incrementally maintained daily sentiment features.
+
+    Args:
+        halflife (float): Calendar days after which an item's weight in
+            ``sentiment_decay`` has halved.
+        source_weights (Optional[Dict[str, float]]): Weight per source label
+            ('NewsAPI', 'Reddit', 'Twitter') for ``sentiment_weighted``.
+            Unlisted sources weigh 1.0.
+    """
+
+    def __init__(self, halflife: float = 3.0, source_weights: Optional[Dict[str, float]] = None):
+        self.halflife = halflife
+        self.source_weights = dict(source_weights or {})
+        self.decay = 0.5 ** (1.0 / halflife)
+        self._stats = pd.DataFrame({
+            "date": pd.Series(dtype="datetime64[ns]"),
+            "ticker": pd.Series(dtype=object),
+            **{c: pd.Series(dtype=np.float64) for c in _BASE_STATS + _DECAY_STATS},
+        })
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def update(self, scored_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds scored items and recomputes the days they affect.
+
+        Items may belong to days already aggregated (late arrivals); those
+        days and every later day are recomputed from the stored statistics.
+
+        Args:
+            scored_df (pd.DataFrame): Items with 'date', 'ticker' and
+                'sentiment' columns, and optionally 'source'.
+
+        Returns:
+            pd.DataFrame: Features for the recomputed (date, ticker) rows.
+        """
+        new = _daily_stats(scored_df, self.source_weights)
+        if new.empty:
+            return _features(self._stats.iloc[:0])
+        start = new["date"].min()
+
+        before = self._stats["date"] < start
+        keep, tail = self._stats[before], self._stats.loc[~before, ["date", "ticker"] + _BASE_STATS]
+        tail = pd.concat([tail, new], ignore_index=True)
+        tail = tail.groupby(["date", "ticker"], as_index=False, sort=True)[_BASE_STATS].sum()
+
+        # decayed sums: y[t] = x[t] + decay * y[t - 1] over a daily (date x ticker) grid
+        tickers = np.unique(np.concatenate([tail["ticker"].to_numpy(dtype=object),
+                                            keep["ticker"].to_numpy(dtype=object)]).astype(str))
+        day_idx = ((tail["date"] - start) // pd.Timedelta(days=1)).to_numpy()
+        tick_idx = np.searchsorted(tickers, tail["ticker"].to_numpy(dtype=str))
+        n_days = int(day_idx.max()) + 1
+
+        # carry the state of each ticker's last day before ``start`` into the grid
+        last = keep.groupby("ticker").last()
+        gap = ((start - last["date"]) // pd.Timedelta(days=1)).to_numpy(dtype=np.float64)
+        carry = np.zeros((2, len(tickers)))
+        pos = np.searchsorted(tickers, last.index.to_numpy(dtype=str))
+        carry[0, pos] = self.decay ** gap * last["decay_sum"].to_numpy()
+        carry[1, pos] = self.decay ** gap * last["decay_count"].to_numpy()
+
+        for k, (src, dst) in enumerate((("sum", "decay_sum"), ("count", "decay_count"))):
+            grid = np.zeros((n_days, len(tickers)))
+            grid[day_idx, tick_idx] = tail[src].to_numpy()
+            filtered = lfilter([1.0], [1.0, -self.decay], grid, axis=0, zi=carry[k][None, :])[0]
+            tail[dst] = filtered[day_idx, tick_idx]
+
+        self._stats = pd.concat([keep, tail], ignore_index=True)
+        return _features(tail)
+
+    def features(self, start_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Returns features for all stored days, or those from ``start_date`` on.
+
+        Returns:
+            pd.DataFrame: Rows with 'date', 'ticker' and ``FEATURE_COLUMNS``,
+            sorted by date then ticker; usable as ``build_panel_dataset``'s
+            ``sentiment_df``.
+        """
+        stats = self._stats
+        if start_date is not None:
+            stats = stats[stats["date"] >= pd.Timestamp(start_date)]
+        return _features(stats).reset_index(drop=True)
+
+    def save(self, path: str):
+        """
+        Persists the daily statistics and settings to a Parquet file.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        stats = self._stats.copy()
+        stats.attrs = {"halflife": self.halflife, "source_weights": self.source_weights}
+        stats.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "DailySentimentAggregator":
+        """
+        Restores an aggregator saved with ``save``.
+        """
+        stats = pd.read_parquet(path)
+        agg = cls(stats.attrs.get("halflife", 3.0), stats.attrs.get("source_weights"))
+        agg._stats = stats.reset_index(drop=True)
+        return agg
+
+
+def aggregate_daily_sentiment(
+    scored_df: pd.DataFrame,
+    halflife: float = 3.0,
+    source_weights: Optional[Dict[str, float]] = None
+) -> pd.DataFrame:
+    """
+    Aggregates scored items into daily features in one pass.
+
+    Args:
+        scored_df (pd.DataFrame): Items with 'date', 'ticker', 'sentiment' and
+            optionally 'source'.
+        halflife (float): Half-life in days of ``sentiment_decay``.
+        source_weights (Optional[Dict[str, float]]): Weight per source label.
+
+    Returns:
+        pd.DataFrame: Rows with 'date', 'ticker' and ``FEATURE_COLUMNS``.
+    """
+    agg = DailySentimentAggregator(halflife, source_weights)
+    agg.update(scored_df)
+    return agg.features()
+
+
+def sentiment_panel(features_df: pd.DataFrame, column: str = "sentiment") -> pd.DataFrame:
+    """
+    Pivots one feature into a (date x ticker) frame.
+    """
+    return features_df.pivot(index="date", columns="ticker", values=column)
@@ -0,0 +1,156 @@
+"""
+Walk-forward backtesting for sentiment-driven return prediction.
+
+Replaces a single random train/test split with a sequence of time-ordered
+folds. Each fold trains on past data only, skips an embargo gap of at least
+the prediction horizon, and predicts the next block of dates. Folds run in
+parallel across a process pool; the feature matrix is written once to a
+memory-mapped file that every worker opens read-only instead of receiving a
+pickled copy.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline.trainer import make_model
+
+# read-only views of the shared arrays, set once per worker process
+_X = None
+_Y = None
+
+
+def walk_forward_splits(
+    dates: np.ndarray,
+    min_train: int = 252,
+    retrain_every: int = 21,
+    window: str = "expanding",
+    train_size: Optional[int] = None,
+    embargo: int = 1
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Builds walk-forward folds over date-sorted samples.
+
+    Fold boundaries are placed on distinct dates, so every sample for a
+    date (e.g. all tickers) falls in the same fold.
+
+    Args:
+        dates (np.ndarray): Sample dates, sorted ascending.
+        min_train (int): Distinct dates required before the first test block.
+        retrain_every (int): Distinct dates per test block; the model is
+            refit after each block.
+        window (str): "expanding" trains on all history, "rolling" on the
+            most recent ``train_size`` dates.
+        train_size (Optional[int]): Rolling window length in distinct dates.
+            Defaults to ``min_train``.
+        embargo (int): Distinct dates dropped between train and test. Must be
+            at least the prediction horizon so train targets do not overlap
+            the test period.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: (train_start, train_stop, test_start,
+        test_stop) sample positions for each fold.
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"Unsupported window: {window}")
+    train_size = train_size or min_train
+
+    unique_dates, first = np.unique(dates, return_index=True)
+    bounds = np.append(first, len(dates))  # bounds[d] = first sample of date d
+
+    folds = []
+    for test_start in range(min_train + embargo, len(unique_dates), retrain_every):
+        test_stop = min(test_start + retrain_every, len(unique_dates))
+        train_stop = test_start - embargo
+        train_start = 0 if window == "expanding" else max(train_stop - train_size, 0)
+        folds.append(tuple(int(bounds[i]) for i in (train_start, train_stop, test_start, test_stop)))
+    return folds
+
+
+def _init_worker(x_path: str, y_path: str):
+    global _X, _Y
+    _X = np.load(x_path, mmap_mode="r")
+    _Y = np.load(y_path, mmap_mode="r")
+
+
+def _run_fold(fold: Tuple[int, int, int, int], model_type: str, random_state: int) -> np.ndarray:
+    train_start, train_stop, test_start, test_stop = fold
+    model = make_model(model_type, random_state)
+    model.fit(_X[train_start:train_stop], _Y[train_start:train_stop])
+    return model.predict(_X[test_start:test_stop])
+
+
+def walk_forward(
+    X: np.ndarray,
+    y: np.ndarray,
+    dates,
+    tickers: Optional[np.ndarray] = None,
+    model_type: str = "linear",
+    horizon: int = 1,
+    min_train: int = 252,
+    retrain_every: int = 21,
+    window: str = "expanding",
+    train_size: Optional[int] = None,
+    embargo: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Runs a walk-forward backtest and returns out-of-sample predictions.
+
+    Args:
+        X (np.ndarray): Feature matrix.
+        y (np.ndarray): Target returns.
+        dates: Target date of each sample.
+        tickers (Optional[np.ndarray]): Ticker of each sample for panel data.
+        model_type (str): Type of model to train ("linear" or "xgboost").
+        horizon (int): Prediction horizon in days.
+        min_train (int): Distinct dates before the first prediction.
+        retrain_every (int): Distinct dates between refits.
+        window (str): "expanding" or "rolling" training window.
+        train_size (Optional[int]): Rolling window length in distinct dates.
+        embargo (Optional[int]): Gap between train and test in distinct
+            dates. Defaults to ``horizon``; smaller values are rejected.
+        max_workers (Optional[int]): Worker processes. Defaults to the CPU count.
+        random_state (int): Seed for reproducibility.
+
+    Returns:
+        pd.DataFrame: One row per predicted sample with 'date', optional
+        'ticker', 'y_true', 'y_pred' and 'fold', sorted by date.
+    """
+    embargo = horizon if embargo is None else embargo
+    if embargo < horizon:
+        raise ValueError(f"Embargo ({embargo}) must be at least the horizon ({horizon}).")
+
+    dates = np.asarray(pd.to_datetime(dates))
+    order = np.argsort(dates, kind="stable")
+    dates = dates[order]
+    X = np.ascontiguousarray(X[order], dtype=np.float64)
+    y = np.ascontiguousarray(y[order], dtype=np.float64)
+    tickers = None if tickers is None else np.asarray(tickers)[order]
+
+    folds = walk_forward_splits(dates, min_train, retrain_every, window, train_size, embargo)
+    if not folds:
+        raise ValueError("Not enough history for a single walk-forward fold.")
+
+    with tempfile.TemporaryDirectory(prefix="walk_forward_") as tmp:
+        x_path, y_path = os.path.join(tmp, "X.npy"), os.path.join(tmp, "y.npy")
+        np.save(x_path, X)
+        np.save(y_path, y)
+        with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(x_path, y_path)) as pool:
+            preds = list(pool.map(_run_fold, folds, [model_type] * len(folds), [random_state] * len(folds)))
+
+    positions = np.concatenate([np.arange(f[2], f[3]) for f in folds])
+    result = pd.DataFrame({
+        "date": dates[positions],
+        "y_true": y[positions],
+        "y_pred": np.concatenate(preds),
+        "fold": np.repeat(np.arange(len(folds)), [f[3] - f[2] for f in folds]),
+    })
+    if tickers is not None:
+        result.insert(1, "ticker", tickers[positions])
+    return result
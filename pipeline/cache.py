@@ -0,0 +1,156 @@
+"""
+Persistent, content-addressed cache for sentiment scores.
+
+Scores are stored in SQLite keyed by a hash of (model name, model revision,
+text), so reruns only score texts that have not been seen before. The cache
+tracks hit/miss counts and evicts least recently used entries once it grows
+past a configured size.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# SQLite's default limit on bound parameters per statement is 999
+_CHUNK_SIZE = 900
+
+
+class SentimentCache:
+    """
+    On-disk sentiment score cache backed by SQLite.
+
+    Args:
+        path (str): Location of the SQLite database file.
+        max_entries (Optional[int]): Maximum number of cached scores. Least
+            recently used entries are evicted past this size. Unbounded if None.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, score REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_last_access ON scores(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, revision: str, text: str) -> bytes:
+        """
+        Builds the content-addressed key for a scored text.
+
+        Args:
+            model_name (str): Sentiment model identifier.
+            revision (str): Model revision or version string.
+            text (str): Text that was scored.
+
+        Returns:
+            bytes: SHA-256 digest of the model, revision and text.
+        """
+        h = hashlib.sha256()
+        for part in (model_name, revision, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.digest()
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, float]:
+        """
+        Looks up cached scores and refreshes their access time.
+
+        Args:
+            keys (Iterable[bytes]): Keys built with ``make_key``.
+
+        Returns:
+            Dict[bytes, float]: Scores for the keys found in the cache.
+        """
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(unique), _CHUNK_SIZE):
+            chunk = unique[i:i + _CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update((bytes(k), s) for k, s in rows)
+
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE scores SET last_access = ? WHERE key = ?", [(now, k) for k in found]
+        )
+        self._conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, float]]):
+        """
+        Stores scores and evicts the least recently used entries if the cache
+        is over its size limit.
+
+        Args:
+            items (Iterable[Tuple[bytes, float]]): (key, score) pairs.
+        """
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO scores (key, score, last_access) VALUES (?, ?, ?)",
+            [(k, float(s), now) for k, s in items]
+        )
+        self._conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes least recently used entries beyond ``max_entries``.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.max_entries is None:
+            return 0
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self._conn.execute(
+            "DELETE FROM scores WHERE key IN "
+            "(SELECT key FROM scores ORDER BY last_access LIMIT ?)", (excess,)
+        )
+        self._conn.commit()
+        return excess
+
+    def stats(self) -> dict:
+        """
+        Summarizes cache usage since this instance was opened.
+
+        Returns:
+            dict: Hits, misses, hit rate and current number of entries.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
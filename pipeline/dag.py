@@ -0,0 +1,297 @@
+"""
+Stage-level artifact caching and DAG execution.
+
+Includes:
+- Stages declared with their upstream dependencies, the ``config.py``
+  settings they read, explicit parameters and the modules whose code they run
+- A fingerprint per stage hashing its code, config slice, parameters and the
+  fingerprints of its inputs, so any change invalidates it and everything
+  downstream
+- Persisted stage outputs keyed by fingerprint; a rerun loads cached outputs
+  and recomputes only invalidated stages
+- Volatile stages (e.g. incremental fetches) that always run and are
+  fingerprinted by the content of their output instead
+- Concurrent execution of stages whose inputs are ready
+
+Layout:
+    {store_root}/{stage}/{fingerprint}.pkl
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+import config
+from pipeline.instrument import span
+
+STAGE_ROOT = "data/cache/stages"
+# cached outputs kept per stage, so switching back to an earlier setting is free
+KEEP_VERSIONS = 5
+
+
+class Stage:
+    """
+    One step of the pipeline.
+
+    ``fn`` is called with the outputs of ``deps`` as keyword arguments named
+    after the upstream stages, followed by ``params``.
+
+    Args:
+        name (str): Unique stage name.
+        fn (Callable): Function computing the stage output.
+        deps (Sequence[str]): Names of upstream stages.
+        config_keys (Sequence[str]): ``config`` attributes the stage depends on.
+        params (Optional[dict]): Extra keyword arguments (e.g. CLI options),
+            included in the fingerprint.
+        modules (Sequence[str]): Modules whose source is part of the stage's
+            code version, in addition to ``fn`` itself.
+        volatile (bool): Always run the stage. Used for stages reading
+            external state; their fingerprint is a hash of their output.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        deps: Sequence[str] = (),
+        config_keys: Sequence[str] = (),
+        params: Optional[dict] = None,
+        modules: Sequence[str] = (),
+        volatile: bool = False
+    ):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.config_keys = list(config_keys)
+        self.params = dict(params or {})
+        self.modules = list(modules)
+        self.volatile = volatile
+
+    def code_version(self) -> str:
+        """
+        Hashes the source of ``fn`` and of the declared modules.
+        """
+        h = hashlib.sha256()
+        try:
+            h.update(inspect.getsource(self.fn).encode("utf-8"))
+        except (OSError, TypeError):
+            h.update(repr(self.fn).encode("utf-8"))
+        for name in sorted(self.modules):
+            __import__(name)
+            path = getattr(sys.modules[name], "__file__", None)
+            if path:
+                with open(path, "rb") as f:
+                    h.update(f.read())
+        return h.hexdigest()
+
+    def config_slice(self) -> dict:
+        return {key: getattr(config, key) for key in self.config_keys}
+
+    def fingerprint(self, input_fingerprints: Dict[str, str]) -> str:
+        """
+        Hashes everything that determines the stage output.
+
+        Args:
+            input_fingerprints (Dict[str, str]): Fingerprints of the upstream stages.
+
+        Returns:
+            str: Hex digest identifying this version of the output.
+        """
+        payload = {
+            "name": self.name,
+            "code": self.code_version(),
+            "config": self.config_slice(),
+            "params": self.params,
+            "inputs": {dep: input_fingerprints[dep] for dep in self.deps},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+
+def content_hash(obj) -> str:
+    """
+    Hashes a stage output by value.
+
+    Args:
+        obj: A DataFrame, Series, array, or any picklable object (including
+            tuples of these).
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    h = hashlib.sha256()
+
+    def update(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+            h.update(repr(list(columns)).encode("utf-8"))
+        elif isinstance(value, np.ndarray):
+            h.update(repr((value.dtype.str, value.shape)).encode("utf-8"))
+            h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value))
+        elif isinstance(value, (tuple, list)):
+            h.update(f"seq{len(value)}".encode("utf-8"))
+            for item in value:
+                update(item)
+        else:
+            h.update(pickle.dumps(value))
+
+    update(obj)
+    return h.hexdigest()
+
+
+def _artifact_path(store_root: str, stage: str, fingerprint: str) -> str:
+    return os.path.join(store_root, stage, f"{fingerprint}.pkl")
+
+
+def _save_artifact(path: str, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+    # drop the oldest versions beyond KEEP_VERSIONS
+    folder = os.path.dirname(path)
+    files = sorted(
+        (os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".pkl")),
+        key=os.path.getmtime, reverse=True
+    )
+    for old in files[KEEP_VERSIONS:]:
+        os.remove(old)
+
+
+def _load_artifact(path: str):
+    os.utime(path)  # mark as recently used for pruning
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _topological_order(stages: Dict[str, Stage]) -> List[str]:
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+        if name not in stages:
+            raise ValueError(f"Unknown stage: {name}")
+        state[name] = "visiting"
+        for dep in stages[name].deps:
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in stages:
+        visit(name, [])
+    return order
+
+
+def run_pipeline(
+    stages: Iterable[Stage],
+    targets: Optional[Sequence[str]] = None,
+    force: Sequence[str] = (),
+    store_root: str = STAGE_ROOT,
+    max_workers: int = 4
+) -> Dict[str, object]:
+    """
+    Runs the stages needed for ``targets``, reusing cached outputs.
+
+    A stage is recomputed when no output is stored under its current
+    fingerprint, when it is volatile, or when it is listed in ``force``.
+    Cached outputs are only loaded when a recomputed stage or a target needs
+    them. Stages whose inputs are ready run concurrently in a thread pool.
+
+    Args:
+        stages (Iterable[Stage]): Pipeline stages.
+        targets (Optional[Sequence[str]]): Stages whose outputs are returned.
+            Defaults to the stages nothing depends on.
+        force (Sequence[str]): Stages to recompute regardless of the cache.
+        store_root (str): Directory of persisted stage outputs.
+        max_workers (int): Maximum stages running at once.
+
+    Returns:
+        Dict[str, object]: Output of each target stage.
+    """
+    stages = {s.name: s for s in stages}
+    order = _topological_order(stages)
+    if targets is None:
+        upstream = {dep for s in stages.values() for dep in s.deps}
+        targets = [name for name in order if name not in upstream]
+
+    # restrict to the stages the targets need
+    needed, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(stages[name].deps)
+    order = [name for name in order if name in needed]
+
+    fingerprints: Dict[str, str] = {}
+    outputs: Dict[str, object] = {}
+    lock = threading.Lock()
+
+    def output_of(name):
+        with lock:
+            if name not in outputs:
+                outputs[name] = _load_artifact(_artifact_path(store_root, name, fingerprints[name]))
+            return outputs[name]
+
+    def execute(stage: Stage):
+        inputs = {dep: output_of(dep) for dep in stage.deps}
+        start = time.perf_counter()
+        with span(f"stage.{stage.name}", profile=True):
+            value = stage.fn(**inputs, **stage.params)
+        return value, time.perf_counter() - start
+
+    pending = list(order)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            # resolve every stage whose inputs have fingerprints
+            for name in [n for n in pending if all(d in fingerprints for d in stages[n].deps)]:
+                stage = stages[name]
+                pending.remove(name)
+                if not stage.volatile:
+                    fp = stage.fingerprint(fingerprints)
+                    if name not in force and os.path.exists(_artifact_path(store_root, name, fp)):
+                        fingerprints[name] = fp
+                        print(f"[DAG] {name}: cached ({fp[:12]})")
+                        continue
+                print(f"[DAG] {name}: running")
+                running[pool.submit(execute, stage)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                stage = stages[name]
+                try:
+                    value, elapsed = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                outputs[name] = value
+                if stage.volatile:
+                    inputs = {dep: fingerprints[dep] for dep in stage.deps}
+                    fingerprints[name] = hashlib.sha256(
+                        (stage.fingerprint(inputs) + content_hash(value)).encode("utf-8")
+                    ).hexdigest()
+                else:
+                    fingerprints[name] = stage.fingerprint(fingerprints)
+                    _save_artifact(_artifact_path(store_root, name, fingerprints[name]), value)
+                print(f"[DAG] {name}: done in {elapsed:.2f}s ({fingerprints[name][:12]})")
+
+    return {name: output_of(name) for name in targets}
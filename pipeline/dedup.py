@@ -0,0 +1,222 @@
+"""
+Collapses repeated news texts before sentiment scoring.
+
+Includes:
+- Text normalization and exact-duplicate hashing
+- Optional near-duplicate grouping with MinHash/LSH
+- Removal of known boilerplate bodies (e.g. cookie consent pages)
+- Mapping scores of unique texts back to every original row
+"""
+
+import html
+import re
+import zlib
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# bodies that carry no information about the article itself
+BOILERPLATE_PATTERNS = [
+    r"^if you click 'accept all', we and our partners",
+    r"^we, yahoo, are part of the yahoo family of brands",
+    r"^by clicking .{0,40}accept.{0,40}you agree",
+    r"^please enable (javascript|cookies)",
+    r"^\[removed\]$",
+    r"^\[deleted\]$",
+]
+_BOILERPLATE_RE = re.compile("|".join(BOILERPLATE_PATTERNS))
+
+# NewsAPI truncates bodies with a suffix like "… [+714 chars]"
+_TRUNCATION_RE = re.compile(r"\s*(…|\.\.\.)?\s*\[\+\d+ chars\]\s*$")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+# 2**31 - 1 keeps (hash * a + b) below 2**64 for 32-bit shingle hashes
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a text for duplicate detection.
+
+    Args:
+        text (str): Raw headline or body text.
+
+    Returns:
+        str: Lowercased text with HTML entities, truncation markers,
+        punctuation and repeated whitespace removed.
+    """
+    if not isinstance(text, str):
+        return ""
+    text = html.unescape(text).lower()
+    text = _TRUNCATION_RE.sub("", text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def is_boilerplate(text: str) -> bool:
+    """
+    Checks whether a text matches a known boilerplate body.
+
+    Args:
+        text (str): Raw text.
+
+    Returns:
+        bool: True if the text is boilerplate.
+    """
+    if not isinstance(text, str):
+        return False
+    return _BOILERPLATE_RE.search(html.unescape(text).strip().lower()) is not None
+
+
+def drop_boilerplate(news_df: pd.DataFrame, columns: Sequence[str] = ("description", "content")) -> pd.DataFrame:
+    """
+    Blanks out boilerplate bodies so they are neither scored nor treated as duplicates.
+
+    Args:
+        news_df (pd.DataFrame): News rows from ``fetch_news_data``.
+        columns (Sequence[str]): Text columns to clean.
+
+    Returns:
+        pd.DataFrame: Copy of the input with boilerplate texts replaced by "".
+    """
+    news_df = news_df.copy()
+    for col in columns:
+        if col in news_df.columns:
+            mask = news_df[col].map(is_boilerplate).astype(bool)
+            news_df.loc[mask, col] = ""
+    return news_df
+
+
+def _shingle_hashes(text: str, k: int) -> np.ndarray:
+    tokens = text.split()
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    grams = {" ".join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = 64, shingle_size: int = 3, seed: int = 0) -> np.ndarray:
+    """
+    Computes MinHash signatures over word shingles.
+
+    Args:
+        texts (Sequence[str]): Normalized texts.
+        num_perm (int): Number of hash permutations.
+        shingle_size (int): Words per shingle.
+        seed (int): Seed for the permutation coefficients.
+
+    Returns:
+        np.ndarray: Signature matrix of shape (len(texts), num_perm).
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+    sigs = np.full((len(texts), num_perm), _PRIME, dtype=np.uint64)
+    for i, text in enumerate(texts):
+        shingles = _shingle_hashes(text, shingle_size)
+        if len(shingles):
+            sigs[i] = ((shingles[:, None] * a + b) % _PRIME).min(axis=0)
+    return sigs
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def lsh_clusters(signatures: np.ndarray, bands: int = 16, threshold: float = 0.8) -> np.ndarray:
+    """
+    Groups near-duplicate texts using banded LSH over MinHash signatures.
+
+    Candidates that share a band bucket are merged when their estimated
+    Jaccard similarity reaches ``threshold``.
+
+    Args:
+        signatures (np.ndarray): Output of ``minhash_signatures``.
+        bands (int): Number of LSH bands. Must divide the signature width.
+        threshold (float): Minimum estimated Jaccard similarity to merge.
+
+    Returns:
+        np.ndarray: Cluster label per text, equal to the smallest member index.
+    """
+    n, width = signatures.shape
+    if width % bands:
+        raise ValueError("Signature width must be divisible by the number of bands.")
+    rows = width // bands
+
+    parent = np.arange(n)
+    empty = (signatures == _PRIME).all(axis=1)
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        _, bucket = np.unique(block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel(),
+                              return_inverse=True)
+        order = np.argsort(bucket, kind="stable")
+        splits = np.flatnonzero(np.diff(bucket[order])) + 1
+        for members in np.split(order, splits):
+            members = members[~empty[members]]
+            if len(members) < 2:
+                continue
+            head = members[0]
+            similarity = (signatures[members[1:]] == signatures[head]).mean(axis=1)
+            for other in members[1:][similarity >= threshold]:
+                ra, rb = _find(parent, head), _find(parent, other)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+
+    return np.array([_find(parent, i) for i in range(n)])
+
+
+def deduplicate_texts(
+    news_df: pd.DataFrame,
+    column: str = "title",
+    near_duplicates: bool = False,
+    threshold: float = 0.8,
+    num_perm: int = 64,
+    bands: int = 16
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Collapses rows whose texts are exact (or near) duplicates.
+
+    Args:
+        news_df (pd.DataFrame): News rows to deduplicate.
+        column (str): Text column to compare.
+        near_duplicates (bool): Also merge near-duplicates with MinHash/LSH.
+        threshold (float): Jaccard threshold for near-duplicates.
+        num_perm (int): MinHash permutations.
+        bands (int): LSH bands.
+
+    Returns:
+        Tuple[pd.DataFrame, np.ndarray]: One representative row per unique
+        text, and for every original row the position of its representative.
+    """
+    normalized = news_df[column].map(normalize_text)
+    codes, uniques = pd.factorize(normalized)
+
+    if near_duplicates and len(uniques) > 1:
+        labels = lsh_clusters(minhash_signatures(list(uniques), num_perm), bands, threshold)
+        codes = labels[codes]
+
+    _, first_pos, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    unique_df = news_df.iloc[first_pos]
+    print(f"[Dedup] {len(news_df)} rows -> {len(unique_df)} unique texts")
+    return unique_df, inverse
+
+
+def expand_scores(unique_scores: pd.Series, inverse: np.ndarray, index: pd.Index) -> pd.Series:
+    """
+    Copies scores of unique texts back to every original row.
+
+    Args:
+        unique_scores (pd.Series): Scores for the rows returned by ``deduplicate_texts``.
+        inverse (np.ndarray): Representative position for each original row.
+        index (pd.Index): Index of the original news DataFrame.
+
+    Returns:
+        pd.Series: Score for every original row.
+    """
+    return pd.Series(np.asarray(unique_scores)[inverse], index=index)
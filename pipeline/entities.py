@@ -0,0 +1,484 @@
+"""
+Entity tagging and a persisted ticker -> article inverted index.
+
+Includes:
+- ``EntityMatcher``: a token-level Aho-Corasick automaton that finds every
+  ticker symbol, cashtag and company alias in a text in a single pass,
+  however many entities are configured
+- Tagging of the news store's title, description and content fields,
+  with a stable article id per article (the same post fetched under two
+  tickers gets one id)
+- A per-ticker posting list of (partition, row, article id, hits), kept in
+  sync with the news store: only new or recompacted partitions are tagged
+  again, and adding a ticker (or changing its aliases) scans the store with
+  that ticker's patterns alone
+- Index lookups: article ids for a ticker, and the news rows mentioning a
+  ticker, read from just the partitions and rows its postings point to
+
+Matching rules:
+- ``$AAPL`` (cashtag) matches in any case
+- ``AAPL`` (bare symbol) matches only in upper case, and only for symbols of
+  at least ``min_symbol_length`` characters, so words like "a" or "on"
+  are not read as tickers
+- aliases ("Apple", "Alphabet Inc") match case-insensitively as whole
+  words; multi-word aliases match as whole phrases
+
+Layout:
+    {index_root}/_state.json              entities and partition mtimes indexed
+    {index_root}/postings/AAPL.parquet    partition, row, article_id, hits
+"""
+
+import glob
+import hashlib
+import json
+import os
+import string
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline.instrument import span
+from pipeline.news_store import NEWS_COLUMNS, STORE_ROOT as NEWS_STORE_ROOT
+
+INDEX_ROOT = "data/store/entities"
+
+TEXT_FIELDS = ["title", "description", "content"]
+_STATE_FILE = "_state.json"
+# never pattern tokens, so no match spans two fields or two rows
+_FIELD_BREAK = "\x00"
+_ROW_BREAK = "\x01"
+# punctuation becomes whitespace, except '$' so cashtags stay one token (one-to-one, so
+# str.translate stays on its fast path)
+_SEPARATORS = str.maketrans({
+    c: " " for c in string.punctuation.replace("$", "") + "\u2018\u2019\u201c\u201d\u2013\u2014\u2026\u00ab\u00bb"
+})
+
+_POSTINGS_SCHEMA = pa.schema([
+    ("partition", pa.string()),
+    ("row", pa.int32()),
+    ("article_id", pa.uint64()),
+    ("hits", pa.int32()),
+])
+
+
+# matchers with at most this many distinct pattern words first check each frame for
+# any of them as a plain substring, so adding a ticker skips partitions cheaply
+_PREFILTER_WORDS = 64
+
+
+class EntityMatcher:
+    """
+    Multi-pattern matcher over word tokens (Aho-Corasick).
+
+    Texts are split into words at whitespace and punctuation (keeping '$'
+    so cashtags stay whole) and fed through one automaton whose states are
+    pattern prefixes, so each word costs one dictionary step regardless of
+    the number of patterns.
+
+    Args:
+        entities (Dict[str, Sequence[str]]): Ticker -> company aliases.
+        min_symbol_length (int): Shortest ticker matched as a bare
+            upper-case word; shorter ones match as cashtags only.
+    """
+
+    def __init__(self, entities: Dict[str, Sequence[str]], min_symbol_length: int = 2):
+        self.entities = list(entities)
+        # transitions, failure links and (entity, exact token or None, length) outputs per state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Optional[str], int]]] = [[]]
+
+        for e, ticker in enumerate(self.entities):
+            self._add([f"${ticker.lower()}"], e, None)
+            if len(ticker) >= min_symbol_length:
+                self._add([ticker.lower()], e, ticker)
+            for alias in entities[ticker]:
+                tokens = [t.lower() for t in _split(alias)]
+                if tokens:
+                    self._add(tokens, e, None)
+        self._link()
+        # every token of any pattern; other tokens always lead back to the root
+        self._vocab = frozenset(token for state in self._goto for token in state)
+
+    def _add(self, tokens: List[str], entity: int, exact: Optional[str]):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        out = self._out[state]
+        if (entity, None, len(tokens)) in out:
+            return  # an alias spelled like the symbol already matches it in any case
+        if exact is None:
+            out[:] = [o for o in out if o[0] != entity]
+        if (entity, exact, len(tokens)) not in out:
+            out.append((entity, exact, len(tokens)))
+
+    def _link(self):
+        todo = deque(self._goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for token, nxt in self._goto[state].items():
+                todo.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def count(self, tokens: Sequence[str], keys: Optional[Sequence[str]] = None) -> Dict[int, int]:
+        """
+        Counts matches per entity index in a token sequence.
+
+        Overlapping matches of one entity count once, so "Apple Inc" is one
+        mention even when both "Apple" and "Apple Inc" are aliases.
+
+        Args:
+            tokens (Sequence[str]): Tokens as written.
+            keys (Optional[Sequence[str]]): The same tokens lower-cased, if
+                already at hand.
+        """
+        keys = list(map(str.lower, tokens)) if keys is None else keys
+        vocab = self._vocab
+        if vocab.isdisjoint(keys):
+            return {}
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: Dict[int, int] = {}
+        # position of the last token of each entity's last counted match
+        ends: Dict[int, int] = {}
+        state, prev = 0, -2
+        # only pattern tokens can move the automaton; a gap resets it to the root
+        for pos in [i for i, key in enumerate(keys) if key in vocab]:
+            if pos != prev + 1:
+                state = 0
+            prev = pos
+            key = keys[pos]
+            while state and key not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(key, 0)
+            if state:
+                for entity, exact, length in out[state]:
+                    if (exact is None or tokens[pos] == exact) and pos - length >= ends.get(entity, -1):
+                        hits[entity] = hits.get(entity, 0) + 1
+                        ends[entity] = pos
+        return hits
+
+    def find(self, *texts: Optional[str]) -> Dict[str, int]:
+        """
+        Finds entities mentioned in one or more fields of an article.
+
+        Returns:
+            Dict[str, int]: Ticker -> number of mentions.
+        """
+        return {self.entities[e]: n for e, n in self.count(_tokens(texts)).items()}
+
+    def tag(self, frame: pd.DataFrame, fields: Sequence[str] = TEXT_FIELDS) -> pd.DataFrame:
+        """
+        Tags every row of a frame.
+
+        Args:
+            frame (pd.DataFrame): Rows with the text ``fields``.
+            fields (Sequence[str]): Columns to scan; missing ones are skipped.
+
+        Returns:
+            pd.DataFrame: One row per (row position, entity) with 'row',
+            'entity' and 'hits'.
+        """
+        columns = [frame[f].astype("string").to_numpy(dtype=object, na_value="").tolist()
+                   for f in fields if f in frame.columns]
+        n_rows = len(frame) if columns else 0
+        rows, entities, counts = [], [], []
+        # tokenize the whole frame in one pass, then cut it into rows at the row breaks
+        text = f" {_ROW_BREAK} ".join(f" {_FIELD_BREAK} ".join(texts) for texts in zip(*columns))
+        lower = text.lower()
+        vocab = self._vocab
+        if n_rows and (len(vocab) > _PREFILTER_WORDS or any(word in lower for word in vocab)):
+            tokens, keys = _split(text), _split(lower)
+            if tokens.count(_ROW_BREAK) != n_rows - 1:
+                # separator characters inside the text; fall back to row by row
+                tokens = [t for texts in zip(*columns) for t in _tokens(texts) + [_ROW_BREAK]][:-1]
+            if len(keys) != len(tokens):
+                keys = list(map(str.lower, tokens))  # lower-casing moved a word boundary
+
+            start = 0
+            for i in range(n_rows):
+                end = tokens.index(_ROW_BREAK, start) if i < n_rows - 1 else len(tokens)
+                row_keys = keys[start:end]
+                if not vocab.isdisjoint(row_keys):
+                    for e, n in self.count(tokens[start:end], row_keys).items():
+                        rows.append(i)
+                        entities.append(e)
+                        counts.append(n)
+                start = end + 1
+        return pd.DataFrame({
+            "row": np.asarray(rows, dtype=np.int32),
+            "entity": np.asarray(self.entities, dtype=object)[np.asarray(entities, dtype=np.intp)],
+            "hits": np.asarray(counts, dtype=np.int32),
+        })
+
+
+def _split(text: str) -> List[str]:
+    return text.translate(_SEPARATORS).split()
+
+
+def _tokens(texts: Sequence[Optional[str]]) -> List[str]:
+    tokens: List[str] = []
+    for text in texts:
+        if isinstance(text, str) and text:
+            if tokens:
+                tokens.append(_FIELD_BREAK)
+            tokens.extend(t for t in _split(text) if t not in (_FIELD_BREAK, _ROW_BREAK))
+    return tokens
+
+
+def article_ids(frame: pd.DataFrame, source: Optional[str] = None) -> np.ndarray:
+    """
+    Hashes (source, date, title, description, content) into stable uint64 ids.
+
+    Args:
+        frame (pd.DataFrame): Rows with 'date' and the text fields, and a
+            'source' column unless ``source`` is given.
+        source (Optional[str]): Source label shared by all rows.
+
+    Returns:
+        np.ndarray: One uint64 id per row.
+    """
+    sources = frame["source"].astype(str).tolist() if source is None else [source] * len(frame)
+    dates = pd.to_datetime(frame["date"]).astype("datetime64[ns]").astype("int64").tolist()
+    fields = [frame[f].fillna("").astype(str).tolist() for f in TEXT_FIELDS]
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b("\x1f".join(map(str, key)).encode(), digest_size=8).digest(), "little")
+         for key in zip(sources, dates, *fields)),
+        dtype=np.uint64, count=len(frame)
+    )
+
+
+def _partitions(news_root: str) -> Dict[str, int]:
+    paths = glob.glob(os.path.join(news_root, "source=*", "ticker=*", "month=*", "part.parquet"))
+    return {os.path.relpath(p, news_root): os.stat(p).st_mtime_ns for p in paths}
+
+
+def _partition_value(partition: str, key: str) -> str:
+    for part in partition.split(os.sep):
+        if part.startswith(key + "="):
+            return part[len(key) + 1:]
+    raise ValueError(f"no {key}= in partition path {partition}")
+
+
+def _scan(news_root: str, partitions: Sequence[str], matcher: EntityMatcher) -> pd.DataFrame:
+    frames = []
+    with span("entities.tag", unit="articles") as s:
+        for partition in sorted(partitions):
+            df = pq.read_table(os.path.join(news_root, partition), columns=["date"] + TEXT_FIELDS).to_pandas()
+            s.items = (s.items or 0) + len(df)
+            tags = matcher.tag(df)
+            if tags.empty:
+                continue
+            tags["partition"] = partition
+            tags["article_id"] = article_ids(df.iloc[tags["row"].to_numpy()],
+                                             source=_partition_value(partition, "source"))
+            frames.append(tags)
+    if not frames:
+        return _empty_postings().assign(entity=pd.Series(dtype=object))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _postings_path(index_root: str, entity: str) -> str:
+    return os.path.join(index_root, "postings", f"{entity}.parquet")
+
+
+def _empty_postings() -> pd.DataFrame:
+    return _POSTINGS_SCHEMA.empty_table().to_pandas()
+
+
+def _read_postings(index_root: str, entity: str) -> pd.DataFrame:
+    path = _postings_path(index_root, entity)
+    if not os.path.exists(path):
+        return _empty_postings()
+    return pq.read_table(path).to_pandas()
+
+
+def _write_postings(index_root: str, entity: str, postings: pd.DataFrame):
+    path = _postings_path(index_root, entity)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    postings = postings.sort_values(["partition", "row"], kind="stable")
+    table = pa.Table.from_pandas(postings[_POSTINGS_SCHEMA.names], schema=_POSTINGS_SCHEMA, preserve_index=False)
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _load_state(index_root: str) -> dict:
+    path = os.path.join(index_root, _STATE_FILE)
+    if not os.path.exists(path):
+        return {"entities": {}, "partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(index_root: str, state: dict):
+    path = os.path.join(index_root, _STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def update_entity_index(
+    entities: Dict[str, Sequence[str]],
+    news_root: str = NEWS_STORE_ROOT,
+    index_root: str = INDEX_ROOT,
+    min_symbol_length: int = 2
+) -> dict:
+    """
+    Brings the inverted index in line with the news store and entity list.
+
+    - Partitions that are new or were recompacted since the last update are
+      tagged with the existing entities; postings into rewritten or deleted
+      partitions are dropped first.
+    - New entities, and entities whose aliases changed, are tagged over the
+      whole store with a matcher holding only their patterns.
+    - Entities no longer listed lose their postings.
+
+    Args:
+        entities (Dict[str, Sequence[str]]): Ticker -> company aliases.
+        news_root (str): Root of the partitioned news store.
+        index_root (str): Root of the entity index.
+        min_symbol_length (int): See ``EntityMatcher``.
+
+    Returns:
+        dict: Counts of 'partitions' and 'entities' tagged, and 'mentions' added.
+    """
+    entities = {str(t): sorted(set(aliases)) for t, aliases in entities.items()}
+    state = _load_state(index_root)
+    current = _partitions(news_root)
+
+    if state.get("min_symbol_length", min_symbol_length) != min_symbol_length:
+        # matching rules changed: retag everything, still removing dropped tickers
+        state = {"entities": {t: None for t in state["entities"]}, "partitions": {}}
+    known = state["entities"]
+    indexed = state["partitions"]
+    stale = {p for p, mtime in indexed.items() if current.get(p) != mtime}
+    fresh = {p for p, mtime in current.items() if indexed.get(p) != mtime}
+    added = {t: a for t, a in entities.items() if known.get(t) != a}
+    kept = {t: a for t, a in entities.items() if t not in added}
+
+    scans = []
+    if added:
+        scans.append(_scan(news_root, current, EntityMatcher(added, min_symbol_length)))
+    if kept and fresh:
+        scans.append(_scan(news_root, fresh, EntityMatcher(kept, min_symbol_length)))
+    tags = pd.concat(scans, ignore_index=True) if scans else None
+    new_postings = dict(tuple(tags.groupby("entity", sort=False))) if tags is not None else {}
+
+    for entity in set(known) - set(entities):
+        if os.path.exists(_postings_path(index_root, entity)):
+            os.remove(_postings_path(index_root, entity))
+    for entity in added:
+        _write_postings(index_root, entity, new_postings.get(entity, _empty_postings()))
+    if stale or fresh:
+        for entity in kept:
+            postings = _read_postings(index_root, entity)
+            postings = postings[~postings["partition"].isin(stale)]
+            if entity in new_postings:
+                postings = pd.concat([postings, new_postings[entity]], ignore_index=True)
+            _write_postings(index_root, entity, postings)
+
+    os.makedirs(index_root, exist_ok=True)
+    _save_state(index_root, {"entities": entities, "partitions": current,
+                             "min_symbol_length": min_symbol_length})
+    summary = {
+        "partitions": len(current) if added else len(fresh),
+        "entities": len(added),
+        "mentions": 0 if tags is None else len(tags),
+    }
+    if added or fresh or stale:
+        print(f"[Entities] Tagged {summary['partitions']} partitions for {len(added)} new and "
+              f"{len(kept) if fresh else 0} existing tickers; {summary['mentions']} mentions indexed")
+    return summary
+
+
+def lookup(entity: str, index_root: str = INDEX_ROOT) -> np.ndarray:
+    """
+    Returns the ids of articles mentioning a ticker.
+
+    Returns:
+        np.ndarray: Sorted unique uint64 article ids (empty if unknown).
+    """
+    return np.unique(_read_postings(index_root, entity)["article_id"].to_numpy(dtype=np.uint64))
+
+
+def load_mentions(
+    tickers: Sequence[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    news_root: str = NEWS_STORE_ROOT,
+    index_root: str = INDEX_ROOT
+) -> pd.DataFrame:
+    """
+    Reads the news rows that mention each ticker, through the index.
+
+    Only partitions holding a posting for one of the tickers (and inside the
+    date range) are opened, and only the posted rows are taken from them.
+    An article fetched under several tickers is returned once per ticker it
+    mentions, with 'ticker' set to the mentioned ticker.
+
+    Args:
+        tickers (Sequence[str]): Tickers to load.
+        start_date (Optional[str]): First date to include (YYYY-MM-DD).
+        end_date (Optional[str]): Last date to include (YYYY-MM-DD).
+        columns (Optional[Sequence[str]]): Columns to return. Defaults to
+            ``NEWS_COLUMNS``; 'article_id' may be requested too.
+        news_root (str): Root of the partitioned news store.
+        index_root (str): Root of the entity index.
+
+    Returns:
+        pd.DataFrame: Rows like ``news_store.load_news`` with categorical
+        'source' and 'ticker'.
+    """
+    columns = list(columns or NEWS_COLUMNS)
+    postings = pd.concat(
+        [_empty_postings().assign(ticker=pd.Series(dtype=object))]
+        + [_read_postings(index_root, t).assign(ticker=t) for t in tickers],
+        ignore_index=True
+    )
+
+    months = postings["partition"].map(lambda p: _partition_value(p, "month"))
+    keep = np.ones(len(postings), dtype=bool)
+    if start_date is not None:
+        keep &= (months >= start_date[:7]).to_numpy()
+    if end_date is not None:
+        keep &= (months <= end_date[:7]).to_numpy()
+    postings = postings[keep].drop_duplicates(["ticker", "article_id"])
+
+    file_columns = [c for c in ["date"] + TEXT_FIELDS if c in columns or c == "date"]
+    frames = []
+    with span("entities.load", unit="rows") as s:
+        for partition, group in postings.groupby("partition", sort=True):
+            table = pq.read_table(os.path.join(news_root, partition), columns=file_columns)
+            df = table.take(pa.array(group["row"].to_numpy())).to_pandas()
+            df["source"] = _partition_value(partition, "source")
+            df["ticker"] = group["ticker"].to_numpy()
+            df["article_id"] = group["article_id"].to_numpy()
+            frames.append(df)
+        news = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            {c: pd.Series(dtype=object) for c in file_columns + ["source", "ticker", "article_id"]})
+        s.items = len(news)
+
+    if start_date is not None:
+        news = news[news["date"] >= pd.Timestamp(start_date)]
+    if end_date is not None:
+        news = news[news["date"] < pd.Timestamp(end_date) + pd.Timedelta(days=1)]
+    news = news[columns].reset_index(drop=True)
+    for col in ("source", "ticker"):
+        if col in news.columns:
+            news[col] = news[col].astype("category")
+    return news
@@ -1,4 +1,17 @@
+"""
+Evaluation metrics for return forecasts.
+
+Includes:
+- Pooled MSE, Spearman IC and directional accuracy for a single test set
+- Batched per-date cross-sectional IC, rolling IC, IC decay and rolling hit
+  rate over (date x ticker) prediction and return matrices
+"""
+
+import warnings
+from typing import Tuple
+
 import numpy as np
+import pandas as pd
 from scipy.stats import spearmanr
 from sklearn.metrics import mean_squared_error
 
@@ -62,4 +75,194 @@ def evaluate_model(model, X_test: np.ndarray, y_test: np.ndarray, y_pred: np.nda
         "MSE": evaluate_mse(y_test, y_pred),
         "IC": evaluate_ic(y_test, y_pred),
         "Directional Accuracy": evaluate_directional_accuracy(y_test, y_pred)
-    }
\ No newline at end of file
+    }
+
+
+def rank_rows(values: np.ndarray) -> np.ndarray:
+    """
+    Ranks each row of a matrix, averaging ties and skipping NaNs.
+
+    All rows are ranked in one sort, so this replaces a per-date loop over
+    ``scipy.stats.rankdata``.
+
+    Args:
+        values (np.ndarray): Matrix of shape (n_dates, n_tickers).
+
+    Returns:
+        np.ndarray: 1-based average ranks within each row; NaN where the input is NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_rows, n_cols = values.shape
+    order = np.argsort(values, axis=1, kind="stable")  # NaNs sort last
+    sorted_vals = np.take_along_axis(values, order, axis=1)
+
+    # a new tie group starts at each row start and wherever the value changes
+    starts = np.ones_like(sorted_vals, dtype=bool)
+    starts[:, 1:] = sorted_vals[:, 1:] != sorted_vals[:, :-1]
+    group = np.cumsum(starts.ravel()) - 1
+
+    position = np.tile(np.arange(1, n_cols + 1, dtype=np.float64), n_rows)
+    n_groups = group[-1] + 1 if group.size else 0
+    first = np.full(n_groups, np.inf)
+    last = np.full(n_groups, -np.inf)
+    np.minimum.at(first, group, position)
+    np.maximum.at(last, group, position)
+    avg = ((first + last) / 2)[group].reshape(n_rows, n_cols)
+
+    ranks = np.empty_like(avg)
+    np.put_along_axis(ranks, order, avg, axis=1)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def cross_sectional_ic(y_true: np.ndarray, y_pred: np.ndarray) -> np.ndarray:
+    """
+    Computes the Spearman IC across tickers for every date at once.
+
+    Args:
+        y_true (np.ndarray): Realized returns, shape (n_dates, n_tickers).
+        y_pred (np.ndarray): Predicted returns, same shape. NaN marks missing.
+
+    Returns:
+        np.ndarray: IC per date; NaN for dates with fewer than two valid
+        pairs or no variation.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    valid = ~(np.isnan(y_true) | np.isnan(y_pred))
+    rt = rank_rows(np.where(valid, y_true, np.nan))
+    rp = rank_rows(np.where(valid, y_pred, np.nan))
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # dates with no valid pairs
+        dt = rt - np.nanmean(rt, axis=1, keepdims=True)
+        dp = rp - np.nanmean(rp, axis=1, keepdims=True)
+        cov = np.nansum(dt * dp, axis=1)
+        ic = cov / np.sqrt(np.nansum(dt ** 2, axis=1) * np.nansum(dp ** 2, axis=1))
+    ic[valid.sum(axis=1) < 2] = np.nan
+    return ic
+
+
+def ic_summary(ic: np.ndarray) -> dict:
+    """
+    Summarizes a per-date IC series.
+
+    Args:
+        ic (np.ndarray): IC per date.
+
+    Returns:
+        dict: IC mean, IC IR (mean / std) and the t-statistic of the mean.
+    """
+    ic = np.asarray(ic, dtype=np.float64)
+    ic = ic[~np.isnan(ic)]
+    if len(ic) < 2:
+        return {"IC Mean": float(np.mean(ic)) if len(ic) else np.nan, "IC IR": np.nan, "IC t-stat": np.nan}
+    mean, std = ic.mean(), ic.std(ddof=1)
+    ir = mean / std if std > 0 else np.nan
+    return {"IC Mean": float(mean), "IC IR": float(ir), "IC t-stat": float(ir * np.sqrt(len(ic)))}
+
+
+def ic_decay(y_true: np.ndarray, y_pred: np.ndarray, max_lag: int = 5) -> np.ndarray:
+    """
+    Mean cross-sectional IC of predictions against returns ``lag`` dates later.
+
+    All lags are stacked into one matrix and ranked in a single pass.
+
+    Args:
+        y_true (np.ndarray): Realized returns, shape (n_dates, n_tickers).
+        y_pred (np.ndarray): Predicted returns, same shape.
+        max_lag (int): Largest lag in dates.
+
+    Returns:
+        np.ndarray: Mean IC for lags 0..max_lag.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    n_dates, n_tickers = y_true.shape
+
+    shifted_true = np.full((max_lag + 1, n_dates, n_tickers), np.nan)
+    for lag in range(max_lag + 1):
+        shifted_true[lag, :n_dates - lag] = y_true[lag:]
+    ic = cross_sectional_ic(
+        shifted_true.reshape(-1, n_tickers),
+        np.broadcast_to(y_pred, shifted_true.shape).reshape(-1, n_tickers)
+    ).reshape(max_lag + 1, n_dates)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmean(ic, axis=1)
+
+
+def _rolling_ratio(num: np.ndarray, den: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sum(num) / sum(den) over the last ``window`` rows via cumulative sums.
+    """
+    cn = np.concatenate([[0.0], np.cumsum(num)])
+    cd = np.concatenate([[0.0], np.cumsum(den)])
+    lo = np.maximum(np.arange(1, len(num) + 1) - window, 0)
+    hi = np.arange(1, len(num) + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = (cn[hi] - cn[lo]) / (cd[hi] - cd[lo])
+    out[hi - lo < window] = np.nan
+    return out
+
+
+def to_matrix(dates, tickers, values) -> pd.DataFrame:
+    """
+    Pivots stacked (date, ticker, value) samples into a (date x ticker) matrix.
+    """
+    return pd.DataFrame({"date": dates, "ticker": tickers, "value": values}).pivot_table(
+        index="date", columns="ticker", values="value", aggfunc="mean"
+    )
+
+
+def evaluate_panel(
+    dates,
+    tickers,
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    window: int = 21,
+    max_lag: int = 5
+) -> Tuple[dict, pd.DataFrame]:
+    """
+    Evaluates multi-ticker predictions with per-date cross-sectional metrics.
+
+    Args:
+        dates: Date of each sample.
+        tickers: Ticker of each sample.
+        y_true (np.ndarray): Realized returns.
+        y_pred (np.ndarray): Predicted returns.
+        window (int): Rolling window in dates for rolling IC and hit rate.
+        max_lag (int): Largest lag for the IC decay curve.
+
+    Returns:
+        Tuple[dict, pd.DataFrame]: Summary metrics (MSE, pooled IC,
+        Directional Accuracy, IC Mean, IC IR, IC t-stat and IC Decay by lag),
+        and a per-date frame with IC, rolling IC, hit rate and rolling hit rate.
+    """
+    true_m = to_matrix(dates, tickers, y_true)
+    pred_m = to_matrix(dates, tickers, y_pred).reindex(index=true_m.index, columns=true_m.columns)
+    T, P = true_m.to_numpy(), pred_m.to_numpy()
+
+    ic = cross_sectional_ic(T, P)
+    valid = ~(np.isnan(T) | np.isnan(P))
+    hits = ((np.sign(T) == np.sign(P)) & valid).sum(axis=1).astype(float)
+    counts = valid.sum(axis=1).astype(float)
+    ic_filled = np.nan_to_num(ic)
+    ic_present = (~np.isnan(ic)).astype(float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        series = pd.DataFrame({
+            "IC": ic,
+            "Rolling IC": _rolling_ratio(ic_filled, ic_present, window),
+            "Hit Rate": hits / counts,
+            "Rolling Hit Rate": _rolling_ratio(hits, counts, window),
+        }, index=true_m.index)
+
+    metrics = {
+        "MSE": evaluate_mse(y_true, y_pred),
+        "IC": evaluate_ic(y_true, y_pred),
+        "Directional Accuracy": evaluate_directional_accuracy(y_true, y_pred),
+        **ic_summary(ic),
+        "IC Decay": ic_decay(T, P, max_lag).tolist(),
+    }
+    return metrics, series
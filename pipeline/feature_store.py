@@ -0,0 +1,392 @@
+"""
+Memory-mapped, versioned store of lagged feature matrices.
+
+Includes:
+- X, y, target dates and ticker codes of ``build_panel_dataset`` saved as
+  .npy files and loaded with ``mmap_mode="r"``, so the trainer and evaluator
+  read them without copying them into memory
+- One entry per (lookback, horizon, feature set, tickers, feature code
+  version), and within it one version per fingerprint of the source prices
+  and sentiment
+- Appending new days in place when the sources only grew: rows for the new
+  target dates are built from a short tail of the sources and written after
+  the existing rows, which earlier versions keep referring to by row count
+- A new generation of files when history itself changed (e.g. re-adjusted
+  prices or late news), keeping the previous ``KEEP_GENERATIONS - 1``
+  generations for readers that still map them
+
+Layout:
+    {store_root}/{key}/_meta.json    # parameters and versions
+    {store_root}/{key}/g{n}/X.npy    # float64 (rows, lookback * n_features)
+    {store_root}/{key}/g{n}/y.npy    # float64 (rows,)
+    {store_root}/{key}/g{n}/dates.npy    # datetime64[ns] (rows,)
+    {store_root}/{key}/g{n}/tickers.npy  # int32 index into the key's tickers
+"""
+
+import hashlib
+import inspect
+import io
+import json
+import os
+import shutil
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pipeline import features as features_module
+from pipeline.features import build_panel_dataset
+
+STORE_ROOT = "data/store/features"
+KEEP_GENERATIONS = 2
+_META_FILE = "_meta.json"
+_ARRAYS = {"X": np.float64, "y": np.float64, "dates": "datetime64[ns]", "tickers": np.int32}
+
+
+def _load_meta(entry_dir: str) -> Optional[dict]:
+    path = os.path.join(entry_dir, _META_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_meta(entry_dir: str, meta: dict):
+    os.makedirs(entry_dir, exist_ok=True)
+    path = os.path.join(entry_dir, _META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def feature_params(price_df: pd.DataFrame, sentiment_df: pd.DataFrame, lookback: int, horizon: int) -> dict:
+    """
+    Returns the parameters identifying a feature matrix, apart from the data.
+
+    Args:
+        price_df (pd.DataFrame): Daily closes, one column per ticker.
+        sentiment_df (pd.DataFrame): Sentiment rows passed to ``build_panel_dataset``.
+        lookback (int): Days per window.
+        horizon (int): Days ahead of the target.
+
+    Returns:
+        dict: Lookback, horizon, feature columns, tickers and a hash of the
+        feature-building code.
+    """
+    source = inspect.getsource(features_module)
+    return {
+        "lookback": int(lookback),
+        "horizon": int(horizon),
+        "features": list(sentiment_df.select_dtypes("number").columns),
+        "tickers": [str(t) for t in price_df.columns],
+        "code": hashlib.sha256(source.encode("utf-8")).hexdigest()[:16],
+    }
+
+
+def feature_key(params: dict) -> str:
+    """
+    Hashes ``feature_params`` output into the entry's directory name.
+    """
+    payload = json.dumps(params, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def source_fingerprint(price_df: pd.DataFrame, sentiment_df: pd.DataFrame, end=None) -> str:
+    """
+    Hashes the source data that feature rows up to ``end`` depend on.
+
+    A row for target date ``d`` only uses prices and sentiment dated on or
+    before ``d``, so two sources with equal fingerprints up to ``end`` yield
+    identical rows up to ``end``.
+
+    Args:
+        price_df (pd.DataFrame): Daily closes, one column per ticker.
+        sentiment_df (pd.DataFrame): Sentiment rows with 'date' and 'ticker'.
+        end: Last date to include. Defaults to the last price date.
+
+    Returns:
+        str: Hex digest.
+    """
+    end = pd.Timestamp(price_df.index.max() if end is None else end)
+    prices = price_df.loc[:end]
+    sentiment = sentiment_df.assign(date=pd.to_datetime(sentiment_df["date"]))
+    sentiment = sentiment[sentiment["date"] <= end].sort_values(["date", "ticker"], kind="stable")
+
+    h = hashlib.sha256()
+    h.update(repr(list(prices.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(prices, index=True).to_numpy().tobytes())
+    h.update(repr(list(sentiment.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(sentiment, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write_generation(gen_dir: str, arrays: dict):
+    tmp_dir = gen_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, dtype in _ARRAYS.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name], dtype=dtype))
+    # a leftover directory under this name was never recorded in the meta file
+    shutil.rmtree(gen_dir, ignore_errors=True)
+    os.replace(tmp_dir, gen_dir)
+
+
+_HEADER_FORMATS = {
+    (1, 0): (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+    (2, 0): (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0),
+}
+
+
+def _read_npy_header(f) -> Tuple[tuple, bool, np.dtype, int, tuple]:
+    """
+    Reads an .npy header from the start of ``f``.
+
+    Returns:
+        Tuple: shape, fortran_order, dtype, data offset and the
+        (read, write) header functions of the file's format version.
+    """
+    f.seek(0)
+    formats = _HEADER_FORMATS[np.lib.format.read_magic(f)]
+    shape, fortran_order, dtype = formats[0](f)
+    return shape, fortran_order, dtype, f.tell(), formats
+
+
+def _grown_header(path: str, rows: int) -> Tuple[bytes, int]:
+    """
+    Builds the header of an .npy file for ``rows`` rows without touching it.
+
+    Returns:
+        Tuple[bytes, int]: The new header (magic included) and the length of
+        the current one. They must match for an in-place append.
+    """
+    with open(path, "rb") as f:
+        shape, fortran_order, dtype, offset, (_, write) = _read_npy_header(f)
+    buf = io.BytesIO()
+    write(buf, {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran_order,
+                "shape": (rows,) + tuple(shape[1:])})
+    return buf.getvalue(), offset
+
+
+def _append_npy(path: str, values: np.ndarray, at: int, header: bytes):
+    """
+    Writes ``values`` as rows ``at ..`` of an .npy file and replaces its header.
+
+    ``header`` comes from ``_grown_header`` and must be as long as the
+    current header; ``np.save`` pads headers so the row count usually fits.
+    Data is written before the header, and versions record their own row
+    counts, so an interrupted append never changes what existing versions read.
+    """
+    with open(path, "r+b") as f:
+        shape, _, dtype, offset, _ = _read_npy_header(f)
+        if len(header) != offset:
+            raise RuntimeError(f"Header of {path} cannot grow in place.")
+        values = np.ascontiguousarray(values, dtype=dtype)
+        row_bytes = dtype.itemsize * int(np.prod(shape[1:], dtype=np.int64))
+        f.seek(offset + at * row_bytes)
+        f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+        f.seek(0)
+        f.write(header)
+
+
+def _arrays(X, y, dates, tickers, labels: List[str]) -> dict:
+    codes = pd.Index(labels).get_indexer(pd.Index(tickers, dtype=object).astype(str))
+    return {"X": X, "y": y, "dates": np.asarray(dates, dtype="datetime64[ns]"), "tickers": codes}
+
+
+class FeatureSet:
+    """
+    Handle to one stored version of a feature matrix.
+
+    Pickles to a few strings, so it can be passed between pipeline stages and
+    processes; ``load`` maps the arrays.
+
+    Args:
+        key (str): Entry key from ``feature_key``.
+        version (int): Version within the entry.
+        fingerprint (str): Source fingerprint of the version.
+        rows (int): Number of samples.
+        store_root (str): Store directory.
+    """
+
+    def __init__(self, key: str, version: int, fingerprint: str, rows: int, store_root: str = STORE_ROOT):
+        self.key = key
+        self.version = version
+        self.fingerprint = fingerprint
+        self.rows = rows
+        self.store_root = store_root
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __repr__(self) -> str:
+        return f"FeatureSet(key={self.key!r}, version={self.version}, rows={self.rows})"
+
+    def load(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Maps the version's arrays without reading them into memory.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: X, y and
+            dates as read-only views of the files, and the ticker of each
+            sample, in the layout ``build_panel_dataset`` returns.
+        """
+        return load_features(self.key, self.version, self.store_root)
+
+
+def load_features(key: str, version: Optional[int] = None, store_root: str = STORE_ROOT
+                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Maps a stored version of a feature matrix.
+
+    Args:
+        key (str): Entry key.
+        version (Optional[int]): Version to load. Defaults to the latest.
+        store_root (str): Store directory.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: X, y, dates
+        (read-only, memory-mapped) and tickers.
+    """
+    entry_dir = os.path.join(store_root, key)
+    meta = _load_meta(entry_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No feature entry {key} in {store_root}.")
+    matches = [v for v in meta["versions"] if version is None or v["version"] == version]
+    if not matches:
+        raise FileNotFoundError(f"Version {version} of feature entry {key} was pruned; rebuild it.")
+    entry = matches[-1]
+
+    gen_dir = os.path.join(entry_dir, f"g{entry['generation']}")
+    rows = entry["rows"]
+    # np.asarray drops the memmap subclass but keeps the mapping as the base
+    X, y, dates, codes = (np.asarray(np.load(os.path.join(gen_dir, f"{name}.npy"), mmap_mode="r"))[:rows]
+                          for name in _ARRAYS)
+    tickers = np.asarray(meta["params"]["tickers"], dtype=object)[codes]
+    return X, y, dates, tickers
+
+
+def list_versions(key: str, store_root: str = STORE_ROOT) -> pd.DataFrame:
+    """
+    Lists the stored versions of an entry, oldest first.
+    """
+    meta = _load_meta(os.path.join(store_root, key))
+    return pd.DataFrame(meta["versions"] if meta else [])
+
+
+def _add_version(entry_dir: str, meta: dict, generation: int, rows: int, fingerprint: str,
+                 source_end: pd.Timestamp, store_root: str) -> FeatureSet:
+    version = meta["next_version"]
+    meta["next_version"] += 1
+    meta["versions"].append({
+        "version": version,
+        "generation": generation,
+        "rows": int(rows),
+        "fingerprint": fingerprint,
+        "source_end": str(pd.Timestamp(source_end).date()),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    })
+
+    # drop generations beyond the newest KEEP_GENERATIONS
+    generations = sorted({v["generation"] for v in meta["versions"]})
+    for old in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(os.path.join(entry_dir, f"g{old}"), ignore_errors=True)
+    meta["versions"] = [v for v in meta["versions"] if v["generation"] in generations[-KEEP_GENERATIONS:]]
+    _save_meta(entry_dir, meta)
+    return FeatureSet(os.path.basename(entry_dir), version, fingerprint, rows, store_root)
+
+
+def _tail_dataset(price_df: pd.DataFrame, sentiment_df: pd.DataFrame, lookback: int, horizon: int, after):
+    """
+    Builds only the samples whose target date is after ``after``.
+
+    Prices are cut to the rows the new windows need. Sentiment is cut to the
+    same span, plus one row per ticker before it holding the forward-filled
+    value the full history would carry into the span, so the rows equal those
+    of ``build_panel_dataset`` over the full sources.
+    """
+    after = pd.Timestamp(after)
+    first_new = price_df.index.searchsorted(after, side="right")
+    prices = price_df.iloc[max(first_new - lookback - horizon - 1, 0):]
+    start = prices.index[0]
+
+    sentiment = sentiment_df.assign(date=pd.to_datetime(sentiment_df["date"]))
+    history, recent = sentiment[sentiment["date"] < start], sentiment[sentiment["date"] >= start]
+    feature_cols = list(sentiment.select_dtypes("number").columns)
+    if len(history):
+        carried = (history.pivot_table(index="date", columns="ticker", values=feature_cols, aggfunc="mean")
+                   .resample("D").mean().ffill().iloc[-1].unstack(0))
+        seed = carried.dropna(how="all").rename_axis("ticker").reset_index()
+        seed.insert(0, "date", start - pd.Timedelta(days=1))
+        recent = pd.concat([seed[["date", "ticker"] + feature_cols], recent[["date", "ticker"] + feature_cols]],
+                           ignore_index=True)
+
+    X, y, dates, tickers = build_panel_dataset(prices, recent, lookback, horizon)
+    new = pd.to_datetime(dates) > after
+    return X[new], y[new], dates[new], tickers[new]
+
+
+def panel_features(
+    price_df: pd.DataFrame,
+    sentiment_df: pd.DataFrame,
+    lookback: int = 5,
+    horizon: int = 1,
+    store_root: str = STORE_ROOT
+) -> FeatureSet:
+    """
+    Returns the stored ``build_panel_dataset`` output for these sources.
+
+    Reuses a version with the same source fingerprint if one exists. If the
+    sources only gained days after the latest version, the new rows are
+    built and appended to its files. Otherwise the full matrix is built into
+    a new generation.
+
+    Args:
+        price_df (pd.DataFrame): Daily closes, one column per ticker.
+        sentiment_df (pd.DataFrame): Sentiment rows with 'date', 'ticker' and
+            numeric feature columns.
+        lookback (int): Days per window.
+        horizon (int): Days ahead of the target.
+        store_root (str): Store directory.
+
+    Returns:
+        FeatureSet: Handle to the stored version.
+    """
+    params = feature_params(price_df, sentiment_df, lookback, horizon)
+    key = feature_key(params)
+    entry_dir = os.path.join(store_root, key)
+    end = pd.Timestamp(price_df.index.max())
+    fingerprint = source_fingerprint(price_df, sentiment_df, end)
+
+    meta = _load_meta(entry_dir) or {"params": params, "next_version": 1, "versions": []}
+    for v in reversed(meta["versions"]):
+        if v["fingerprint"] == fingerprint:
+            print(f"[Features] Loaded {key} v{v['version']} ({v['rows']} rows)")
+            return FeatureSet(key, v["version"], fingerprint, v["rows"], store_root)
+
+    latest = meta["versions"][-1] if meta["versions"] else None
+    if latest and pd.Timestamp(latest["source_end"]) < end and \
+            source_fingerprint(price_df, sentiment_df, latest["source_end"]) == latest["fingerprint"]:
+        X, y, dates, tickers = _tail_dataset(price_df, sentiment_df, lookback, horizon, latest["source_end"])
+        gen_dir = os.path.join(entry_dir, f"g{latest['generation']}")
+        arrays = _arrays(X, y, dates, tickers, params["tickers"])
+        paths = {name: os.path.join(gen_dir, f"{name}.npy") for name in arrays}
+        headers = {name: _grown_header(paths[name], latest["rows"] + len(y)) for name in arrays}
+        # check every header before writing, so a misfit leaves the generation untouched
+        if all(len(header) == offset for header, offset in headers.values()):
+            for name, values in arrays.items():
+                _append_npy(paths[name], values, latest["rows"], headers[name][0])
+            print(f"[Features] Appended {len(y)} rows after {latest['source_end']} to {key}")
+            return _add_version(entry_dir, meta, latest["generation"], latest["rows"] + len(y),
+                                fingerprint, end, store_root)
+        print(f"[Features] Headers of {key} generation {latest['generation']} cannot grow in place, "
+              f"writing a new generation")
+
+    X, y, dates, tickers = build_panel_dataset(price_df, sentiment_df, lookback, horizon)
+    generation = meta["next_version"]
+    _write_generation(os.path.join(entry_dir, f"g{generation}"), _arrays(X, y, dates, tickers, params["tickers"]))
+    print(f"[Features] Built {key} generation {generation} ({len(y)} rows)")
+    return _add_version(entry_dir, meta, generation, len(y), fingerprint, end, store_root)
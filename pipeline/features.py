@@ -7,14 +7,49 @@ prepares supervised learning datasets.
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
 from typing import Tuple
 
+from pipeline.instrument import span
+
+
+def lagged_windows(values: np.ndarray, lookback: int, horizon: int = 1, copy: bool = True) -> np.ndarray:
+    """
+    Builds flattened lookback windows over the rows of a 2D array.
+
+    Row ``k`` of the result holds rows ``k .. k + lookback - 1`` of ``values``
+    flattened in row-major order, matching the windows used by
+    ``build_dataset``. The windows are taken with a single strided view, so no
+    per-row Python work is done.
+
+    Args:
+        values (np.ndarray): Array of shape (n_days, n_features).
+        lookback (int): Number of past days per window.
+        horizon (int): Days ahead of the window end that the target lies.
+        copy (bool): Return a contiguous copy. If False, a read-only view
+            sharing memory with ``values`` is returned.
+
+    Returns:
+        np.ndarray: Array of shape (n_days - lookback - horizon, lookback * n_features).
+    """
+    values = np.ascontiguousarray(values)
+    n_rows, n_cols = values.shape
+    n_windows = max(n_rows - lookback - horizon, 0)
+    windows = as_strided(
+        values,
+        shape=(n_windows, lookback * n_cols),
+        strides=(values.strides[0], values.strides[1]),
+        writeable=False
+    )
+    return windows.copy() if copy else windows
+
 
 def build_dataset(
     price_df: pd.DataFrame,
     sentiment_df: pd.DataFrame,
     lookback: int = 5,
-    horizon: int = 1
+    horizon: int = 1,
+    copy: bool = True
 ) -> Tuple[np.ndarray, np.ndarray, list]:
     """
     Combines price and sentiment data to form a supervised learning dataset.
@@ -24,6 +59,8 @@ def build_dataset(
         sentiment_df (pd.DataFrame): Daily sentiment scores with 'date' and 'sentiment' columns.
         lookback (int): Number of past days used as input features.
         horizon (int): Days ahead to predict the return.
+        copy (bool): If False, X is a read-only view over the aligned data
+            instead of a fresh array.
 
     Returns:
         Tuple[np.ndarray, np.ndarray, list]: Features (X), targets (y), and corresponding dates.
@@ -39,13 +76,128 @@ def build_dataset(
     # Align on date
     combined = log_returns.to_frame(name='return').join(sentiment_df)
 
-    # Build supervised dataset
-    X, y, dates = [], [], []
-    for i in range(lookback, len(combined) - horizon):
-        window = combined.iloc[i - lookback:i]
-        target = combined['return'].iloc[i + horizon]
-        X.append(window.values.flatten())
-        y.append(target)
-        dates.append(combined.index[i + horizon])
+    # Build supervised dataset: window ending at day i-1 predicts day i + horizon
+    with span("features.windows", unit="rows") as s:
+        X = lagged_windows(combined.to_numpy(), lookback, horizon, copy=copy)
+        s.items = len(X)
+    if len(X) == 0:
+        return np.array([]), np.array([]), []
+    y = combined['return'].to_numpy()[lookback + horizon:]
+    dates = list(combined.index[lookback + horizon:])
+
+    return X, y, dates
+
+
+def feature_spec(lookback: int = 5, horizon: int = 1, sentiment_features=("sentiment",)) -> dict:
+    """
+    Describes the feature layout a model was trained on.
+
+    Args:
+        lookback (int): Number of past days per window.
+        horizon (int): Days ahead of the predicted return.
+        sentiment_features (Sequence[str]): Sentiment columns after 'return'
+            in each day, in the order ``build_panel_dataset`` uses.
+
+    Returns:
+        dict: 'lookback', 'horizon', 'features' (per-day columns) and
+        'columns', the names of the flattened X columns, oldest day first,
+        e.g. 'return_t-5', 'sentiment_t-5', ..., 'sentiment_t-1'.
+    """
+    features = ["return"] + list(sentiment_features)
+    return {
+        "lookback": int(lookback),
+        "horizon": int(horizon),
+        "features": features,
+        "columns": [f"{name}_t-{lookback - k}" for k in range(lookback) for name in features],
+    }
+
+
+def latest_window(price: pd.Series, sentiment_df: pd.DataFrame, lookback: int = 5) -> np.ndarray:
+    """
+    Builds the feature row for the most recent window of one ticker.
+
+    Applies the same transformations as ``build_dataset`` (log returns, daily
+    mean sentiment forward-filled onto trading days) and returns the last
+    ``lookback`` days in the same flattened layout, i.e. the input for a
+    prediction whose target is not known yet.
+
+    Args:
+        price (pd.Series): Recent daily closes with a DatetimeIndex.
+        sentiment_df (pd.DataFrame): Sentiment rows with 'date' and 'sentiment' columns.
+        lookback (int): Number of past days used as input features.
+
+    Returns:
+        np.ndarray: Array of shape (1, lookback * 2), or shape (0, lookback * 2)
+        when there is not enough history.
+    """
+    log_returns = np.log(price / price.shift(1)).dropna()
+    sentiment = sentiment_df.assign(date=pd.to_datetime(sentiment_df['date']))
+    sentiment = sentiment.set_index('date')[['sentiment']].resample('D').mean().ffill()
+    sentiment = sentiment.reindex(log_returns.index).ffill()
+    combined = log_returns.to_frame(name='return').join(sentiment)
+
+    window = combined.to_numpy(dtype=float)[-lookback:]
+    if len(window) < lookback:
+        return np.empty((0, lookback * combined.shape[1]))
+    return window.reshape(1, -1)
+
+
+def build_panel_dataset(
+    price_df: pd.DataFrame,
+    sentiment_df: pd.DataFrame,
+    lookback: int = 5,
+    horizon: int = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds a stacked supervised dataset over a (date x ticker) panel.
+
+    Returns, sentiment and lagged windows are computed for all tickers at
+    once on (date, ticker, feature) arrays, so cost does not grow with
+    per-ticker Python work. Each sample uses the same window layout as
+    ``build_dataset`` for a single ticker. Samples whose window or target
+    contains missing data (e.g. before a ticker has any news) are dropped.
+
+    Args:
+        price_df (pd.DataFrame): Daily closing prices, one column per ticker.
+        sentiment_df (pd.DataFrame): Sentiment rows with 'date', 'ticker' and
+            one or more numeric feature columns such as 'sentiment'.
+        lookback (int): Number of past days used as input features.
+        horizon (int): Days ahead to predict the return.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Features (X),
+        targets (y), and the date and ticker of each sample. Samples are
+        ordered by date, then ticker.
+    """
+    tickers = list(price_df.columns)
+    log_returns = np.log(price_df / price_df.shift(1)).iloc[1:]
+
+    # (date x ticker) grid for each sentiment feature, aligned like build_dataset
+    sentiment_df = sentiment_df.assign(date=pd.to_datetime(sentiment_df['date']))
+    feature_cols = list(sentiment_df.select_dtypes('number').columns)
+    panel = sentiment_df.pivot_table(index='date', columns='ticker', values=feature_cols, aggfunc='mean')
+    panel = panel.resample('D').mean().ffill().reindex(log_returns.index).ffill()
+
+    # (date, ticker, feature) with 'return' first, as in build_dataset
+    grids = [log_returns.to_numpy()]
+    for col in feature_cols:
+        grid = panel[col] if col in panel.columns.get_level_values(0) else pd.DataFrame(index=panel.index)
+        grids.append(grid.reindex(columns=tickers).to_numpy(dtype=float))
+    values = np.stack(grids, axis=-1)
+
+    n_days, n_tickers, n_features = values.shape
+    n_windows = max(n_days - lookback - horizon, 0)
+    if n_windows == 0:
+        return (np.empty((0, lookback * n_features)), np.empty(0),
+                np.empty(0, dtype=log_returns.index.dtype), np.empty(0, dtype=object))
+
+    # windows[s, k] = values[s:s + lookback, k, :] flattened day by day
+    with span("features.windows", items=n_windows * n_tickers, unit="rows"):
+        windows = sliding_window_view(values[:n_windows + lookback - 1], lookback, axis=0)
+        X = windows.transpose(0, 1, 3, 2).reshape(n_windows * n_tickers, lookback * n_features)
+    y = values[lookback + horizon:, :, 0].reshape(-1)
+    dates = np.repeat(log_returns.index.to_numpy()[lookback + horizon:], n_tickers)
+    ticker_ids = np.tile(np.asarray(tickers, dtype=object), n_windows)
 
-    return np.array(X), np.array(y), dates
\ No newline at end of file
+    valid = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+    return X[valid], y[valid], dates[valid], ticker_ids[valid]
@@ -2,98 +2,100 @@
 Handles data ingestion for financial return prediction.
 
 Includes:
-- Price data fetching using yfinance
+- Price data fetching using yfinance, served from the local price cache
+- News loading from the partitioned news store
+- Entity tagging of new news partitions into the ticker -> article index
 """
 
-import json
 import pandas as pd
-import yfinance as yf
-from datetime import datetime
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
 from dotenv import load_dotenv
-import glob
 
-from pipeline.reddit_fetcher import fetch_range as fetch_reddit_range
-from pipeline.newsapi_fetcher import fetch_range as fetch_newsapi_range
-from pipeline.twitter_fetcher import fetch_range as fetch_twitter_range
+from scripts.fetch_reddit import fetch_range as fetch_reddit_range
+from scripts.fetch_newsapi import fetch_range as fetch_newsapi_range
+from scripts.fetch_twitter import fetch_range as fetch_twitter_range
+from scripts.fetch_engine import FetchEngine
+from pipeline.entities import load_mentions, update_entity_index
+from pipeline.manifest import FetchManifest
+from pipeline.news_store import compact_raw_news, load_news
+from pipeline.price_store import load_prices
 
 load_dotenv()
 
+
 # price data
-def fetch_price_data(tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+def fetch_price_data(tickers: List[str], start_date: str, end_date: str, offline: bool = False) -> pd.DataFrame:
     """
-    Downloads adjusted close prices for given tickers.
+    Loads adjusted close prices for given tickers.
+
+    Prices are served from the local price cache; only missing tickers and
+    date ranges are downloaded from yfinance.
 
     Args:
         tickers (List[str]): Stock tickers.
         start_date (str): Start date (YYYY-MM-DD).
         end_date (str): End date (YYYY-MM-DD).
+        offline (bool): Serve only cached prices without any download.
 
     Returns:
         pd.DataFrame: Adjusted close prices.
     """
     print(f"[Price] Fetching price data for {tickers}...")
-    data = yf.download(tickers, start=start_date, end=end_date, auto_adjust=True)
-    return data["Close"].ffill().bfill()
+    data = load_prices(tickers, start_date, end_date, offline=offline)
+    return data.ffill().bfill()
 
 
-def fetch_news_data(tickers: List[str], start_date: str, end_date: str):
+def fetch_news_data(tickers: List[str], start_date: str, end_date: str, refresh: bool = False,
+                    max_workers: int = 4, entities: Optional[Dict[str, Sequence[str]]] = None,
+                    by_mention: bool = False):
     """
     Loads news data from disk for given tickers.
 
     Assumes that data fetching from NewsAPI, Reddit, and Twitter
     has been handled externally and data is stored in the respective
-    directories.
+    directories. Only days missing from the fetch manifest are
+    requested again. New or changed raw dumps are compacted into the
+    partitioned news store, and only the partitions for the requested
+    tickers and date range are read back. New partitions are tagged with
+    the tickers and aliases in ``entities``, updating the ticker -> article
+    index (see pipeline.entities).
 
     Args:
         tickers (List[str]): List of tickers or keywords.
         start_date (str): Start date (YYYY-MM-DD).
         end_date (str): End date (YYYY-MM-DD).
+        refresh (bool): Refetch every day in the range, ignoring the fetch manifest.
+        max_workers (int): Concurrent requests per source. Each source runs
+            in parallel under its own API rate limit.
+        entities (Optional[Dict[str, Sequence[str]]]): Ticker -> company
+            aliases to keep indexed. No tagging if None.
+        by_mention (bool): Return one row per (article, mentioned ticker)
+            through the index, instead of the rows fetched for each ticker.
+
+    Returns:
+        pd.DataFrame: One row per item with datetime64 date, title,
+        description, content, and categorical source and ticker.
     """
-    for ticker in tickers:
-        fetch_newsapi_range(ticker, start_date, end_date)
-        fetch_reddit_range(ticker, start_date, end_date)
-        fetch_twitter_range(ticker, start_date, end_date)
-
-    rows = []
-
-    # load NewsAPI articles
-    for f in glob.glob("data/raw/newsapi/*.json"):
-        with open(f) as file:
-            articles = json.load(file)
-            for a in articles:
-                rows.append({
-                    "date": a.get("publishedAt", "")[:10],
-                    "title": a.get("title", ""),
-                    "description": a.get("description", ""),
-                    "content": a.get("content", ""),
-                    "source": "NewsAPI"
-                })
-
-    # load reddit posts
-    for f in glob.glob("data/raw/reddit/*.json"):
-        with open(f) as file:
-            posts = json.load(file)
-            for p in posts:
-                rows.append({
-                    "date": datetime.utcfromtimestamp(p.get("created_utc", 0)).strftime("%Y-%m-%d"),
-                    "title": p.get("title", ""),
-                    "description": "",
-                    "content": p.get("selftext", ""),
-                    "source": "Reddit"
-                })
-
-    # load twitter tweets
-    for f in glob.glob("data/raw/twitter/*.json"):
-        with open(f) as file:
-            tweets = json.load(file)
-            for t in tweets:
-                rows.append({
-                    "date": t.get("date", "")[:10],
-                    "title": "",
-                    "description": "",
-                    "content": t.get("content", ""),
-                    "source": "Twitter"
-                })
-
-    return pd.DataFrame(rows)
\ No newline at end of file
+    fetchers = {
+        "newsapi": fetch_newsapi_range,
+        "reddit": fetch_reddit_range,
+        "twitter": fetch_twitter_range,
+    }
+
+    def fetch_source(source):
+        with FetchEngine.for_source(source, max_workers=max_workers) as engine:
+            for ticker in tickers:
+                fetchers[source](ticker, start_date, end_date, manifest=manifest, refresh=refresh, engine=engine)
+
+    with FetchManifest() as manifest:
+        manifest.sync_from_disk()
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+            list(pool.map(fetch_source, fetchers))
+
+    compact_raw_news()
+    if entities is not None:
+        update_entity_index(entities)
+    if by_mention:
+        return load_mentions(tickers, start_date, end_date)
+    return load_news(tickers, start_date, end_date)
@@ -0,0 +1,236 @@
+"""
+On-disk manifest of completed fetches.
+
+Records, per (source, ticker, day), whether the fetch completed, when, and how
+many items it returned. Fetchers consult it to request only missing or stale
+days, so interrupted backfills resume where they stopped.
+
+Usage:
+    python -m pipeline.manifest --start 2024-01-01 --end 2024-12-31 --tickers AAPL MSFT
+"""
+
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+MANIFEST_PATH = "data/fetch_manifest.sqlite"
+SOURCES = ["newsapi", "reddit", "twitter"]
+
+# a day fetched before it was this far in the past may still be missing items
+SETTLE_PERIOD = timedelta(days=1)
+
+
+def date_range(start_date: str, end_date: str) -> List[str]:
+    """
+    Lists every day from start_date to end_date (inclusive) as YYYY-MM-DD.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range((end - start).days + 1)]
+
+
+def _gaps(days: Sequence[str]) -> List[Tuple[str, str]]:
+    """
+    Collapses a sorted list of days into (first, last) runs of consecutive days.
+    """
+    runs = []
+    for day in days:
+        if runs and datetime.strptime(day, "%Y-%m-%d") - datetime.strptime(runs[-1][1], "%Y-%m-%d") == timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+class FetchManifest:
+    """
+    SQLite-backed record of fetch status per (source, ticker, day).
+
+    Args:
+        path (str): Location of the SQLite database file.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fetches ("
+            "source TEXT NOT NULL, ticker TEXT NOT NULL, day TEXT NOT NULL, "
+            "status TEXT NOT NULL, fetched_at REAL NOT NULL, n_items INTEGER NOT NULL, "
+            "PRIMARY KEY (source, ticker, day))"
+        )
+        self._conn.commit()
+
+    def record(self, source: str, ticker: str, day: str, n_items: int = 0, status: str = "complete",
+               fetched_at: Optional[float] = None):
+        """
+        Records the outcome of fetching one day.
+
+        Args:
+            source (str): Source name ('newsapi', 'reddit' or 'twitter').
+            ticker (str): Ticker or query.
+            day (str): Day fetched (YYYY-MM-DD).
+            n_items (int): Number of items returned.
+            status (str): 'complete', 'failed' or 'stale'.
+            fetched_at (Optional[float]): Unix time of the fetch. Defaults to now.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetches VALUES (?, ?, ?, ?, ?, ?)",
+                (source, ticker, day, status, fetched_at or time.time(), n_items)
+            )
+            self._conn.commit()
+
+    def mark_stale(self, source: str, ticker: str, start_date: str, end_date: str) -> int:
+        """
+        Flags completed days so the next run fetches them again.
+
+        Returns:
+            int: Number of days flagged.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE fetches SET status = 'stale' WHERE source = ? AND ticker = ? AND day BETWEEN ? AND ?",
+                (source, ticker, start_date, end_date)
+            )
+            self._conn.commit()
+        return cur.rowcount
+
+    def completed_days(self, source: str, ticker: str, start_date: str, end_date: str) -> List[str]:
+        """
+        Lists days with a complete fetch that has settled.
+
+        A day only counts as complete if it was fetched at least
+        ``SETTLE_PERIOD`` after it ended; earlier fetches may have missed
+        late items.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, fetched_at FROM fetches WHERE source = ? AND ticker = ? "
+                "AND day BETWEEN ? AND ? AND status = 'complete'",
+                (source, ticker, start_date, end_date)
+            ).fetchall()
+        done = []
+        for day, fetched_at in rows:
+            settled_at = datetime.strptime(day, "%Y-%m-%d") + timedelta(days=1) + SETTLE_PERIOD
+            if datetime.fromtimestamp(fetched_at) >= settled_at:
+                done.append(day)
+        return sorted(done)
+
+    def missing_days(self, source: str, ticker: str, start_date: str, end_date: str,
+                     refresh: bool = False) -> List[str]:
+        """
+        Lists days that still need fetching.
+
+        Args:
+            source (str): Source name.
+            ticker (str): Ticker or query.
+            start_date (str): First day (YYYY-MM-DD).
+            end_date (str): Last day (YYYY-MM-DD).
+            refresh (bool): Return every day in the range regardless of status.
+
+        Returns:
+            List[str]: Days that are missing, failed, stale or not yet settled.
+        """
+        days = date_range(start_date, end_date)
+        if refresh:
+            return days
+        done = set(self.completed_days(source, ticker, start_date, end_date))
+        return [d for d in days if d not in done]
+
+    def sync_from_disk(self, raw_root: str = "data/raw") -> int:
+        """
+        Records raw dumps already on disk that the manifest does not know about.
+
+        Args:
+            raw_root (str): Directory holding newsapi/, reddit/ and twitter/ dumps.
+
+        Returns:
+            int: Number of days added.
+        """
+        with self._lock:
+            known = set(self._conn.execute("SELECT source, ticker, day FROM fetches").fetchall())
+        added = 0
+        for source in SOURCES:
+            for path in glob.glob(os.path.join(raw_root, source, "*.json")):
+                ticker, day = os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)
+                if (source, ticker, day) in known:
+                    continue
+                with open(path) as f:
+                    n_items = len(json.load(f))
+                self.record(source, ticker, day, n_items, fetched_at=os.path.getmtime(path))
+                added += 1
+        return added
+
+    def coverage(self, tickers: Iterable[str], start_date: str, end_date: str,
+                 sources: Iterable[str] = SOURCES) -> pd.DataFrame:
+        """
+        Summarizes fetch coverage and gaps.
+
+        Returns:
+            pd.DataFrame: One row per (source, ticker) with the number of
+            expected, complete and missing days, total items and the missing
+            day ranges.
+        """
+        expected = len(date_range(start_date, end_date))
+        rows = []
+        for source in sources:
+            for ticker in tickers:
+                missing = self.missing_days(source, ticker, start_date, end_date)
+                with self._lock:
+                    n_items = self._conn.execute(
+                        "SELECT COALESCE(SUM(n_items), 0) FROM fetches WHERE source = ? AND ticker = ? "
+                        "AND day BETWEEN ? AND ? AND status = 'complete'",
+                        (source, ticker, start_date, end_date)
+                    ).fetchone()[0]
+                rows.append({
+                    "source": source,
+                    "ticker": ticker,
+                    "expected_days": expected,
+                    "complete_days": expected - len(missing),
+                    "missing_days": len(missing),
+                    "items": n_items,
+                    "gaps": _gaps(missing),
+                })
+        return pd.DataFrame(rows)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(description="Report fetch coverage and gaps.")
+    parser.add_argument("--start", default=config.START_DATE)
+    parser.add_argument("--end", default=config.END_DATE)
+    parser.add_argument("--tickers", nargs="+", default=config.TICKERS)
+    parser.add_argument("--sources", nargs="+", default=SOURCES, choices=SOURCES)
+    args = parser.parse_args()
+
+    with FetchManifest() as manifest:
+        manifest.sync_from_disk()
+        report = manifest.coverage(args.tickers, args.start, args.end, args.sources)
+
+    for row in report.itertuples():
+        print(f"{row.source:<8} {row.ticker:<6} {row.complete_days}/{row.expected_days} days, {row.items} items")
+        for first, last in row.gaps:
+            print(f"    missing {first}" + (f" .. {last}" if last != first else ""))
@@ -0,0 +1,238 @@
+"""
+Partitioned columnar store for raw news dumps.
+
+Includes:
+- Compaction of per-day JSON dumps into Parquet partitioned by source/ticker/month
+- Incremental recompaction of only the partitions whose raw files changed
+- Partition- and column-pruned loading by ticker, source and date range
+
+Layout:
+    {store_root}/source=NewsAPI/ticker=AAPL/month=2025-06/part.parquet
+"""
+
+import glob
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pipeline.instrument import span
+
+RAW_ROOT = "data/raw"
+STORE_ROOT = "data/store/news"
+
+# raw directory name -> source label
+RAW_SOURCES = {
+    "newsapi": "NewsAPI",
+    "reddit": "Reddit",
+    "twitter": "Twitter",
+}
+
+NEWS_COLUMNS = ["date", "title", "description", "content", "source", "ticker"]
+
+_FILE_SCHEMA = pa.schema([
+    ("date", pa.timestamp("ns")),
+    ("title", pa.string()),
+    ("description", pa.string()),
+    ("content", pa.string()),
+])
+_PARTITIONING = ds.partitioning(
+    pa.schema([("source", pa.string()), ("ticker", pa.string()), ("month", pa.string())]),
+    flavor="hive"
+)
+_STATE_FILE = "_compaction.json"
+
+
+def _newsapi_row(a: dict) -> dict:
+    return {
+        "date": (a.get("publishedAt") or "")[:10],
+        "title": a.get("title", ""),
+        "description": a.get("description", ""),
+        "content": a.get("content", ""),
+    }
+
+
+def _reddit_row(p: dict) -> dict:
+    return {
+        "date": datetime.utcfromtimestamp(p.get("created_utc", 0)).strftime("%Y-%m-%d"),
+        "title": p.get("title", ""),
+        "description": "",
+        "content": p.get("selftext", ""),
+    }
+
+
+def _twitter_row(t: dict) -> dict:
+    return {
+        "date": (t.get("date") or t.get("created_at") or "")[:10],
+        "title": "",
+        "description": "",
+        "content": t.get("content") or t.get("text", ""),
+    }
+
+
+_ROW_BUILDERS = {
+    "newsapi": _newsapi_row,
+    "reddit": _reddit_row,
+    "twitter": _twitter_row,
+}
+
+
+def _parse_raw_name(path: str) -> Tuple[str, str]:
+    """
+    Splits a raw dump filename like ``AAPL_2025-06-10.json`` into (ticker, date).
+    """
+    ticker, date = os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)
+    return ticker, date
+
+
+def read_raw_file(path: str, raw_dir: str) -> pd.DataFrame:
+    """
+    Loads one raw JSON dump into the store's row format.
+
+    Args:
+        path (str): Path to the JSON dump.
+        raw_dir (str): Raw directory name ('newsapi', 'reddit' or 'twitter').
+
+    Returns:
+        pd.DataFrame: Rows with date, title, description and content columns.
+    """
+    with open(path) as f:
+        items = json.load(f)
+    build = _ROW_BUILDERS[raw_dir]
+    df = pd.DataFrame([build(item) for item in items], columns=["date", "title", "description", "content"])
+    df["date"] = pd.to_datetime(df["date"], errors="coerce").astype("datetime64[ns]")
+    return df
+
+
+def _load_state(store_root: str) -> Dict[str, int]:
+    path = os.path.join(store_root, _STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(store_root: str, state: Dict[str, int]):
+    path = os.path.join(store_root, _STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+
+def compact_raw_news(raw_root: str = RAW_ROOT, store_root: str = STORE_ROOT) -> int:
+    """
+    Converts raw JSON dumps into the partitioned Parquet store.
+
+    Only (source, ticker, month) partitions with new, modified or deleted
+    raw files are rewritten; all other partitions are left untouched.
+
+    Args:
+        raw_root (str): Directory holding newsapi/, reddit/ and twitter/ dumps.
+        store_root (str): Root directory of the Parquet store.
+
+    Returns:
+        int: Number of partitions rewritten.
+    """
+    os.makedirs(store_root, exist_ok=True)
+    old_state = _load_state(store_root)
+    new_state = {}
+    groups: Dict[Tuple[str, str, str], List[str]] = {}
+
+    for raw_dir in RAW_SOURCES:
+        for path in glob.glob(os.path.join(raw_root, raw_dir, "*.json")):
+            ticker, date = _parse_raw_name(path)
+            groups.setdefault((raw_dir, ticker, date[:7]), []).append(path)
+            new_state[path] = os.stat(path).st_mtime_ns
+
+    changed = {key for key, paths in groups.items() if any(old_state.get(p) != new_state[p] for p in paths)}
+    for path in set(old_state) - set(new_state):
+        raw_dir = os.path.basename(os.path.dirname(path))
+        ticker, date = _parse_raw_name(path)
+        changed.add((raw_dir, ticker, date[:7]))
+
+    for raw_dir, ticker, month in sorted(changed):
+        part_dir = os.path.join(store_root, f"source={RAW_SOURCES[raw_dir]}", f"ticker={ticker}", f"month={month}")
+        part_file = os.path.join(part_dir, "part.parquet")
+        paths = sorted(groups.get((raw_dir, ticker, month), []))
+        if not paths:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            continue
+        with span("news.json_load", unit="articles") as s:
+            df = pd.concat([read_raw_file(p, raw_dir) for p in paths], ignore_index=True)
+            s.items = len(df)
+        os.makedirs(part_dir, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(df, schema=_FILE_SCHEMA, preserve_index=False), part_file + ".tmp")
+        os.replace(part_file + ".tmp", part_file)
+
+    _save_state(store_root, new_state)
+    if changed:
+        print(f"[NewsStore] Compacted {len(changed)} partitions into {store_root}")
+    return len(changed)
+
+
+def load_news(
+    tickers: Optional[Sequence[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    sources: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    store_root: str = STORE_ROOT
+) -> pd.DataFrame:
+    """
+    Reads news rows from the Parquet store.
+
+    Partitions outside the requested tickers, sources and months are never
+    opened, and only the requested columns are read.
+
+    Args:
+        tickers (Optional[Sequence[str]]): Tickers to load. All if None.
+        start_date (Optional[str]): First date to include (YYYY-MM-DD).
+        end_date (Optional[str]): Last date to include (YYYY-MM-DD).
+        sources (Optional[Sequence[str]]): Source labels such as 'NewsAPI'. All if None.
+        columns (Optional[Sequence[str]]): Columns to return. Defaults to ``NEWS_COLUMNS``.
+        store_root (str): Root directory of the Parquet store.
+
+    Returns:
+        pd.DataFrame: News rows with datetime64 'date' and categorical
+        'source' / 'ticker' columns.
+    """
+    columns = list(columns or NEWS_COLUMNS)
+    empty = pd.DataFrame({c: pd.Series(dtype=object) for c in columns})
+    if not os.path.isdir(store_root):
+        return empty
+
+    dataset = ds.dataset(store_root, format="parquet", partitioning=_PARTITIONING,
+                         exclude_invalid_files=True, ignore_prefixes=["_", "."])
+    if not dataset.files:
+        # nothing compacted yet: no schema to filter 'date' against
+        return empty
+
+    filters = []
+    if tickers is not None:
+        filters.append(ds.field("ticker").isin(list(tickers)))
+    if sources is not None:
+        filters.append(ds.field("source").isin(list(sources)))
+    if start_date is not None:
+        filters.append(ds.field("month") >= start_date[:7])
+        filters.append(ds.field("date") >= pd.Timestamp(start_date))
+    if end_date is not None:
+        filters.append(ds.field("month") <= end_date[:7])
+        filters.append(ds.field("date") < pd.Timestamp(end_date) + pd.Timedelta(days=1))
+
+    expr = None
+    for f in filters:
+        expr = f if expr is None else expr & f
+
+    with span("news.load", unit="rows") as s:
+        df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+        s.items = len(df)
+    for col in ("source", "ticker"):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
@@ -0,0 +1,184 @@
+"""
+Incremental model updates for daily retraining.
+
+Includes:
+- A linear regression fitted from accumulated sufficient statistics
+  (X^T X, X^T y), with optional exponential forgetting
+- State persistence so a daily update costs O(features^2) instead of a refit
+  over the whole history
+- Warm-start continuation of an XGBoost booster with extra trees
+"""
+
+import os
+
+import numpy as np
+
+
+def state_path(path: str) -> str:
+    """
+    Returns ``path`` with the .npz suffix ``np.savez`` would append.
+    """
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+class IncrementalLinearRegression:
+    """
+    Ordinary least squares with an intercept, updated from sufficient statistics.
+
+    Without forgetting, the coefficients after any sequence of
+    ``partial_fit`` calls equal a full ``LinearRegression`` refit on all rows
+    seen so far (up to numerical tolerance).
+
+    Args:
+        forgetting (float): Per-row decay in (0, 1]. Each new row scales the
+            weight of all earlier rows by this factor; 1.0 weights history equally.
+        ridge (float): Optional L2 penalty on the slopes for ill-conditioned data.
+    """
+
+    def __init__(self, forgetting: float = 1.0, ridge: float = 0.0):
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1].")
+        self.forgetting = forgetting
+        self.ridge = ridge
+        self.xtx_ = None
+        self.xty_ = None
+        self.n_seen_ = 0
+        self.coef_ = None
+        self.intercept_ = 0.0
+
+    def _augment(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return np.hstack([X, np.ones((X.shape[0], 1))])
+
+    def partial_fit(self, X: np.ndarray, y: np.ndarray) -> "IncrementalLinearRegression":
+        """
+        Adds rows to the sufficient statistics and re-solves the coefficients.
+
+        Args:
+            X (np.ndarray): New feature rows, in time order.
+            y (np.ndarray): New targets.
+
+        Returns:
+            IncrementalLinearRegression: self.
+        """
+        Z = self._augment(X)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if self.xtx_ is None:
+            self.xtx_ = np.zeros((Z.shape[1], Z.shape[1]))
+            self.xty_ = np.zeros(Z.shape[1])
+
+        if self.forgetting < 1.0:
+            # the i-th of m new rows is followed by m - 1 - i newer rows
+            m = len(y)
+            w = self.forgetting ** np.arange(m - 1, -1, -1)
+            decay = self.forgetting ** m
+            self.xtx_ = decay * self.xtx_ + (Z * w[:, None]).T @ Z
+            self.xty_ = decay * self.xty_ + Z.T @ (w * y)
+        else:
+            self.xtx_ += Z.T @ Z
+            self.xty_ += Z.T @ y
+
+        self.n_seen_ += len(y)
+        self._solve()
+        return self
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "IncrementalLinearRegression":
+        """
+        Discards any accumulated state and fits from scratch.
+        """
+        self.xtx_ = None
+        self.xty_ = None
+        self.n_seen_ = 0
+        return self.partial_fit(X, y)
+
+    def _solve(self):
+        A = self.xtx_.copy()
+        if self.ridge:
+            A[:-1, :-1] += self.ridge * np.eye(A.shape[0] - 1)
+        beta = np.linalg.lstsq(A, self.xty_, rcond=None)[0]
+        self.coef_ = beta[:-1]
+        self.intercept_ = float(beta[-1])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def save(self, path: str):
+        """
+        Persists the sufficient statistics and settings to a .npz file.
+
+        The file is written to ``state_path(path)``.
+        """
+        path = state_path(path)
+        # a file object keeps np.savez from appending its own suffix to the .tmp name
+        with open(path + ".tmp", "wb") as f:
+            np.savez(
+                f,
+                xtx=self.xtx_,
+                xty=self.xty_,
+                n_seen=self.n_seen_,
+                forgetting=self.forgetting,
+                ridge=self.ridge
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "IncrementalLinearRegression":
+        """
+        Restores a model saved with ``save`` to the same ``path``.
+        """
+        state = np.load(state_path(path))
+        model = cls(forgetting=float(state["forgetting"]), ridge=float(state["ridge"]))
+        model.xtx_ = state["xtx"]
+        model.xty_ = state["xty"]
+        model.n_seen_ = int(state["n_seen"])
+        model._solve()
+        return model
+
+
+def update_online_model(path: str, X_new: np.ndarray, y_new: np.ndarray,
+                        forgetting: float = 1.0) -> IncrementalLinearRegression:
+    """
+    Loads the persisted model (or starts one), adds the new rows, and saves it back.
+
+    Args:
+        path (str): Location of the saved state; '.npz' is appended if missing.
+        X_new (np.ndarray): Feature rows added since the last update.
+        y_new (np.ndarray): Targets for the new rows.
+        forgetting (float): Forgetting factor used when starting a new model.
+
+    Returns:
+        IncrementalLinearRegression: The updated model.
+    """
+    path = state_path(path)
+    if os.path.exists(path):
+        model = IncrementalLinearRegression.load(path)
+    else:
+        model = IncrementalLinearRegression(forgetting=forgetting)
+    model.partial_fit(X_new, y_new)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    model.save(path)
+    return model
+
+
+def warm_start_xgboost(model, X: np.ndarray, y: np.ndarray, n_new_trees: int = 10):
+    """
+    Continues training a fitted XGBRegressor by adding trees fit on new data.
+
+    Args:
+        model: A fitted ``xgboost.XGBRegressor``.
+        X (np.ndarray): New feature rows.
+        y (np.ndarray): New targets.
+        n_new_trees (int): Number of boosting rounds to add.
+
+    Returns:
+        A new XGBRegressor whose booster holds the original trees followed by
+        the new ones.
+    """
+    from xgboost import XGBRegressor
+
+    params = model.get_params()
+    params["n_estimators"] = n_new_trees
+    updated = XGBRegressor(**params)
+    updated.fit(X, y, xgb_model=model.get_booster())
+    return updated
@@ -0,0 +1,233 @@
+"""
+Local price cache with incremental range top-up.
+
+Includes:
+- Per-ticker Parquet files of adjusted closes keyed by date
+- Download of only the missing date ranges and missing tickers
+- Detection of split/dividend re-adjustments via an overlap check against the
+  cached closes, triggering a full refresh of that ticker only
+- Fully offline serving when the requested range is already cached
+
+Layout:
+    {store_root}/AAPL.parquet
+    {store_root}/_meta.json   # covered range per ticker
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+STORE_ROOT = "data/store/prices"
+
+# days of cached history re-downloaded next to each missing range to detect
+# re-adjusted history
+OVERLAP_DAYS = 7
+# relative price change on the overlap that counts as a re-adjustment
+ADJUSTMENT_TOLERANCE = 1e-4
+# calendar days without closes at a range edge that count as a closed market
+EDGE_DAYS = 4
+_META_FILE = "_meta.json"
+
+
+def _shift(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _load_meta(store_root: str) -> Dict[str, dict]:
+    path = os.path.join(store_root, _META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_meta(store_root: str, meta: Dict[str, dict]):
+    path = os.path.join(store_root, _META_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _read_ticker(store_root: str, ticker: str) -> pd.Series:
+    path = os.path.join(store_root, f"{ticker}.parquet")
+    if not os.path.exists(path):
+        return pd.Series(dtype=float, name=ticker)
+    return pd.read_parquet(path)["close"].rename(ticker)
+
+
+def _write_ticker(store_root: str, ticker: str, close: pd.Series):
+    path = os.path.join(store_root, f"{ticker}.parquet")
+    frame = close.dropna().sort_index().to_frame("close")
+    frame.index.name = "date"
+    frame.to_parquet(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _download(tickers: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Downloads adjusted closes from yfinance as a (date x ticker) frame.
+    """
+    import yfinance as yf
+
+    print(f"[Price] Downloading {tickers} for {start_date}..{end_date}...")
+    data = yf.download(tickers, start=start_date, end=end_date, auto_adjust=True, progress=False)
+    if data.empty:
+        return pd.DataFrame(columns=tickers, dtype=float)
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    close.index = pd.DatetimeIndex(close.index).tz_localize(None)
+    return close.reindex(columns=tickers)
+
+
+def _missing_ranges(meta: dict, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """
+    Returns the [start, end) ranges to download so the ticker's covered range
+    becomes one contiguous span including the request.
+    """
+    if not meta:
+        return [(start_date, end_date)]
+    ranges = []
+    if start_date < meta["start"]:
+        ranges.append((start_date, meta["start"]))
+    if end_date > meta["end"]:
+        ranges.append((meta["end"], end_date))
+    return ranges
+
+
+def _covered_span(dates: pd.DatetimeIndex, start: str, end: str) -> Tuple[str, str]:
+    """
+    Returns the part of a downloaded [start, end) range the returned closes cover.
+
+    A gap of up to ``EDGE_DAYS`` at either edge is weekends and holidays, so
+    the requested bound is kept; a longer gap stays uncovered and is
+    downloaded again on the next load.
+    """
+    first = dates[0].strftime("%Y-%m-%d")
+    last = _shift(dates[-1].strftime("%Y-%m-%d"), 1)
+    if first <= _shift(start, EDGE_DAYS):
+        first = start
+    if last >= _shift(end, -EDGE_DAYS):
+        last = end
+    return first, last
+
+
+def _adjustment_changed(stored: pd.Series, fresh: pd.Series) -> bool:
+    """
+    Checks whether overlapping closes differ, meaning the history was re-adjusted.
+    """
+    common = stored.index.intersection(fresh.dropna().index)
+    if len(common) == 0:
+        return False
+    rel = np.abs(fresh[common].to_numpy() / stored[common].to_numpy() - 1)
+    return bool(np.nanmax(rel) > ADJUSTMENT_TOLERANCE)
+
+
+def load_prices(
+    tickers: List[str],
+    start_date: str,
+    end_date: str,
+    store_root: str = STORE_ROOT,
+    offline: bool = False
+) -> pd.DataFrame:
+    """
+    Returns adjusted closes, downloading only what the cache is missing.
+
+    When extending a ticker's history in either direction, the
+    ``OVERLAP_DAYS`` of cached history next to the missing range are
+    downloaded again and compared with the cache. If they differ (a split or
+    dividend re-adjusted the series), that ticker's whole covered range is
+    refreshed; other tickers are untouched.
+
+    Args:
+        tickers (List[str]): Stock tickers.
+        start_date (str): Start date (YYYY-MM-DD).
+        end_date (str): End date (YYYY-MM-DD), exclusive as in yfinance.
+        store_root (str): Directory of the price cache.
+        offline (bool): Never download; serve whatever is cached.
+
+    Returns:
+        pd.DataFrame: Adjusted closes with a DatetimeIndex and one column per ticker.
+    """
+    os.makedirs(store_root, exist_ok=True)
+    meta = _load_meta(store_root)
+
+    # group tickers by identical download ranges so each range is one request
+    plan: Dict[Tuple[str, str], List[str]] = {}
+    for ticker in tickers:
+        for start, end in _missing_ranges(meta.get(ticker), start_date, end_date):
+            info = meta.get(ticker)
+            if info and start == info["end"]:
+                start = _shift(start, -OVERLAP_DAYS)
+            elif info and end == info["start"]:
+                end = _shift(end, OVERLAP_DAYS)
+            plan.setdefault((start, end), []).append(ticker)
+
+    if plan and offline:
+        print(f"[Price] Offline: serving cached data, {sum(map(len, plan.values()))} ranges missing")
+        plan = {}
+
+    # yfinance returns empty or all-NaN columns instead of raising when a
+    # download fails, so coverage only grows by the dates actually returned
+    refresh = set()
+    for (start, end), group in plan.items():
+        fresh = _download(group, start, end)
+        for ticker in group:
+            dates = fresh[ticker].dropna().index
+            if len(dates) == 0:
+                print(f"[Price] No data returned for {ticker} in {start}..{end}")
+                continue
+            stored = _read_ticker(store_root, ticker)
+            if _adjustment_changed(stored, fresh[ticker]):
+                refresh.add(ticker)
+                continue
+            first, last = _covered_span(dates, start, end)
+            info = meta.get(ticker)
+            if info and (first > info["end"] or last < info["start"]):
+                # keep the covered range contiguous; the gap is fetched next time
+                continue
+            _write_ticker(store_root, ticker, fresh[ticker].combine_first(stored))
+            meta[ticker] = {
+                "start": min(info["start"], first) if info else first,
+                "end": max(info["end"], last) if info else last,
+            }
+
+    for ticker in sorted(refresh):
+        info = meta[ticker]
+        start, end = min(info["start"], start_date), max(info["end"], end_date)
+        print(f"[Price] {ticker} history was re-adjusted, refreshing {start}..{end}")
+        close = _download([ticker], start, end)[ticker]
+        dates = close.dropna().index
+        if len(dates) == 0:
+            print(f"[Price] No data returned for {ticker} in {start}..{end}, keeping cached history")
+            continue
+        _write_ticker(store_root, ticker, close)
+        meta[ticker] = dict(zip(("start", "end"), _covered_span(dates, start, end)))
+
+    _save_meta(store_root, meta)
+
+    frame = pd.concat([_read_ticker(store_root, t) for t in tickers], axis=1)
+    frame = frame.reindex(columns=tickers)
+    mask = (frame.index >= pd.Timestamp(start_date)) & (frame.index < pd.Timestamp(end_date))
+    return frame.loc[mask]
+
+
+def invalidate(tickers: Optional[List[str]] = None, store_root: str = STORE_ROOT):
+    """
+    Drops cached prices so the next load downloads them again.
+
+    Args:
+        tickers (Optional[List[str]]): Tickers to drop. All if None.
+        store_root (str): Directory of the price cache.
+    """
+    meta = _load_meta(store_root)
+    for ticker in list(meta if tickers is None else tickers):
+        meta.pop(ticker, None)
+        path = os.path.join(store_root, f"{ticker}.parquet")
+        if os.path.exists(path):
+            os.remove(path)
+    _save_meta(store_root, meta)
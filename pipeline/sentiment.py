@@ -2,70 +2,686 @@
 Computes sentiment scores from news headlines or articles.
 
 Supports rule-based (VADER) and transformer-based (FinBERT) sentiment models.
+FinBERT can run on three CPU backends, selected by model name:
+- 'finbert': PyTorch fp32
+- 'finbert-int8': PyTorch with dynamic int8 quantization of the Linear layers
+- 'finbert-onnx': the fp32 graph exported once to ONNX and run by ONNX Runtime
+
+VADER can score chunks of headlines across a process pool and can use a
+vectorized lexicon path (``pipeline.vader_fast``) with identical scores.
+
+Besides headlines, whole articles (title, description and content) can be
+scored: FinBERT then reads each document in overlapping token windows,
+packed across documents into full batches, and pools the window scores.
+
+Heavy backends (NLTK, torch, transformers) are imported only when a model is
+first loaded. Loaded models are kept in a process-wide registry so each one
+is read from disk once and stays warm across calls.
 """
 
+import hashlib
+import inspect
+import os
+import threading
+import time
+from types import SimpleNamespace
+from importlib.metadata import version
+import numpy as np
 import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pipeline.cache import SentimentCache
+from pipeline.instrument import span
+
+FINBERT_MODEL = "yiyanghkust/finbert-tone"
+# branch, tag or commit to load; cached scores are keyed on the commit it
+# resolves to (see finbert_commit), so new upstream weights are rescored
+FINBERT_REVISION = "main"
+FINBERT_BACKENDS = ("finbert", "finbert-int8", "finbert-onnx")
+# article fields joined for document scoring, in reading order
+DOCUMENT_FIELDS = ("title", "description", "content")
+# exported ONNX graphs, one per (model, revision)
+ONNX_DIR = "data/cache/onnx"
+
+_MODEL_REGISTRY: Dict[str, Any] = {}
+_REGISTRY_LOCK = threading.RLock()
+# FINBERT_REVISION -> commit SHA it resolved to in the local Hugging Face cache
+_COMMITS: Dict[str, str] = {}
+
+
+def _load_vader():
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def _load_finbert():
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from transformers.utils.hub import cached_file, extract_commit_hash
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL, revision=FINBERT_REVISION)
+    model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL, revision=FINBERT_REVISION)
+    model.eval()
+    # the snapshot just loaded, so a moving branch maps to the weights in use
+    config_file = cached_file(FINBERT_MODEL, "config.json", revision=FINBERT_REVISION, local_files_only=True)
+    model.hub_commit = extract_commit_hash(config_file, None) or FINBERT_REVISION
+    _COMMITS[FINBERT_REVISION] = model.hub_commit
+    return tokenizer, model
+
+
+def _base_finbert():
+    """
+    Returns the fp32 (tokenizer, model) to derive other backends from: the
+    registered one if present (e.g. a local test model), else a fresh load
+    that is not kept in the registry.
+    """
+    return _MODEL_REGISTRY.get("finbert") or _load_finbert()
+
+
+def _load_finbert_int8():
+    import torch
+
+    tokenizer, model = _base_finbert()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    quantized.eval()
+    quantized.hub_commit = getattr(model, "hub_commit", FINBERT_REVISION)
+    return tokenizer, quantized
+
+
+class _OnnxClassifier:
+    """
+    Runs an exported sequence classifier with ONNX Runtime behind the
+    ``model(**inputs).logits`` interface of the PyTorch model.
+    """
+
+    def __init__(self, path: str):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, **inputs):
+        import torch
+
+        feed = {name: inputs[name].numpy() for name in self.input_names if name in inputs}
+        return SimpleNamespace(logits=torch.from_numpy(self.session.run(["logits"], feed)[0]))
+
+
+def export_finbert_onnx(tokenizer, model, path: str):
+    """
+    Exports a sequence classifier to ONNX with dynamic batch and sequence axes.
+
+    Args:
+        tokenizer: Tokenizer matching the model.
+        model: PyTorch ``AutoModelForSequenceClassification``.
+        path (str): Output .onnx file.
+    """
+    import torch
+
+    sample = tokenizer(["sample headline"], return_tensors="pt")
+    # positional inputs must follow the order of the model's forward signature
+    params = list(inspect.signature(model.forward).parameters)
+    names = sorted(sample.keys(), key=params.index)
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["logits"] = {0: "batch"}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            path + ".tmp",
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=axes,
+            opset_version=17,
+            dynamo=False
+        )
+    os.replace(path + ".tmp", path)
+
+
+def _load_finbert_onnx():
+    import torch
+
+    tokenizer, model = _base_finbert()
+    source = getattr(model.config, "_name_or_path", "") or FINBERT_MODEL
+    commit = getattr(model, "hub_commit", FINBERT_REVISION)
+    key = f"{source}@{commit}/torch-{torch.__version__}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(ONNX_DIR, f"finbert-{digest}.onnx")
+    if not os.path.exists(path):
+        print(f"[FinBERT] Exporting ONNX graph to {path}...")
+        export_finbert_onnx(tokenizer, model, path)
+    classifier = _OnnxClassifier(path)
+    classifier.hub_commit = commit
+    return tokenizer, classifier
+
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import torch.nn.functional as F
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+_MODEL_LOADERS = {
+    "vader": _load_vader,
+    "finbert": _load_finbert,
+    "finbert-int8": _load_finbert_int8,
+    "finbert-onnx": _load_finbert_onnx,
+}
 
 
-def compute_vader_sentiment(news_df: pd.DataFrame) -> pd.Series:
+def get_model(name: str) -> Any:
+    """
+    Returns a loaded sentiment model, loading it on first use.
+
+    Args:
+        name (str): Model name: 'vader' or one of ``FINBERT_BACKENDS``.
+
+    Returns:
+        Any: A ``SentimentIntensityAnalyzer`` for 'vader', or a
+        (tokenizer, model) tuple for the FinBERT backends.
+    """
+    if name not in _MODEL_LOADERS:
+        raise ValueError(f"Invalid model. Choose 'vader' or one of {FINBERT_BACKENDS}.")
+    with _REGISTRY_LOCK:
+        if name not in _MODEL_REGISTRY:
+            _MODEL_REGISTRY[name] = _MODEL_LOADERS[name]()
+        return _MODEL_REGISTRY[name]
+
+
+def register_model(name: str, model: Any):
+    """
+    Installs an already loaded model in the registry, replacing any loaded one.
+
+    Used to run the pipeline against a small local model (e.g. a randomly
+    initialized BERT in benchmarks) without downloading FinBERT.
+
+    Registering 'finbert' drops derived backends, so 'finbert-int8' and
+    'finbert-onnx' are rebuilt from the new model on next use.
+
+    Args:
+        name (str): Model name: 'vader' or one of ``FINBERT_BACKENDS``.
+        model (Any): Object in the format ``get_model`` returns for that name.
+    """
+    if name not in _MODEL_LOADERS:
+        raise ValueError(f"Invalid model. Choose 'vader' or one of {FINBERT_BACKENDS}.")
+    with _REGISTRY_LOCK:
+        if name == "finbert":
+            for derived in FINBERT_BACKENDS[1:]:
+                _MODEL_REGISTRY.pop(derived, None)
+        _MODEL_REGISTRY[name] = model
+
+
+def prewarm_models(names: Iterable[str] = ("finbert",)) -> threading.Thread:
+    """
+    Loads sentiment models in a background thread.
+
+    Args:
+        names (Iterable[str]): Models to load.
+
+    Returns:
+        threading.Thread: The started loader thread. Callers may ``join`` it,
+        but ``get_model`` also waits for an in-progress load.
+    """
+    names = list(names)
+    thread = threading.Thread(
+        target=lambda: [get_model(name) for name in names],
+        name="sentiment-prewarm",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def clear_models():
+    """
+    Drops all loaded models from the registry.
+    """
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+
+
+def _init_vader_worker():
+    get_model("vader")
+
+
+def _score_vader_chunk(texts: List[str], fast: bool = False) -> np.ndarray:
+    """
+    Scores texts with the process's VADER analyzer.
+    """
+    sid = get_model("vader")
+    if fast:
+        from pipeline.vader_fast import compound_scores
+        return compound_scores(texts, sid)
+    return np.fromiter((sid.polarity_scores(t)["compound"] for t in texts), dtype=np.float64, count=len(texts))
+
+
+def compute_vader_sentiment(
+    news_df: pd.DataFrame,
+    n_jobs: int = 1,
+    chunk_size: int = 20_000,
+    fast: bool = False
+) -> pd.Series:
     """
     Computes compound sentiment score using VADER.
 
+    With ``n_jobs > 1`` the headlines are split into chunks scored by a
+    process pool, with one analyzer loaded per worker. With ``fast`` each
+    chunk is scored by the vectorized lexicon path in
+    ``pipeline.vader_fast``, which gives the same scores as
+    ``polarity_scores``.
+
     Args:
         news_df (pd.DataFrame): News headlines with a 'title' column.
+        n_jobs (int): Worker processes. None uses every core.
+        chunk_size (int): Headlines per task sent to a worker.
+        fast (bool): Use the vectorized fast path.
 
     Returns:
         pd.Series: Compound sentiment scores for each headline.
     """
-    sid = SentimentIntensityAnalyzer()
-    return news_df["title"].apply(lambda x: sid.polarity_scores(x)["compound"])
+    texts = news_df["title"].fillna("").astype(str).tolist()
+    n_jobs = n_jobs or os.cpu_count() or 1
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    with span("vader.score", items=len(texts), unit="texts"):
+        if n_jobs > 1 and len(chunks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
 
+            with ProcessPoolExecutor(min(n_jobs, len(chunks)), initializer=_init_vader_worker) as pool:
+                parts = list(pool.map(_score_vader_chunk, chunks, [fast] * len(chunks)))
+        else:
+            parts = [_score_vader_chunk(chunk, fast) for chunk in chunks]
+    scores = np.concatenate(parts) if parts else np.zeros(0)
+    return pd.Series(scores, index=news_df.index)
 
-def compute_finbert_sentiment(news_df: pd.DataFrame) -> pd.Series:
+
+def _length_buckets(lengths: np.ndarray, batch_size: int) -> List[np.ndarray]:
+    """
+    Groups row positions into batches of similar token length.
+
+    Args:
+        lengths (np.ndarray): Token count of each text.
+        batch_size (int): Maximum number of texts per batch.
+
+    Returns:
+        List[np.ndarray]: Row positions for each batch, shortest texts first.
+    """
+    order = np.argsort(lengths, kind="stable")
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def compute_finbert_sentiment(
+    news_df: pd.DataFrame,
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    max_length: int = 512,
+    backend: str = "finbert"
+) -> pd.Series:
     """
     Computes sentiment using FinBERT model.
 
+    Headlines are tokenized once, sorted into length buckets so each batch
+    pads to a similar length, and scored in batches under
+    ``torch.inference_mode``. Scores are returned in the original row order.
+
     Args:
         news_df (pd.DataFrame): News headlines with a 'title' column.
+        batch_size (int): Number of headlines per forward pass.
+        num_threads (Optional[int]): Intra-op thread count for torch. Uses the
+            torch default if None.
+        max_length (int): Maximum tokens per headline before truncation.
+        backend (str): One of ``FINBERT_BACKENDS``. ``num_threads`` does not
+            apply to 'finbert-onnx', which uses ONNX Runtime's own thread pool.
 
     Returns:
-        pd.Series: Sentiment scores (positive - negative probability).
+        pd.Series: Sentiment scores (positive - negative probability). The
+        measured throughput in texts/sec is stored in ``attrs["throughput"]``.
     """
-    tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-    model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone")
-    model.eval()
+    import torch
+    import torch.nn.functional as F
+
+    if backend not in FINBERT_BACKENDS:
+        raise ValueError(f"Invalid FinBERT backend: {backend}")
+    tokenizer, model = get_model(backend)
+
+    texts = news_df["title"].fillna("").astype(str).tolist()
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+    prev_threads = torch.get_num_threads()
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    sentiments = np.zeros(len(texts), dtype=np.float64)
+    start = time.perf_counter()
+    try:
+        with torch.inference_mode(), span("finbert.forward", items=len(texts), unit="texts"):
+            for batch in _length_buckets(lengths, batch_size):
+                inputs = tokenizer.pad(
+                    {key: [encoded[key][i] for i in batch] for key in encoded.keys()},
+                    return_tensors="pt"
+                )
+                probs = F.softmax(model(**inputs).logits, dim=-1)
+                sentiments[batch] = (probs[:, 2] - probs[:, 0]).numpy()  # positive - negative
+    finally:
+        torch.set_num_threads(prev_threads)
+    elapsed = time.perf_counter() - start
+
+    throughput = len(texts) / elapsed if elapsed > 0 else float("inf")
+    print(f"[FinBERT:{backend}] Scored {len(texts)} texts in {elapsed:.2f}s ({throughput:.1f} texts/sec)")
+
+    scores = pd.Series(sentiments, index=news_df.index)
+    scores.attrs["throughput"] = throughput
+    return scores
+
+
+def document_texts(news_df: pd.DataFrame, fields: Sequence[str] = DOCUMENT_FIELDS) -> pd.Series:
+    """
+    Joins each article's text fields into one document.
+
+    Missing or empty fields are skipped, as is a field already contained in
+    the fields before it (NewsAPI's ``content`` often repeats the
+    description), so Twitter rows with an empty title still get their text
+    and no sentence is scored twice.
+
+    Args:
+        news_df (pd.DataFrame): News rows from ``fetch_news_data``.
+        fields (Sequence[str]): Text columns, in reading order.
+
+    Returns:
+        pd.Series: One document per row, fields separated by blank lines.
+    """
+    columns = [news_df[f].fillna("").astype(str).str.strip().tolist() for f in fields if f in news_df.columns]
+    documents = []
+    for parts in zip(*columns):
+        doc = ""
+        for part in parts:
+            if part and part not in doc:
+                doc = f"{doc}\n\n{part}" if doc else part
+        documents.append(doc)
+    return pd.Series(documents, index=news_df.index, dtype=object)
+
+
+def compute_finbert_document_sentiment(
+    news_df: pd.DataFrame,
+    fields: Sequence[str] = DOCUMENT_FIELDS,
+    window: int = 256,
+    overlap: int = 64,
+    pooling: str = "length",
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    backend: str = "finbert",
+    docs_per_chunk: int = 256,
+    pool_batches: int = 8
+) -> pd.Series:
+    """
+    Scores whole articles with FinBERT in overlapping token windows.
+
+    Documents are tokenized a chunk at a time into windows of ``window``
+    tokens (special tokens included) that share ``overlap`` tokens with the
+    previous window. Windows from all documents go into a pool; whenever it
+    holds ``pool_batches`` full batches, the pool is sorted by length and
+    run as full batches, mixing windows of many documents in each forward
+    pass. Memory stays bounded by the pool plus one chunk of documents,
+    however long the corpus or its documents are. Window scores are pooled
+    back per document.
+
+    Args:
+        news_df (pd.DataFrame): News rows with the text ``fields``.
+        fields (Sequence[str]): Columns joined by ``document_texts``.
+        window (int): Tokens per window, special tokens included.
+        overlap (int): Tokens shared by consecutive windows of a document.
+        pooling (str): 'length' weights each window's score by its token
+            count; 'mean' weights windows equally.
+        batch_size (int): Windows per forward pass.
+        num_threads (Optional[int]): Intra-op thread count for torch.
+        backend (str): One of ``FINBERT_BACKENDS``.
+        docs_per_chunk (int): Documents tokenized at a time.
+        pool_batches (int): Batches of windows pooled before sorting and running.
+
+    Returns:
+        pd.Series: Document scores (positive - negative probability). The
+        throughput in documents/sec and the number of windows scored are
+        stored in ``attrs["throughput"]`` and ``attrs["windows"]``.
+    """
+    import torch
+    import torch.nn.functional as F
+
+    if backend not in FINBERT_BACKENDS:
+        raise ValueError(f"Invalid FinBERT backend: {backend}")
+    if pooling not in ("length", "mean"):
+        raise ValueError(f"Invalid pooling: {pooling}")
+    tokenizer, model = get_model(backend)
+    n_special = tokenizer.num_special_tokens_to_add(pair=False)
+    if not 0 <= overlap < window - n_special:
+        raise ValueError(f"overlap must be below the {window - n_special} text tokens per window")
 
-    sentiments = []
-    for text in news_df["title"]:
-        inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-        with torch.no_grad():
-            logits = model(**inputs).logits
-            probs = F.softmax(logits, dim=-1).squeeze()
-            sentiment_score = probs[2].item() - probs[0].item()  # positive - negative
-        sentiments.append(sentiment_score)
+    texts = document_texts(news_df, fields).tolist()
+    totals = np.zeros(len(texts), dtype=np.float64)
+    weights = np.zeros(len(texts), dtype=np.float64)
+    pool: List[Tuple[int, Dict[str, list]]] = []
+    n_windows = 0
 
-    return pd.Series(sentiments)
+    def run(windows: List[Tuple[int, Dict[str, list]]]):
+        inputs = tokenizer.pad([features for _, features in windows], return_tensors="pt")
+        probs = F.softmax(model(**inputs).logits, dim=-1)
+        scores = (probs[:, 2] - probs[:, 0]).numpy()  # positive - negative
+        docs = np.fromiter((doc for doc, _ in windows), dtype=np.int64, count=len(windows))
+        if pooling == "length":
+            w = np.fromiter((max(len(f["input_ids"]) - n_special, 1) for _, f in windows),
+                            dtype=np.float64, count=len(windows))
+        else:
+            w = np.ones(len(windows))
+        np.add.at(totals, docs, w * scores)
+        np.add.at(weights, docs, w)
 
+    def drain(final: bool = False):
+        pool.sort(key=lambda item: len(item[1]["input_ids"]))
+        n_full = len(pool) // batch_size * batch_size
+        for i in range(0, n_full, batch_size):
+            run(pool[i:i + batch_size])
+        rest = pool[n_full:]
+        pool.clear()
+        if final and rest:
+            run(rest)
+        else:
+            pool.extend(rest)
 
-def compute_sentiment_scores(news_df: pd.DataFrame, model: str = "finbert") -> pd.Series:
+    prev_threads = torch.get_num_threads()
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+
+    start = time.perf_counter()
+    try:
+        with torch.inference_mode(), span("finbert.documents", items=len(texts), unit="docs") as s:
+            for first in range(0, len(texts), docs_per_chunk):
+                encoded = tokenizer(
+                    texts[first:first + docs_per_chunk],
+                    truncation=True,
+                    max_length=window,
+                    stride=overlap,
+                    return_overflowing_tokens=True
+                )
+                keys = [k for k in encoded.keys() if k != "overflow_to_sample_mapping"]
+                for i, doc in enumerate(encoded["overflow_to_sample_mapping"]):
+                    pool.append((first + doc, {k: encoded[k][i] for k in keys}))
+                n_windows += len(encoded["input_ids"])
+                if len(pool) >= pool_batches * batch_size:
+                    drain()
+            drain(final=True)
+            s.items = len(texts)
+    finally:
+        torch.set_num_threads(prev_threads)
+    elapsed = time.perf_counter() - start
+
+    throughput = len(texts) / elapsed if elapsed > 0 else float("inf")
+    print(f"[FinBERT:{backend}] Scored {len(texts)} documents ({n_windows} windows) in {elapsed:.2f}s "
+          f"({throughput:.1f} docs/sec)")
+
+    scores = pd.Series(totals / np.maximum(weights, 1e-12), index=news_df.index)
+    scores.attrs["throughput"] = throughput
+    scores.attrs["windows"] = n_windows
+    return scores
+
+
+def _cached_commit() -> Optional[str]:
+    """
+    Resolves ``FINBERT_REVISION`` against the local Hugging Face cache.
+
+    Reads the snapshot the revision points to without loading any weights.
+    Results are memoized; None (nothing downloaded yet) is not.
+    """
+    with _REGISTRY_LOCK:
+        if FINBERT_REVISION not in _COMMITS:
+            from transformers.utils.hub import cached_file, extract_commit_hash
+            try:
+                config_file = cached_file(FINBERT_MODEL, "config.json", revision=FINBERT_REVISION,
+                                          local_files_only=True)
+            except OSError:
+                return None
+            commit = extract_commit_hash(config_file, None)
+            if commit is None:
+                return None
+            _COMMITS[FINBERT_REVISION] = commit
+        return _COMMITS[FINBERT_REVISION]
+
+
+def finbert_commit(backend: str = "finbert") -> str:
+    """
+    Returns the commit of the FinBERT weights behind a backend.
+
+    A loaded backend reports the commit its weights came from (locally
+    registered models report ``FINBERT_REVISION`` itself). Otherwise the
+    commit is read from the local Hugging Face cache, so cached scores can
+    be looked up without loading the model; it is only loaded when nothing
+    has been downloaded yet.
+
+    Args:
+        backend (str): One of ``FINBERT_BACKENDS``.
+
+    Returns:
+        str: Commit SHA, or the configured revision.
+    """
+    with _REGISTRY_LOCK:
+        loaded = _MODEL_REGISTRY.get(backend) or _MODEL_REGISTRY.get("finbert")
+    if loaded is None:
+        commit = _cached_commit()
+        if commit is not None:
+            return commit
+        loaded = get_model(backend)
+    return getattr(loaded[1], "hub_commit", FINBERT_REVISION)
+
+
+def _model_identity(model: str) -> Tuple[str, str]:
+    """
+    Returns the (name, revision) pair used to key cached scores.
+
+    Args:
+        model (str): Sentiment model: 'vader' or one of ``FINBERT_BACKENDS``.
+
+    Returns:
+        Tuple[str, str]: Model name and revision. FinBERT revisions are the
+        resolved weight commit, so a moved branch does not reuse old scores.
+        Quantized and ONNX scores differ slightly from fp32, so each backend
+        is cached separately.
+    """
+    if model == "vader":
+        return "vader", f"nltk-{version('nltk')}"
+    commit = finbert_commit(model)
+    if model == "finbert":
+        return FINBERT_MODEL, commit
+    return FINBERT_MODEL, f"{commit}+{model.split('-', 1)[1]}"
+
+
+def compute_sentiment_scores(
+    news_df: pd.DataFrame,
+    model: str = "finbert",
+    batch_size: int = 32,
+    num_threads: Optional[int] = None,
+    cache: Optional[SentimentCache] = None,
+    vader_workers: int = 1,
+    vader_fast: bool = False,
+    documents: bool = False,
+    window: int = 256,
+    overlap: int = 64,
+    pooling: str = "length"
+) -> pd.Series:
     """
     Computes sentiment scores using specified model.
 
+    When a cache is given, only texts without a cached score for this model
+    and revision are scored, and the new scores are written back to it.
+
+    With ``documents``, each row's title, description and content are scored
+    as one document (see ``document_texts``): FinBERT reads it in
+    overlapping windows via ``compute_finbert_document_sentiment``, and
+    VADER scores the joined text directly.
+
     Args:
         news_df (pd.DataFrame): News headlines DataFrame.
-        model (str): Sentiment model to use: 'vader' or 'finbert'.
+        model (str): Sentiment model to use: 'vader' or one of
+            ``FINBERT_BACKENDS`` ('finbert', 'finbert-int8', 'finbert-onnx').
+        batch_size (int): FinBERT batch size.
+        num_threads (Optional[int]): FinBERT intra-op thread count.
+        cache (Optional[SentimentCache]): Persistent score cache.
+        vader_workers (int): VADER worker processes. None uses every core.
+        vader_fast (bool): Use the vectorized VADER fast path.
+        documents (bool): Score whole articles instead of headlines.
+        window (int): FinBERT tokens per document window.
+        overlap (int): Tokens shared by consecutive windows.
+        pooling (str): How window scores are combined: 'length' or 'mean'.
 
     Returns:
         pd.Series: Sentiment scores.
     """
     if model == "vader":
-        return compute_vader_sentiment(news_df)
-    elif model == "finbert":
-        return compute_finbert_sentiment(news_df)
+        def scorer(df):
+            return compute_vader_sentiment(df, n_jobs=vader_workers, fast=vader_fast)
+    elif model in FINBERT_BACKENDS and documents:
+        def scorer(df):
+            # the document text has already been joined into 'title'
+            return compute_finbert_document_sentiment(
+                df, fields=("title",), window=window, overlap=overlap, pooling=pooling,
+                batch_size=batch_size, num_threads=num_threads, backend=model
+            )
+    elif model in FINBERT_BACKENDS:
+        def scorer(df):
+            return compute_finbert_sentiment(df, batch_size=batch_size, num_threads=num_threads, backend=model)
     else:
-        raise ValueError("Invalid model. Choose 'vader' or 'finbert'.")
\ No newline at end of file
+        raise ValueError(f"Invalid model. Choose 'vader' or one of {FINBERT_BACKENDS}.")
+
+    if documents:
+        news_df = news_df.assign(title=document_texts(news_df))
+    if cache is None:
+        return scorer(news_df)
+
+    titles = news_df["title"].fillna("").astype(str)
+
+    def lookup(identity):
+        name, revision = identity
+        if documents and model != "vader":
+            # window settings change FinBERT document scores
+            revision = f"{revision}+doc-{window}-{overlap}-{pooling}"
+        keys = [SentimentCache.make_key(name, revision, t) for t in titles]
+        return keys, cache.get_many(keys)
+
+    identity = _model_identity(model)
+    keys, scores = lookup(identity)
+    if model != "vader" and any(k not in scores for k in keys):
+        # scoring needs the model, and loading it may move 'main' to newer
+        # weights, whose commit must key the new scores
+        get_model(model)
+        if _model_identity(model) != identity:
+            identity = _model_identity(model)
+            keys, scores = lookup(identity)
+
+    # score each uncached text once, using its first row
+    first_pos = {}
+    for pos, key in enumerate(keys):
+        if key not in scores:
+            first_pos.setdefault(key, pos)
+    if first_pos:
+        missing = news_df.iloc[list(first_pos.values())]
+        fresh = scorer(missing.assign(title=titles.iloc[list(first_pos.values())].values))
+        new_scores = dict(zip(first_pos.keys(), fresh.values))
+        cache.put_many(new_scores.items())
+        scores.update(new_scores)
+
+    stats = cache.stats()
+    print(f"[Cache] {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)")
+    return pd.Series([scores[k] for k in keys], index=news_df.index, dtype=float)
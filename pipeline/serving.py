@@ -0,0 +1,454 @@
+"""
+Low-latency prediction service for a saved model.
+
+Includes:
+- ``PredictionService``: loads a model saved by ``trainer.save_model`` once,
+  checks requests against its feature spec, and micro-batches concurrent
+  requests into single ``predict`` calls (up to ``max_batch`` rows, or
+  ``max_wait`` seconds after the first request of a batch)
+- Latency and throughput accounting: p50/p99 request latency from
+  submission to result, requests/sec, predictions/sec and mean batch size
+- An HTTP/1.1 front end (keep-alive) served over TCP or a Unix socket:
+  ``POST /predict``, ``GET /stats`` and ``GET /health``
+- ``connect``: an ``http.client`` connection for either address kind, used
+  by ``benchmarks.bench_serving``
+
+A request carries the latest windows for any number of tickers, one list per
+feature in the model's spec, oldest day first:
+
+    {"windows": {"AAPL": {"return": [...], "sentiment": [...]}, ...}}
+
+or already-flattened rows in the spec's column order:
+
+    {"rows": {"AAPL": [...], ...}}
+
+Lists longer than the lookback are cut to their last ``lookback`` days. The
+response is ``{"predictions": {"AAPL": 0.0012, ...}}``.
+
+Usage:
+    python -m pipeline.serving --model data/models/model.pkl --port 8765
+    python -m pipeline.serving --model data/models/model.pkl --unix /tmp/forecast.sock
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pipeline.trainer import load_model_and_spec
+
+# marks the end of the stream on the request queue
+_STOP = object()
+
+
+class PredictionService:
+    """
+    Serves one model, coalescing concurrent requests into batched predictions.
+
+    Args:
+        model_path (str): Model saved with ``trainer.save_model``.
+        max_batch (int): Maximum rows per ``predict`` call. A single larger
+            request is still predicted in one call.
+        max_wait (float): Seconds a batch waits to fill after its first request.
+        queue_size (int): Maximum queued requests before callers block.
+        latency_window (int): Most recent request latencies kept for percentiles.
+    """
+
+    def __init__(self, model_path: str, max_batch: int = 512, max_wait: float = 0.002,
+                 queue_size: int = 10_000, latency_window: int = 100_000):
+        self.model, self.spec = load_model_and_spec(model_path)
+        self.model_path = model_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        if self.spec is not None:
+            self.lookback = self.spec["lookback"]
+            self.features = list(self.spec["features"])
+            self.n_columns = len(self.spec["columns"])
+        else:
+            # models saved before specs were stored: rows only, width from sklearn if known
+            self.lookback, self.features = None, None
+            self.n_columns = getattr(self.model, "n_features_in_", None)
+
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._thread: Optional[threading.Thread] = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._since = time.monotonic()
+        self._requests = 0
+        self._rows = 0
+        self._batches = 0
+        self._errors = 0
+        self._latencies.clear()
+
+    def rows_from_payload(self, payload: dict) -> Tuple[List[str], np.ndarray]:
+        """
+        Turns a request body into feature rows in the model's column order.
+
+        Args:
+            payload (dict): Parsed JSON with 'windows' or 'rows' (see module docstring).
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Tickers and a (n_tickers, n_columns) array.
+
+        Raises:
+            ValueError: If the payload does not match the model's feature spec.
+        """
+        if "windows" in payload:
+            if self.spec is None:
+                raise ValueError("model was saved without a feature spec; send flattened 'rows'")
+            windows = payload["windows"]
+            tickers = list(windows)
+            X = np.empty((len(tickers), self.lookback, len(self.features)))
+            for i, ticker in enumerate(tickers):
+                window = windows[ticker]
+                for j, feature in enumerate(self.features):
+                    if feature not in window:
+                        raise ValueError(f"{ticker}: missing '{feature}' window")
+                    values = window[feature]
+                    if len(values) < self.lookback:
+                        raise ValueError(f"{ticker}: '{feature}' needs {self.lookback} days, got {len(values)}")
+                    X[i, :, j] = values[len(values) - self.lookback:]
+            X = X.reshape(len(tickers), self.n_columns)
+        elif "rows" in payload:
+            tickers = list(payload["rows"])
+            X = np.asarray([payload["rows"][t] for t in tickers], dtype=float)
+            X = X.reshape(len(tickers), -1) if tickers else np.empty((0, self.n_columns or 0))
+            if self.n_columns is not None and X.shape[1] != self.n_columns and len(tickers):
+                raise ValueError(f"rows need {self.n_columns} columns, got {X.shape[1]}")
+        else:
+            raise ValueError("payload needs 'windows' or 'rows'")
+
+        if not np.isfinite(X).all():
+            bad = [t for t, row in zip(tickers, X) if not np.isfinite(row).all()]
+            raise ValueError(f"non-finite features for: {', '.join(bad)}")
+        return tickers, X
+
+    def submit(self, X: np.ndarray, timeout: Optional[float] = None) -> Future:
+        """
+        Queues feature rows for the next batch.
+
+        Returns:
+            Future: Resolves to the predictions for ``X``, in order.
+        """
+        future: Future = Future()
+        self.queue.put((np.asarray(X, dtype=float), future, time.perf_counter()), timeout=timeout)
+        return future
+
+    def predict(self, X: np.ndarray, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Predicts feature rows through the batcher; blocks until they are done.
+        """
+        if len(X) == 0:
+            return np.empty(0)
+        return self.submit(X, timeout).result(timeout)
+
+    def handle(self, payload: dict) -> dict:
+        """
+        Answers one parsed ``/predict`` request body.
+        """
+        tickers, X = self.rows_from_payload(payload)
+        predictions = self.predict(X)
+        return {"predictions": {t: float(p) for t, p in zip(tickers, predictions)}}
+
+    def _next_batch(self) -> Optional[list]:
+        first = self.queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        rows = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)  # finish this batch, stop on the next call
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run_batch(self, batch: list):
+        try:
+            X = batch[0][0] if len(batch) == 1 else np.vstack([item[0] for item in batch])
+            predictions = np.asarray(self.model.predict(X), dtype=float).reshape(-1)
+        except Exception as e:
+            if len(batch) > 1:
+                # one bad request (e.g. rows of the wrong width) must not fail the others
+                for item in batch:
+                    self._run_batch([item])
+                return
+            for _, future, _ in batch:
+                future.set_exception(e)
+            with self._lock:
+                self._errors += len(batch)
+            return
+
+        done = time.perf_counter()
+        offsets = np.cumsum([len(item[0]) for item in batch])[:-1]
+        for (_, future, submitted), result in zip(batch, np.split(predictions, offsets)):
+            future.set_result(result)
+        with self._lock:
+            self._requests += len(batch)
+            self._rows += len(predictions)
+            self._batches += 1
+            self._latencies.extend(done - submitted for _, _, submitted in batch)
+
+    def run(self):
+        """
+        Consumes the request queue until ``stop`` is called.
+        """
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            self._run_batch(batch)
+
+    def start(self) -> threading.Thread:
+        """
+        Runs the batcher in a background thread.
+        """
+        self._thread = threading.Thread(target=self.run, name="serve-batcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Answers requests already queued, then stops the batcher.
+        """
+        self.queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self, reset: bool = False) -> dict:
+        """
+        Reports latency and throughput since start or the last reset.
+
+        Args:
+            reset (bool): Start a new measurement window afterwards.
+
+        Returns:
+            dict: Request latency percentiles in ms (over the last
+            ``latency_window`` requests), request, prediction and batch
+            counts, and requests/sec and predictions/sec.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._since, 1e-9)
+            latencies = np.asarray(self._latencies) * 1000
+            stats = {
+                "requests": self._requests,
+                "predictions": self._rows,
+                "batches": self._batches,
+                "errors": self._errors,
+                "seconds": round(elapsed, 3),
+                "requests_per_sec": self._requests / elapsed,
+                "predictions_per_sec": self._rows / elapsed,
+                "mean_batch_requests": self._requests / self._batches if self._batches else 0.0,
+                "mean_batch_rows": self._rows / self._batches if self._batches else 0.0,
+                "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+                "mean_ms": float(latencies.mean()) if len(latencies) else None,
+                "queued": self.queue.qsize(),
+            }
+            if reset:
+                self._reset_counters()
+        return stats
+
+    def info(self) -> dict:
+        """
+        Describes the loaded model for ``GET /health``.
+        """
+        return {"status": "ok", "model": self.model_path, "model_type": type(self.model).__name__,
+                "spec": self.spec, "max_batch": self.max_batch, "max_wait": self.max_wait}
+
+
+def make_handler(service: PredictionService, tcp: bool = True):
+    """
+    Builds a request handler class bound to ``service``.
+
+    Args:
+        service (PredictionService): Running service answering requests.
+        tcp (bool): Disable Nagle's algorithm; headers and body go out as
+            separate writes, which otherwise stall on delayed ACKs.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse connections
+        disable_nagle_algorithm = tcp
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path, _, query = self.path.partition("?")
+            if path == "/health":
+                self._send(200, service.info())
+            elif path == "/stats":
+                self._send(200, service.stats(reset="reset=1" in query.split("&")))
+            else:
+                self._send(404, {"error": f"unknown path {path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                response = service.handle(json.loads(body))
+            except (ValueError, TypeError, KeyError) as e:
+                self._send(400, {"error": str(e)})
+                return
+            except Exception as e:
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self._send(200, response)
+
+        def log_message(self, format, *args):
+            pass  # per-request logging would dominate latency; see /stats
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    HTTP server on a Unix domain socket, one thread per connection.
+    """
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # stale socket from an earlier run
+        super().server_bind()
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)  # BaseHTTPRequestHandler expects a (host, port) pair
+
+
+def make_server(service: PredictionService, host: str = "127.0.0.1", port: int = 8765,
+                unix_path: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Creates the HTTP server for ``service`` on TCP or, if given, a Unix socket.
+    """
+    if unix_path:
+        return UnixHTTPServer(unix_path, make_handler(service, tcp=False))
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    ``http.client`` connection over a Unix domain socket.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def connect(address: str, timeout: float = 30.0) -> http.client.HTTPConnection:
+    """
+    Opens a keep-alive connection to a running service.
+
+    Args:
+        address (str): 'unix:/path/to.sock' or 'http://host:port'.
+        timeout (float): Socket timeout in seconds.
+
+    Returns:
+        http.client.HTTPConnection: Connection for ``request``/``getresponse``.
+    """
+    if address.startswith("unix:"):
+        return UnixHTTPConnection(address[len("unix:"):], timeout)
+    host, _, port = address.replace("http://", "").rstrip("/").partition(":")
+    conn = http.client.HTTPConnection(host, int(port or 80), timeout=timeout)
+    conn.connect()
+    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conn
+
+
+def request(conn: http.client.HTTPConnection, method: str, path: str, body: Optional[dict] = None) -> Dict:
+    """
+    Sends one request on ``conn`` and returns the decoded JSON response.
+
+    Raises:
+        RuntimeError: On a non-200 response.
+    """
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if data is not None else {}
+    conn.request(method, path, body=data, headers=headers)
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    if response.status != 200:
+        raise RuntimeError(f"{response.status}: {result.get('error')}")
+    return result
+
+
+def _log_stats(service: PredictionService, every: float):
+    while True:
+        time.sleep(every)
+        s = service.stats(reset=True)
+        if s["requests"]:
+            print(f"[Serve] {s['requests_per_sec']:,.0f} req/s, {s['predictions_per_sec']:,.0f} predictions/s, "
+                  f"p50 {s['p50_ms']:.2f} ms, p99 {s['p99_ms']:.2f} ms, "
+                  f"{s['mean_batch_requests']:.1f} requests/batch")
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(description="Serve batched predictions from a saved model.")
+    parser.add_argument("--model", default=config.MODEL_PATH, help="Model saved by main.py.")
+    parser.add_argument("--host", default=config.SERVE_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVE_PORT)
+    parser.add_argument("--unix", default=None, metavar="PATH", help="Listen on a Unix socket instead of TCP.")
+    parser.add_argument("--max-batch", type=int, default=config.SERVE_MAX_BATCH)
+    parser.add_argument("--max-wait", type=float, default=config.SERVE_MAX_WAIT)
+    parser.add_argument("--stats-every", type=float, default=10.0,
+                        help="Seconds between latency/throughput log lines; 0 disables them.")
+    args = parser.parse_args()
+
+    service = PredictionService(args.model, max_batch=args.max_batch, max_wait=args.max_wait)
+    service.start()
+    server = make_server(service, args.host, args.port, args.unix)
+    if args.stats_every > 0:
+        threading.Thread(target=_log_stats, args=(service, args.stats_every), daemon=True).start()
+    where = f"unix:{args.unix}" if args.unix else f"http://{args.host}:{args.port}"
+    print(f"[Serve] {type(service.model).__name__} from {args.model} on {where}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
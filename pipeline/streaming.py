@@ -0,0 +1,473 @@
+"""
+Streaming sentiment scoring and prediction daemon.
+
+Includes:
+- A bounded ingest queue: producers block (or time out) when it is full,
+  which applies backpressure to watchers and API callers
+- A directory watcher that polls the raw NewsAPI/Reddit/Twitter dumps and
+  enqueues only items it has not seen, even when a day's file is rewritten
+- Micro-batching: items are scored together once ``batch_size`` have
+  arrived or ``max_wait`` seconds have passed since the first one
+- Scoring through ``compute_sentiment_scores`` and the persistent sentiment
+  cache, so each text is scored once
+- Per-ticker daily sentiment sums and counts updated incrementally and
+  pruned to the days a prediction window needs
+- A fresh prediction per touched ticker from the model saved by
+  ``trainer.save_model``, using ``features.latest_window`` so the feature
+  layout matches ``build_dataset``
+
+News dated after the latest stored close is folded into that last trading
+day, so a headline landing intraday moves the current prediction.
+
+Usage:
+    python -m pipeline.streaming --model data/models/model.pkl --watch data/raw
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from pipeline.cache import SentimentCache
+from pipeline.features import latest_window
+from pipeline import instrument
+from pipeline.instrument import span
+from pipeline.news_store import RAW_SOURCES, read_raw_file
+from pipeline.sentiment import compute_sentiment_scores, get_model
+from pipeline.trainer import load_model_and_spec
+
+# marks the end of the stream on the ingest queue
+_STOP = object()
+
+
+class DirectoryWatcher:
+    """
+    Polls raw dump directories and submits unseen items.
+
+    Raw files are named ``{TICKER}_{YYYY-MM-DD}.json`` and may be rewritten
+    with more items during the day, in any order, so seen items are tracked
+    per file by content rather than by position.
+
+    Args:
+        raw_root (str): Directory holding newsapi/, reddit/ and twitter/ dumps.
+        submit (Callable[[List[dict]], None]): Receives new items; may block.
+        tickers (Optional[Sequence[str]]): Tickers to watch. All if None.
+        max_files (int): Files whose seen-item sets are kept in memory; the
+            least recently modified are compacted first to sorted arrays of
+            64-bit item hashes, which still keep their items from being
+            submitted again if the file is rewritten.
+        max_age_days (Optional[int]): Ignore files dated more than this many
+            days before today and forget their state. All dates if None.
+    """
+
+    def __init__(self, raw_root: str, submit: Callable[[List[dict]], None],
+                 tickers: Optional[Sequence[str]] = None, max_files: int = 2_000,
+                 max_age_days: Optional[int] = None):
+        self.raw_root = raw_root
+        self.submit = submit
+        self.tickers = set(tickers) if tickers else None
+        self.max_files = max_files
+        self.max_age_days = max_age_days
+        self._mtimes: Dict[str, int] = {}
+        self._seen: "OrderedDict[str, set]" = OrderedDict()
+        self._compacted: Dict[str, np.ndarray] = {}
+
+    def prime(self):
+        """
+        Marks everything currently on disk as seen, so only later items are streamed.
+        """
+        self.poll(emit=False)
+
+    def _seen_keys(self, path: str, keys: List[tuple]) -> set:
+        # a compacted file's seen-set is rebuilt from the keys still in it
+        seen = self._seen.pop(path, None)
+        if seen is None:
+            hashes = self._compacted.pop(path, None)
+            if hashes is None:
+                return set()
+            found = np.isin(np.fromiter((hash(k) for k in keys), dtype=np.int64, count=len(keys)), hashes)
+            seen = {k for k, hit in zip(keys, found) if hit}
+        return seen
+
+    def _forget(self, paths):
+        for path in paths:
+            self._mtimes.pop(path, None)
+            self._seen.pop(path, None)
+            self._compacted.pop(path, None)
+
+    def poll(self, emit: bool = True) -> int:
+        """
+        Scans once for new or modified files and submits their new items.
+
+        Returns:
+            int: Number of items submitted.
+        """
+        oldest = None
+        if self.max_age_days is not None:
+            oldest = (date.today() - timedelta(days=self.max_age_days)).isoformat()
+        submitted = 0
+        present = set()
+        for raw_dir, source in RAW_SOURCES.items():
+            for path in glob.glob(os.path.join(self.raw_root, raw_dir, "*.json")):
+                ticker, day = os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)
+                if self.tickers is not None and ticker not in self.tickers:
+                    continue
+                if oldest is not None and day < oldest:
+                    continue
+                present.add(path)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if self._mtimes.get(path) == mtime:
+                    continue
+
+                try:
+                    rows = read_raw_file(path, raw_dir)
+                except ValueError:
+                    continue  # partially written; mtime not recorded, so retried on the next poll
+                self._mtimes[path] = mtime
+                keys = list(zip(rows["title"], rows["content"]))
+                seen = self._seen_keys(path, keys)
+                self._seen[path] = seen
+                items = []
+                for key, row in zip(keys, rows.itertuples(index=False)):
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    items.append({
+                        "ticker": ticker,
+                        "source": source,
+                        "date": row.date if pd.notna(row.date) else pd.Timestamp(day),
+                        "title": row.title or "",
+                        "received_at": time.time(),
+                    })
+                if items and emit:
+                    self.submit(items)
+                    submitted += len(items)
+
+        # deleted files and files that aged out of the window
+        self._forget([p for p in self._mtimes if p not in present])
+        while len(self._seen) > self.max_files:
+            old, seen = self._seen.popitem(last=False)
+            self._compacted[old] = np.unique(np.fromiter((hash(k) for k in seen), dtype=np.int64,
+                                                         count=len(seen)))
+        return submitted
+
+
+class StreamingPredictor:
+    """
+    Long-running scorer that turns incoming headlines into fresh predictions.
+
+    Args:
+        model_path (str): Model saved with ``trainer.save_model``.
+        tickers (Sequence[str]): Tickers to predict.
+        sentiment_model (str): 'vader' or a FinBERT backend ('finbert',
+            'finbert-int8', 'finbert-onnx').
+        lookback (int): Days per feature window; must match the model's
+            saved feature spec.
+        batch_size (int): Maximum items per scoring call.
+        max_wait (float): Seconds to wait for a batch to fill after its first item.
+        queue_size (int): Maximum queued items before producers block.
+        price_refresh (float): Seconds between price reloads.
+        offline (bool): Serve prices from the local cache only.
+        cache_path (Optional[str]): Sentiment cache location. No cache if None.
+        on_prediction (Optional[Callable[[dict], None]]): Receives each
+            prediction. Defaults to printing it.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tickers: Sequence[str],
+        sentiment_model: str = "finbert",
+        lookback: int = 5,
+        batch_size: int = 32,
+        max_wait: float = 0.5,
+        queue_size: int = 10_000,
+        price_refresh: float = 300.0,
+        offline: bool = True,
+        cache_path: Optional[str] = None,
+        on_prediction: Optional[Callable[[dict], None]] = None
+    ):
+        self.model, spec = load_model_and_spec(model_path)
+        if spec is not None and (spec["lookback"] != lookback or spec["features"] != ["return", "sentiment"]):
+            raise ValueError(f"{model_path} was trained on {spec['lookback']} days of {spec['features']}; "
+                             f"the daemon builds {lookback} days of ['return', 'sentiment']")
+        self.tickers = list(tickers)
+        self.sentiment_model = sentiment_model
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.price_refresh = price_refresh
+        self.offline = offline
+        self.cache_path = cache_path
+        self.on_prediction = on_prediction or (lambda p: print(
+            f"[Stream] {p['ticker']} {p['as_of']} prediction={p['prediction']:+.6f} "
+            f"({p['n_items']} new items, {p['latency_ms']:.0f} ms)"
+        ))
+
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        # ticker -> {date: [sentiment sum, item count]}, pruned to the window
+        self.daily: Dict[str, Dict[pd.Timestamp, list]] = {t: {} for t in self.tickers}
+        self.prices: Optional[pd.DataFrame] = None
+        self._prices_loaded_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, items: List[dict], timeout: Optional[float] = None):
+        """
+        Enqueues items with 'ticker', 'date' and 'title' (optionally 'source').
+
+        Blocks while the queue is full; with a timeout, raises ``queue.Full``
+        if space does not free up in time.
+        """
+        for item in items:
+            item.setdefault("received_at", time.time())
+            self.queue.put(item, timeout=timeout)
+
+    def _refresh_prices(self):
+        if self.prices is not None and time.time() - self._prices_loaded_at < self.price_refresh:
+            return
+        from pipeline.price_store import load_prices
+
+        # enough calendar days to cover the window over weekends and holidays
+        start = (date.today() - timedelta(days=3 * self.lookback + 14)).isoformat()
+        end = (date.today() + timedelta(days=1)).isoformat()
+        self.prices = load_prices(self.tickers, start, end, offline=self.offline).ffill()
+        self._prices_loaded_at = time.time()
+
+    def _next_batch(self) -> Optional[List[dict]]:
+        first = self.queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)  # finish this batch, stop on the next call
+                break
+            batch.append(item)
+        return batch
+
+    def _update_aggregates(self, batch: List[dict], scores: np.ndarray, last_close: Dict[str, pd.Timestamp]):
+        for item, score in zip(batch, scores):
+            ticker = item["ticker"]
+            if ticker not in self.daily:
+                continue
+            day = pd.Timestamp(item["date"]).normalize()
+            if ticker in last_close and day > last_close[ticker]:
+                day = last_close[ticker]
+            agg = self.daily[ticker].setdefault(day, [0.0, 0])
+            agg[0] += float(score)
+            agg[1] += 1
+
+    def _prune(self, ticker: str):
+        days = self.daily[ticker]
+        if self.prices is None or self.prices.empty:
+            return
+        # keep the window plus the latest day before it, which is forward-filled into it
+        index = self.prices[ticker].dropna().index
+        if len(index) <= self.lookback + 1:
+            return
+        cutoff = index[-(self.lookback + 1)]
+        older = sorted(d for d in days if d < cutoff)
+        for d in older[:-1]:
+            del days[d]
+
+    def _predict(self, ticker: str) -> Optional[float]:
+        days = self.daily[ticker]
+        if not days or self.prices is None or ticker not in self.prices:
+            return None
+        sentiment_df = pd.DataFrame({
+            "date": list(days),
+            "sentiment": [s / n for s, n in days.values()],
+        })
+        X = latest_window(self.prices[ticker].dropna(), sentiment_df, self.lookback)
+        if len(X) == 0 or np.isnan(X).any():
+            return None
+        return float(self.model.predict(X)[0])
+
+    def seed(self, news_df: pd.DataFrame, cache: Optional[SentimentCache] = None):
+        """
+        Loads recent history into the daily aggregates without emitting predictions.
+
+        Without it, windows reaching back before the first streamed item have
+        no sentiment and no prediction is made until the window fills.
+
+        Args:
+            news_df (pd.DataFrame): Recent rows with 'date', 'ticker' and 'title'
+                (e.g. from ``news_store.load_news``).
+            cache (Optional[SentimentCache]): Open sentiment cache.
+        """
+        if news_df.empty:
+            return
+        self._refresh_prices()
+        scores = compute_sentiment_scores(news_df, model=self.sentiment_model,
+                                          batch_size=self.batch_size, cache=cache).to_numpy()
+        items = [{"ticker": str(t), "date": d} for t, d in zip(news_df["ticker"], news_df["date"])]
+        last_close = {t: self.prices[t].dropna().index[-1] for t in self.tickers
+                      if t in self.prices and self.prices[t].notna().any()}
+        self._update_aggregates(items, scores, last_close)
+        for ticker in self.tickers:
+            self._prune(ticker)
+
+    def process_batch(self, batch: List[dict], cache: Optional[SentimentCache] = None) -> List[dict]:
+        """
+        Scores a batch, updates the daily aggregates and predicts every touched ticker.
+
+        Args:
+            batch (List[dict]): Items from the queue.
+            cache (Optional[SentimentCache]): Open sentiment cache.
+
+        Returns:
+            List[dict]: One prediction per touched ticker with enough history.
+        """
+        self._refresh_prices()
+        news_df = pd.DataFrame({"title": [item.get("title") or "" for item in batch]})
+        with span("stream.score", items=len(batch), unit="texts"):
+            scores = compute_sentiment_scores(news_df, model=self.sentiment_model,
+                                              batch_size=self.batch_size, cache=cache).to_numpy()
+
+        last_close = {t: self.prices[t].dropna().index[-1] for t in self.tickers
+                      if t in self.prices and self.prices[t].notna().any()}
+        self._update_aggregates(batch, scores, last_close)
+
+        predictions = []
+        touched: Dict[str, List[dict]] = {}
+        for item in batch:
+            touched.setdefault(item["ticker"], []).append(item)
+        for ticker, items in touched.items():
+            if ticker not in self.daily:
+                continue
+            self._prune(ticker)
+            prediction = self._predict(ticker)
+            if prediction is None:
+                continue
+            result = {
+                "ticker": ticker,
+                "as_of": last_close[ticker].strftime("%Y-%m-%d"),
+                "prediction": prediction,
+                "n_items": len(items),
+                "latency_ms": 1000 * (time.time() - min(i["received_at"] for i in items)),
+                "emitted_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self.on_prediction(result)
+            predictions.append(result)
+        return predictions
+
+    def run(self):
+        """
+        Consumes the queue until ``stop`` is called.
+        """
+        get_model(self.sentiment_model)
+        cache = SentimentCache(self.cache_path) if self.cache_path else None
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    break
+                self.process_batch(batch, cache)
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def start(self) -> threading.Thread:
+        """
+        Runs the consumer in a background thread.
+        """
+        self._thread = threading.Thread(target=self.run, name="stream-consumer", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Processes items already queued, then stops the consumer.
+        """
+        self.queue.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def _append_jsonl(path: str) -> Callable[[dict], None]:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def write(prediction: dict):
+        with open(path, "a") as f:
+            f.write(json.dumps(prediction) + "\n")
+        print(f"[Stream] {prediction['ticker']} prediction={prediction['prediction']:+.6f} "
+              f"({prediction['latency_ms']:.0f} ms)")
+    return write
+
+
+if __name__ == "__main__":
+    import config
+
+    parser = argparse.ArgumentParser(description="Stream new headlines into fresh predictions.")
+    parser.add_argument("--model", default=config.MODEL_PATH, help="Model saved by main.py.")
+    parser.add_argument("--watch", default="data/raw", help="Raw dump directory to poll.")
+    parser.add_argument("--tickers", nargs="+", default=config.TICKERS)
+    parser.add_argument("--sentiment-model", choices=["vader", "finbert", "finbert-int8", "finbert-onnx"],
+                        default=config.SENTIMENT_MODEL)
+    parser.add_argument("--poll-interval", type=float, default=config.STREAM_POLL_SECONDS)
+    parser.add_argument("--output", default=config.STREAM_PREDICTIONS_PATH)
+    parser.add_argument("--online", action="store_true", help="Top up prices from yfinance.")
+    parser.add_argument("--replay", action="store_true", help="Also stream items already on disk.")
+    parser.add_argument("--report-every", type=float, default=config.STREAM_REPORT_SECONDS,
+                        help="Seconds between instrumentation reports; 0 disables them.")
+    args = parser.parse_args()
+
+    predictor = StreamingPredictor(
+        args.model,
+        args.tickers,
+        sentiment_model=args.sentiment_model,
+        lookback=config.LOOKBACK,
+        batch_size=config.STREAM_BATCH_SIZE,
+        max_wait=config.STREAM_MAX_WAIT,
+        queue_size=config.STREAM_QUEUE_SIZE,
+        offline=not args.online,
+        cache_path=config.SENTIMENT_CACHE_PATH,
+        on_prediction=_append_jsonl(args.output)
+    )
+    from pipeline.news_store import load_news
+
+    # seed the aggregates with the days the first windows cover
+    since = (date.today() - timedelta(days=3 * config.LOOKBACK + 14)).isoformat()
+    with SentimentCache(config.SENTIMENT_CACHE_PATH) as cache:
+        predictor.seed(load_news(args.tickers, since, columns=["date", "title", "ticker"]), cache)
+
+    # older files cannot reach the windows being predicted
+    watcher = DirectoryWatcher(args.watch, predictor.submit, args.tickers,
+                               max_age_days=3 * config.LOOKBACK + 14)
+    if not args.replay:
+        watcher.prime()
+    predictor.start()
+    print(f"[Stream] Watching {args.watch} every {args.poll_interval}s; Ctrl-C to stop")
+    next_report = time.monotonic() + args.report_every
+    try:
+        while True:
+            watcher.poll()
+            if args.report_every > 0 and time.monotonic() >= next_report:
+                # report the interval's spans and start a new one, so memory stays flat
+                summary = instrument.write_report(config.STREAM_REPORT_PATH, reset=True)["summary"]
+                print(instrument.format_summary(summary))
+                next_report = time.monotonic() + args.report_every
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        predictor.stop()
@@ -0,0 +1,283 @@
+"""
+Parallel hyperparameter and configuration sweeps.
+
+Includes:
+- Grid and random search over model type, XGBoost params, lookback and horizon
+- One feature matrix per distinct (lookback, horizon), shared by every trial
+  that uses it through read-only memory-mapped files
+- Trials fanned out across a process pool with per-trial time budgets and
+  early stopping on a chronological validation block
+- XGBoost trained with the ``hist`` method on a QuantileDMatrix that each
+  worker builds once per (dataset, max_bin) and reuses across trials
+- A single results table of ``evaluate_model`` metrics
+
+Usage:
+    python -m pipeline.sweep                # full grid over config.SWEEP_SPACE
+    python -m pipeline.sweep --random 20 --output data/reports/sweep.csv
+"""
+
+import itertools
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from pipeline.evaluator import evaluate_model
+from pipeline.trainer import make_model
+
+XGB_PARAMS = ["max_depth", "learning_rate", "n_estimators", "subsample",
+              "colsample_bytree", "min_child_weight", "max_bin"]
+
+# per-worker caches: dataset key -> (X, y) memmaps, (key, max_bin) -> DMatrices
+_DATASETS: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+_DMATRICES: Dict[tuple, object] = {}
+
+
+def grid_search_space(space: Dict[str, Sequence]) -> List[dict]:
+    """
+    Expands a parameter grid into a list of trials.
+
+    Args:
+        space (Dict[str, Sequence]): Candidate values per parameter.
+
+    Returns:
+        List[dict]: Every combination of the candidate values.
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search_space(space: Dict[str, Sequence], n_trials: int, seed: int = 42) -> List[dict]:
+    """
+    Samples trials uniformly from a parameter grid without repetition.
+
+    Args:
+        space (Dict[str, Sequence]): Candidate values per parameter.
+        n_trials (int): Number of trials to draw.
+        seed (int): Seed for reproducibility.
+
+    Returns:
+        List[dict]: Sampled trials.
+    """
+    grid = grid_search_space(space)
+    return random.Random(seed).sample(grid, min(n_trials, len(grid)))
+
+
+def _split_bounds(n: int, test_size: float, val_size: float) -> Tuple[int, int]:
+    """
+    Returns (val_start, test_start) for a chronological train/val/test split.
+    """
+    test_start = int(n * (1 - test_size))
+    val_start = int(test_start * (1 - val_size))
+    return val_start, test_start
+
+
+def _load_dataset(key: Tuple[int, int], paths: Tuple[str, str]) -> Tuple[np.ndarray, np.ndarray]:
+    if key not in _DATASETS:
+        _DATASETS[key] = (np.load(paths[0], mmap_mode="r"), np.load(paths[1], mmap_mode="r"))
+    return _DATASETS[key]
+
+
+def _time_budget_callback(seconds: Optional[float]):
+    """
+    Builds an XGBoost callback that stops training once a wall-clock budget is spent.
+    """
+    from xgboost.callback import TrainingCallback
+
+    class TimeBudget(TrainingCallback):
+        def __init__(self):
+            super().__init__()
+            self.start = time.perf_counter()
+            self.timed_out = False
+
+        def after_iteration(self, model, epoch, evals_log):
+            if seconds is not None and time.perf_counter() - self.start > seconds:
+                self.timed_out = True
+            return self.timed_out
+
+    return TimeBudget()
+
+
+def _run_xgboost(key, X, y, bounds, trial, time_budget, early_stopping_rounds, random_state):
+    import xgboost as xgb
+
+    val_start, test_start = bounds
+    max_bin = trial.get("max_bin", 256)
+    cache_key = (key, max_bin)
+    if cache_key not in _DMATRICES:
+        dtrain = xgb.QuantileDMatrix(X[:val_start], y[:val_start], max_bin=max_bin)
+        dval = xgb.QuantileDMatrix(X[val_start:test_start], y[val_start:test_start], ref=dtrain)
+        dtest = xgb.DMatrix(X[test_start:])
+        _DMATRICES[cache_key] = (dtrain, dval, dtest)
+    dtrain, dval, dtest = _DMATRICES[cache_key]
+
+    params = {
+        "objective": "reg:squarederror",
+        "tree_method": "hist",
+        "max_bin": max_bin,
+        "max_depth": trial.get("max_depth", 3),
+        "eta": trial.get("learning_rate", 0.1),
+        "subsample": trial.get("subsample", 0.8),
+        "colsample_bytree": trial.get("colsample_bytree", 0.8),
+        "min_child_weight": trial.get("min_child_weight", 1),
+        "seed": random_state,
+        "nthread": 1,
+    }
+    budget = _time_budget_callback(time_budget)
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=trial.get("n_estimators", 100),
+        evals=[(dval, "val")],
+        early_stopping_rounds=early_stopping_rounds,
+        callbacks=[budget],
+        verbose_eval=False
+    )
+    best = getattr(booster, "best_iteration", None)
+    y_pred = booster.predict(dtest, iteration_range=(0, best + 1) if best is not None else (0, 0))
+    return booster, y_pred, {"n_trees": booster.num_boosted_rounds(), "timed_out": budget.timed_out}
+
+
+def _run_trial(key, paths, trial, test_size, val_size, time_budget, early_stopping_rounds, random_state) -> dict:
+    X, y = _load_dataset(key, paths)
+    bounds = _split_bounds(len(y), test_size, val_size)
+    test_start = bounds[1]
+
+    start = time.perf_counter()
+    if trial["model_type"] == "xgboost":
+        model, y_pred, extra = _run_xgboost(key, X, y, bounds, trial, time_budget,
+                                            early_stopping_rounds, random_state)
+    else:
+        model = make_model(trial["model_type"], random_state)
+        model.fit(X[:test_start], y[:test_start])
+        y_pred = model.predict(X[test_start:])
+        extra = {"n_trees": None, "timed_out": False}
+    elapsed = time.perf_counter() - start
+
+    metrics = evaluate_model(model, X[test_start:], y[test_start:], y_pred)
+    return {**trial, **metrics, **extra, "fit_seconds": elapsed, "n_train": test_start, "n_test": len(y) - test_start}
+
+
+def run_sweep(
+    build_fn: Callable[[int, int], Tuple[np.ndarray, np.ndarray]],
+    trials: List[dict],
+    test_size: float = 0.2,
+    val_size: float = 0.1,
+    time_budget: Optional[float] = config.SWEEP_TRIAL_SECONDS,
+    early_stopping_rounds: Optional[int] = config.SWEEP_EARLY_STOPPING_ROUNDS,
+    max_workers: Optional[int] = None,
+    random_state: int = 42
+) -> pd.DataFrame:
+    """
+    Runs every trial and collects comparable test metrics.
+
+    Data is split chronologically: the last ``test_size`` fraction is the
+    test set and the last ``val_size`` fraction of the remainder is used by
+    XGBoost for early stopping. Linear models train on train + validation.
+
+    Args:
+        build_fn (Callable[[int, int], Tuple[np.ndarray, np.ndarray]]):
+            Builds (X, y) for a (lookback, horizon) pair, with samples in time
+            order. Called once per distinct pair.
+        trials (List[dict]): Trials from ``grid_search_space`` or
+            ``random_search_space``. Each needs 'model_type', 'lookback' and
+            'horizon'; XGBoost trials may set any of ``XGB_PARAMS``.
+        test_size (float): Fraction of samples held out for testing.
+        val_size (float): Fraction of the training block used for early stopping.
+        time_budget (Optional[float]): Wall-clock seconds per XGBoost trial.
+        early_stopping_rounds (Optional[int]): Rounds without validation
+            improvement before XGBoost stops.
+        max_workers (Optional[int]): Worker processes. Defaults to the CPU count.
+        random_state (int): Seed for reproducibility.
+
+    Returns:
+        pd.DataFrame: One row per trial with its parameters, MSE, IC,
+        Directional Accuracy, fit time and tree count, best MSE first.
+    """
+    # XGBoost params are irrelevant to other models, so collapse those duplicates
+    unique = {}
+    for t in trials:
+        if t["model_type"] != "xgboost":
+            t = {k: v for k, v in t.items() if k not in XGB_PARAMS}
+        unique.setdefault(tuple(sorted(t.items())), t)
+    trials = list(unique.values())
+    keys = sorted({(t["lookback"], t["horizon"]) for t in trials})
+
+    with tempfile.TemporaryDirectory(prefix="sweep_") as tmp:
+        paths = {}
+        for lookback, horizon in keys:
+            X, y = build_fn(lookback, horizon)
+            x_path = os.path.join(tmp, f"X_{lookback}_{horizon}.npy")
+            y_path = os.path.join(tmp, f"y_{lookback}_{horizon}.npy")
+            np.save(x_path, np.ascontiguousarray(X, dtype=np.float64))
+            np.save(y_path, np.ascontiguousarray(y, dtype=np.float64))
+            paths[(lookback, horizon)] = (x_path, y_path)
+            print(f"[Sweep] Built dataset lookback={lookback} horizon={horizon}: {X.shape}")
+
+        # submit trials grouped by dataset so workers hit their caches
+        ordered = sorted(trials, key=lambda t: (t["lookback"], t["horizon"], t.get("max_bin", 256)))
+        with ProcessPoolExecutor(max_workers) as pool:
+            futures = [
+                pool.submit(_run_trial, (t["lookback"], t["horizon"]), paths[(t["lookback"], t["horizon"])],
+                            t, test_size, val_size, time_budget, early_stopping_rounds, random_state)
+                for t in ordered
+            ]
+            rows = [f.result() for f in futures]
+
+    return pd.DataFrame(rows).sort_values("MSE").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import main as pipeline_main
+    from pipeline import sweep  # workers pickle trials by module path, which __main__ lacks
+    from pipeline.dag import run_pipeline
+    from pipeline.features import build_panel_dataset
+
+    parser = argparse.ArgumentParser(description="Sweep models and settings over config.SWEEP_SPACE.")
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="Sample N trials instead of running the full grid.")
+    parser.add_argument("--trial-seconds", type=float, default=config.SWEEP_TRIAL_SECONDS)
+    parser.add_argument("--early-stopping-rounds", type=int, default=config.SWEEP_EARLY_STOPPING_ROUNDS)
+    parser.add_argument("--test-size", type=float, default=config.TEST_SPLIT_RATIO)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--sentiment-model", default=config.SENTIMENT_MODEL)
+    parser.add_argument("--offline", action="store_true", help="Serve prices from the local cache.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Also write the results table as CSV.")
+    args = parser.parse_args()
+
+    # prices and daily sentiment come from main.py's cached stages
+    stage_args = ["--sentiment-model", args.sentiment_model] + (["--offline"] if args.offline else [])
+    outputs = run_pipeline(pipeline_main.build_stages(pipeline_main.parse_args(stage_args)),
+                           targets=["prices", "daily_sentiment"])
+    prices = outputs["prices"]
+    daily = outputs["daily_sentiment"][["date", "ticker"] + config.SENTIMENT_FEATURES]
+
+    if args.random is None:
+        trials = sweep.grid_search_space(config.SWEEP_SPACE)
+    else:
+        trials = sweep.random_search_space(config.SWEEP_SPACE, args.random, args.seed)
+    print(f"[Sweep] Running {len(trials)} trials")
+    results = sweep.run_sweep(
+        lambda lookback, horizon: build_panel_dataset(prices, daily, lookback, horizon)[:2],
+        trials,
+        test_size=args.test_size,
+        time_budget=args.trial_seconds,
+        early_stopping_rounds=args.early_stopping_rounds,
+        max_workers=args.max_workers,
+        random_state=args.seed
+    )
+    print(results.to_string(index=False))
+    if args.output:
+        if os.path.dirname(args.output):
+            os.makedirs(os.path.dirname(args.output), exist_ok=True)
+        results.to_csv(args.output, index=False)
+        print(f"[Sweep] Results written to {args.output}")
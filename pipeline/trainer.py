@@ -3,13 +3,50 @@ Handles model training for sentiment-driven return prediction.
 
 Currently supports:
 - Linear Regression (via scikit-learn)
+- Incremental linear regression from sufficient statistics (see pipeline.online)
 - XGBoost (optional)
 """
 
+import os
+import pickle
+
 import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
-from typing import Tuple
+from typing import Optional, Tuple
+
+from pipeline.instrument import span
+
+
+def make_model(model_type: str = "linear", random_state: int = 42):
+    """
+    Creates an unfitted regression model.
+
+    Args:
+        model_type (str): Type of model ("linear", "online" or "xgboost").
+        random_state (int): Seed for reproducibility.
+
+    Returns:
+        An unfitted scikit-learn compatible regressor.
+    """
+    if model_type == "linear":
+        return LinearRegression()
+    elif model_type == "online":
+        from pipeline.online import IncrementalLinearRegression
+        return IncrementalLinearRegression()
+    elif model_type == "xgboost":
+        from xgboost import XGBRegressor
+        return XGBRegressor(
+            n_estimators=100,
+            max_depth=3,
+            learning_rate=0.1,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            objective="reg:squarederror",
+            random_state=random_state
+        )
+    else:
+        raise ValueError(f"Unsupported model type: {model_type}")
 
 
 def train_model(
@@ -25,7 +62,7 @@ def train_model(
     Args:
         X (np.ndarray): Feature matrix.
         y (np.ndarray): Target returns.
-        model_type (str): Type of model to train ("linear" or "xgboost").
+        model_type (str): Type of model to train ("linear", "online" or "xgboost").
         test_size (float): Fraction of data to reserve for validation.
         random_state (int): Seed for reproducibility.
 
@@ -36,23 +73,49 @@ def train_model(
         X, y, test_size=test_size, random_state=random_state
     )
 
-    if model_type == "linear":
-        model = LinearRegression()
-    elif model_type == "xgboost":
-        from xgboost import XGBRegressor
-        model = XGBRegressor(
-            n_estimators=100,
-            max_depth=3,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective="reg:squarederror",
-            random_state=random_state
-        )
-    else:
-        raise ValueError(f"Unsupported model type: {model_type}")
-
-    model.fit(X_train, y_train)
+    model = make_model(model_type, random_state)
+    with span("model.fit", items=len(X_train), unit="rows"):
+        model.fit(X_train, y_train)
     y_pred = model.predict(X_test)
 
-    return model, X_test, y_test, y_pred
\ No newline at end of file
+    return model, X_test, y_test, y_pred
+
+
+def save_model(model, path: str, spec: Optional[dict] = None):
+    """
+    Persists a trained model so other processes (e.g. the streaming daemon or
+    the prediction service) can load it.
+
+    Args:
+        model: Fitted regressor returned by ``train_model``.
+        path (str): Output file.
+        spec (Optional[dict]): Feature layout from ``features.feature_spec``,
+            plus any training metadata, stored next to the model.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump({"model": model, "spec": spec}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+
+def load_model_and_spec(path: str) -> Tuple[object, Optional[dict]]:
+    """
+    Loads a model saved with ``save_model`` together with its feature spec.
+
+    Returns:
+        Tuple[object, Optional[dict]]: The model and its spec, which is None
+        for models saved without one.
+    """
+    with open(path, "rb") as f:
+        saved = pickle.load(f)
+    if isinstance(saved, dict) and "model" in saved:
+        return saved["model"], saved.get("spec")
+    return saved, None
+
+
+def load_model(path: str):
+    """
+    Loads a model saved with ``save_model``.
+    """
+    return load_model_and_spec(path)[0]
@@ -0,0 +1,253 @@
+"""
+Vectorized VADER compound scores.
+
+Reproduces NLTK's ``SentimentIntensityAnalyzer.polarity_scores(text)["compound"]``
+for a batch of texts. Each text is tokenized the way VADER's ``SentiText``
+does, then the tokens of the whole batch are processed as flat arrays:
+- lexicon, booster and negation lookups once per distinct token
+- the context rules (ALL CAPS emphasis, boosters and negations up to three
+  words back, "never so/this", idioms, "least", "kind of", "but") as
+  shifted array comparisons
+- VADER's per-text summation, punctuation emphasis, normalization and
+  rounding as array operations
+
+Scores match ``polarity_scores`` exactly, including its quirk that a
+repeated token reuses the valence computed at its first occurrence.
+"""
+
+import string
+import sys
+from itertools import chain
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+
+_PUNCTUATION = string.punctuation
+
+
+def tokenize(text: str, punc_list: Sequence[str]) -> List[str]:
+    """
+    Splits a text like ``SentiText.words_and_emoticons``.
+
+    Tokens shorter than two characters are dropped, and a token made of a
+    word plus one leading or trailing entry of ``punc_list`` is replaced by
+    the word. Contractions and most emoticons are kept.
+
+    Args:
+        text (str): Input text.
+        punc_list (Sequence[str]): ``VaderConstants.PUNC_LIST``.
+
+    Returns:
+        List[str]: Tokens.
+    """
+    tokens = [we for we in text.split() if len(we) > 1]
+    words_only = None
+    for k, we in enumerate(tokens):
+        if we[0] not in _PUNCTUATION and we[-1] not in _PUNCTUATION:
+            continue
+        if words_only is None:
+            no_punc = text.translate(str.maketrans("", "", _PUNCTUATION))
+            words_only = {w for w in no_punc.split() if len(w) > 1}
+        # the word part never contains punctuation, so the affix is the whole
+        # leading or trailing punctuation run
+        word = we.rstrip(_PUNCTUATION)
+        if we[len(word):] in punc_list and word in words_only:
+            tokens[k] = word
+            continue
+        word = we.lstrip(_PUNCTUATION)
+        if we[:len(we) - len(word)] in punc_list and word in words_only:
+            tokens[k] = word
+    return tokens
+
+
+def _python_sum(values: np.ndarray, rows: np.ndarray, n_rows: int) -> np.ndarray:
+    """
+    Sums ``values`` per row in the order given, with the same floating point
+    result as the builtin ``sum`` over each row's values.
+
+    Python 3.12+ ``sum`` uses Neumaier compensated summation; earlier
+    versions add left to right. Each step is applied to all rows at once.
+    """
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    order = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[order], np.arange(rank.max() + 2 if len(rank) else 1))
+
+    total = np.zeros(n_rows)
+    comp = np.zeros(n_rows)
+    compensated = sys.version_info >= (3, 12)
+    for r in range(len(bounds) - 1):
+        idx = order[bounds[r]:bounds[r + 1]]
+        d, x = rows[idx], values[idx]
+        s = total[d]
+        t = s + x
+        if compensated:
+            comp[d] += np.where(np.abs(s) >= np.abs(x), (s - t) + x, (x - t) + s)
+        total[d] = t
+    if compensated:
+        fix = (comp != 0) & np.isfinite(comp)
+        total[fix] += comp[fix]
+    return total
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Rounds like the builtin ``round``; values whose scaled form is too close
+    to a rounding boundary for ``np.rint`` to be exact fall back to it.
+    """
+    scale = 10.0 ** digits
+    scaled = values * scale
+    out = np.rint(scaled) / scale
+    close = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for k in np.flatnonzero(close):
+        out[k] = round(float(values[k]), digits)
+    return out
+
+
+def compound_scores(texts: Sequence[str], analyzer) -> np.ndarray:
+    """
+    Computes VADER compound scores for a batch of texts.
+
+    Args:
+        texts (Sequence[str]): Texts to score.
+        analyzer: NLTK ``SentimentIntensityAnalyzer`` providing the lexicon
+            and constants.
+
+    Returns:
+        np.ndarray: Compound score of each text, equal to
+        ``analyzer.polarity_scores(text)["compound"]``.
+    """
+    const = analyzer.constants
+    n_docs = len(texts)
+    docs = [tokenize(t, const.PUNC_LIST) for t in texts]
+    lengths = np.fromiter(map(len, docs), dtype=np.int64, count=n_docs)
+    flat = list(chain.from_iterable(docs))
+    n_tokens = len(flat)
+
+    sentiment = np.zeros(n_tokens)
+    doc = np.repeat(np.arange(n_docs), lengths)
+    if n_tokens:
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(n_tokens) - starts[doc]
+        n_of = lengths[doc]
+        tok, uniques = pd.factorize(np.asarray(flat, dtype=object))
+
+        # properties of each distinct token
+        lower = [u.lower() for u in uniques]
+        in_lex = np.array([w in analyzer.lexicon for w in lower])
+        valence = np.array([analyzer.lexicon.get(w, 0.0) for w in lower])
+        upper = np.array([u.isupper() for u in uniques])
+        is_booster = np.array([w in const.BOOSTER_DICT for w in lower])
+        booster = np.array([const.BOOSTER_DICT.get(w, 0.0) for w in lower])
+        negated = np.array([w in const.NEGATE or "n't" in w for w in lower])
+        is_never = np.array([u == "never" for u in uniques])
+        so_this = np.array([u in ("so", "this") for u in uniques])
+        is_least = np.array([w == "least" for w in lower])
+        at_very = np.array([w in ("at", "very") for w in lower])
+        is_kind = np.array([w == "kind" for w in lower])
+        is_of = np.array([w == "of" for w in lower])
+        is_but = np.array([w == "but" for w in lower])
+
+        # idioms and two-word boosters are matched case-sensitively, by word id
+        phrases = const.SPECIAL_CASE_IDIOMS
+        bigram_boosters = [k for k in const.BOOSTER_DICT if " " in k]
+        vocab = {w: n for n, w in enumerate(sorted({w for k in list(phrases) + bigram_boosters for w in k.split()}))}
+        word_id = np.array([vocab.get(u, -1) for u in uniques])
+
+        caps = np.bincount(doc, weights=upper[tok], minlength=n_docs)
+        cap_diff = ((lengths - caps) > 0) & ((lengths - caps) < lengths)
+
+        # a repeated token is scored in the context of its first occurrence
+        _, first, inverse = np.unique(doc * len(uniques) + tok, return_index=True, return_inverse=True)
+        src = first[inverse]
+
+        # boosters and the "kind" of "kind of" score 0 even if in the lexicon
+        following = tok[np.minimum(np.arange(n_tokens) + 1, n_tokens - 1)]
+        skip = is_booster[tok] | (is_kind[tok] & (pos < n_of - 1) & is_of[following])
+        i = np.flatnonzero((src == np.arange(n_tokens)) & in_lex[tok] & ~skip)
+
+        p, cd = pos[i], cap_diff[doc[i]]
+
+        def at(offset: int) -> np.ndarray:
+            return tok[np.clip(i + offset, 0, n_tokens - 1)]
+
+        def phrase(offsets: Sequence[int], words: Sequence[str]) -> np.ndarray:
+            if len(offsets) != len(words) or any(w not in vocab for w in words):
+                return np.zeros(len(i), dtype=bool)
+            return np.logical_and.reduce([word_id[at(o)] == vocab[w] for o, w in zip(offsets, words)])
+
+        v = valence[tok[i]]
+        v = np.where(upper[tok[i]] & cd, np.where(v > 0, v + const.C_INCR, v - const.C_INCR), v)
+        for start_i in range(3):
+            k = start_i + 1
+            prev = at(-k)
+            cond = (p > start_i) & ~in_lex[prev]
+
+            s = np.where(v < 0, -booster[prev], booster[prev])
+            s = np.where(is_booster[prev] & upper[prev] & cd,
+                         np.where(v > 0, s + const.C_INCR, s - const.C_INCR), s)
+            if start_i == 1:
+                s = np.where(s != 0, s * 0.95, s)
+            if start_i == 2:
+                s = np.where(s != 0, s * 0.9, s)
+            new = v + s
+
+            # _never_check
+            if start_i == 0:
+                new = np.where(negated[at(-1)], new * const.N_SCALAR, new)
+            elif start_i == 1:
+                emphasis = is_never[at(-2)] & so_this[at(-1)]
+                new = np.where(emphasis, new * 1.5, np.where(negated[at(-2)], new * const.N_SCALAR, new))
+            else:
+                emphasis = (is_never[at(-3)] & so_this[at(-2)]) | so_this[at(-1)]
+                new = np.where(emphasis, new * 1.25, np.where(negated[at(-3)], new * const.N_SCALAR, new))
+
+            # _idioms_check: the first matching preceding sequence wins, then
+            # sequences starting at the word override it
+            if start_i == 2:
+                matched = np.zeros(len(i), dtype=bool)
+                for offsets in ((-1, 0), (-2, -1, 0), (-2, -1), (-3, -2, -1), (-3, -2)):
+                    for idiom, value in phrases.items():
+                        hit = ~matched & phrase(offsets, idiom.split())
+                        new = np.where(hit, value, new)
+                        matched |= hit
+                for offsets, room in (((0, 1), 1), ((0, 1, 2), 2)):
+                    for idiom, value in phrases.items():
+                        new = np.where((p < n_of[i] - room) & phrase(offsets, idiom.split()), value, new)
+                bigram = np.zeros(len(i), dtype=bool)
+                for b in bigram_boosters:
+                    bigram |= phrase((-3, -2), b.split()) | phrase((-2, -1), b.split())
+                new = np.where(bigram, new + const.B_DECR, new)
+
+            v = np.where(cond, new, v)
+
+        # _least_check
+        prev = at(-1)
+        least = (p > 0) & ~in_lex[prev] & is_least[prev]
+        v = np.where(least & ((p == 1) | ~at_very[at(-2)]), v * const.N_SCALAR, v)
+
+        scored = np.zeros(n_tokens)
+        scored[i] = v
+        sentiment = scored[src]
+
+        # _but_check: halve words before the first "but", amplify words after
+        buts = np.flatnonzero(is_but[tok])
+        but_docs, first_but = np.unique(doc[buts], return_index=True)
+        but_pos = np.full(n_docs, -1)
+        but_pos[but_docs] = pos[buts[first_but]]
+        has_but = but_pos[doc] >= 0
+        sentiment = np.where(has_but & (pos < but_pos[doc]), sentiment * 0.5, sentiment)
+        sentiment = np.where(has_but & (pos > but_pos[doc]), sentiment * 1.5, sentiment)
+
+    nonzero = np.flatnonzero(sentiment)
+    sum_s = _python_sum(sentiment[nonzero], doc[nonzero], n_docs)
+
+    # _punctuation_emphasis
+    exclamations = np.minimum(np.fromiter((t.count("!") for t in texts), dtype=np.int64, count=n_docs), 4)
+    questions = np.fromiter((t.count("?") for t in texts), dtype=np.int64, count=n_docs)
+    amplifier = exclamations * 0.292 + np.where(questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0)
+    sum_s = np.where(sum_s > 0, sum_s + amplifier, np.where(sum_s < 0, sum_s - amplifier, sum_s))
+
+    compound = sum_s / np.sqrt(sum_s * sum_s + 15)
+    compound[lengths == 0] = 0.0
+    return _round(compound, 4)
@@ -0,0 +1,200 @@
+"""
+Shared concurrent HTTP engine for the NewsAPI, Reddit and Twitter fetchers.
+
+Includes:
+- Pooled requests.Session per source
+- Token-bucket rate limiting matched to each API's quota
+- Retries with exponential backoff, full jitter and Retry-After support
+- Cached OAuth tokens that refresh on expiry
+- Bounded thread-pool execution of per-day fetches
+
+All URLs are passed in by the caller, so the engine can be pointed at a local
+stub HTTP server in tests.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (requests per second, burst size) per source
+SOURCE_LIMITS = {
+    "newsapi": (1.0, 5),            # paid plans allow far more, keep polite by default
+    "reddit": (100 / 60, 10),       # 100 queries per minute per OAuth client
+    "twitter": (450 / 900, 5),      # 450 recent-search requests per 15 minutes (app auth)
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the request rate.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (int): Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a token is available and consumes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TokenCache:
+    """
+    Caches an access token and refreshes it shortly before it expires.
+
+    Args:
+        fetch_token (Callable[[], Tuple[str, float]]): Returns (token, expires_in seconds).
+        margin (float): Seconds before expiry at which the token is refreshed.
+    """
+
+    def __init__(self, fetch_token: Callable[[], Tuple[str, float]], margin: float = 60.0):
+        self.fetch_token = fetch_token
+        self.margin = margin
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        with self._lock:
+            if self._token is None or time.monotonic() >= self._expires_at - self.margin:
+                token, expires_in = self.fetch_token()
+                self._token = token
+                self._expires_at = time.monotonic() + float(expires_in)
+            return self._token
+
+    def invalidate(self):
+        """
+        Forces the next ``get`` to request a new token (e.g. after a 401).
+        """
+        with self._lock:
+            self._token = None
+
+
+class FetchEngine:
+    """
+    Pooled, rate-limited HTTP client with retries and bounded concurrency.
+
+    Args:
+        rate (float): Requests per second allowed by the API quota.
+        burst (int): Requests that may be sent back to back.
+        max_workers (int): Maximum concurrent requests.
+        max_retries (int): Retries for connection errors and retryable statuses.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_max (float): Upper bound on a single backoff delay.
+        timeout (float): Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 1,
+        max_workers: int = 4,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0
+    ):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def for_source(cls, source: str, max_workers: int = 4, **kwargs) -> "FetchEngine":
+        """
+        Builds an engine using the quota in ``SOURCE_LIMITS`` for a source.
+        """
+        rate, burst = SOURCE_LIMITS[source]
+        return cls(rate=rate, burst=burst, max_workers=max_workers, **kwargs)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        # full jitter: uniform in [0, min(max, base * 2**attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a rate-limited request, retrying transient failures.
+
+        Returns:
+            requests.Response: The final response. Non-retryable error
+            statuses are returned to the caller unchanged.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response))
+                continue
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def map(self, fn: Callable, items: Iterable) -> Iterator[Tuple[object, object, Optional[Exception]]]:
+        """
+        Runs ``fn`` over items with at most ``max_workers`` in flight.
+
+        Yields:
+            Tuple[object, object, Optional[Exception]]: (item, result, error)
+            in completion order. ``result`` is None when ``error`` is set.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
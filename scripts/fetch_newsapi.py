@@ -11,16 +11,19 @@ Includes:
 import os
 import requests
 import json
-from datetime import datetime, timedelta
 from typing import List
 
+from pipeline.manifest import date_range
+from scripts.fetch_engine import FetchEngine
+
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
 
 BASE_URL = "https://newsapi.org/v2/everything"
+SOURCE = "newsapi"
 SAVE_DIR = "data/raw/newsapi"
 os.makedirs(SAVE_DIR, exist_ok=True)
 
-def fetch_articles_for_day(query: str, date: str, page_size: int = 100) -> List[dict]:
+def fetch_articles_for_day(query: str, date: str, page_size: int = 100, engine: FetchEngine = None) -> List[dict]:
     """
     Fetches news articles for a specific query on a given date.
 
@@ -28,6 +31,7 @@ def fetch_articles_for_day(query: str, date: str, page_size: int = 100) -> List[
         query (str): Keyword or ticker to search for.
         date (str): Date in YYYY-MM-DD format.
         page_size (int): Number of articles per page (max 100).
+        engine (FetchEngine): Pooled, rate-limited client. Plain requests if None.
 
     Returns:
         List[dict]: List of news articles.
@@ -41,7 +45,7 @@ def fetch_articles_for_day(query: str, date: str, page_size: int = 100) -> List[
         "pageSize": page_size,
         "apiKey": NEWSAPI_KEY,
     }
-    response = requests.get(BASE_URL, params=params)
+    response = (engine or requests).get(BASE_URL, params=params)
     if response.status_code != 200:
         raise Exception(f"Failed to fetch articles: {response.status_code} {response.text}")
     data = response.json()
@@ -60,7 +64,8 @@ def save_articles(articles: List[dict], date: str, ticker: str):
     with open(filename, "w") as f:
         json.dump(articles, f, indent=2)
 
-def fetch_range(query: str, start_date: str, end_date: str):
+def fetch_range(query: str, start_date: str, end_date: str, manifest=None, refresh: bool = False,
+                engine: FetchEngine = None):
     """
     Fetches articles for a query from start_date to end_date (inclusive).
 
@@ -68,15 +73,34 @@ def fetch_range(query: str, start_date: str, end_date: str):
         query (str): Keyword or ticker.
         start_date (str): Start date in YYYY-MM-DD format.
         end_date (str): End date in YYYY-MM-DD format.
+        manifest (Optional[FetchManifest]): If given, only days missing from the
+            manifest are fetched and each outcome is recorded in it.
+        refresh (bool): Refetch every day even if the manifest has it.
+        engine (FetchEngine): Shared engine; days are fetched concurrently up to
+            its worker limit. A sequential engine is created if None.
     """
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if manifest is not None:
+        days = manifest.missing_days(SOURCE, query, start_date, end_date, refresh=refresh)
+    else:
+        days = date_range(start_date, end_date)
 
-    for delta in range((end - start).days + 1):
-        day = (start + timedelta(days=delta)).strftime("%Y-%m-%d")
+    def fetch_day(day):
         print(f"Fetching {query} articles for {day}...")
-        try:
-            articles = fetch_articles_for_day(query, day)
-            save_articles(articles, day, query)
-        except Exception as e:
-            print(f"Error on {day}: {e}")
\ No newline at end of file
+        articles = fetch_articles_for_day(query, day, engine=engine)
+        save_articles(articles, day, query)
+        return articles
+
+    owns_engine = engine is None
+    engine = engine or FetchEngine.for_source(SOURCE, max_workers=1)
+    try:
+        for day, articles, error in engine.map(fetch_day, days):
+            if error is not None:
+                print(f"Error on {day}: {error}")
+            if manifest is not None:
+                if error is None:
+                    manifest.record(SOURCE, query, day, len(articles))
+                else:
+                    manifest.record(SOURCE, query, day, status="failed")
+    finally:
+        if owns_engine:
+            engine.close()
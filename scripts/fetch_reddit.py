@@ -12,29 +12,43 @@ import os
 import json
 import requests
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Tuple
 from dotenv import load_dotenv
 
+from pipeline.manifest import date_range
+from scripts.fetch_engine import FetchEngine, TokenCache
+
 load_dotenv()
 
+SOURCE = "reddit"
 SAVE_DIR = "data/raw/reddit"
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
 USER_AGENT = "news-sentiment-script/0.1"
+TOKEN_URL = "https://www.reddit.com/api/v1/access_token"
+API_URL = "https://oauth.reddit.com"
 
-def get_access_token():
+def _request_access_token() -> Tuple[str, float]:
     auth = requests.auth.HTTPBasicAuth(CLIENT_ID, CLIENT_SECRET)
     data = {
         "grant_type": "client_credentials"
     }
     headers = {"User-Agent": USER_AGENT}
-    response = requests.post("https://www.reddit.com/api/v1/access_token", auth=auth, data=data, headers=headers)
+    response = requests.post(TOKEN_URL, auth=auth, data=data, headers=headers)
     response.raise_for_status()
-    return response.json()["access_token"]
+    payload = response.json()
+    return payload["access_token"], payload.get("expires_in", 3600)
+
+# one token per process, refreshed shortly before it expires
+_TOKEN_CACHE = TokenCache(_request_access_token)
 
-def fetch_posts_for_day(query: str, date: str, subreddit: str = "stocks", limit: int = 100) -> List[dict]:
+def get_access_token() -> str:
+    return _TOKEN_CACHE.get()
+
+def fetch_posts_for_day(query: str, date: str, subreddit: str = "stocks", limit: int = 100,
+                        engine: FetchEngine = None) -> List[dict]:
     """
     Fetches Reddit posts from a specific day using Reddit API.
 
@@ -43,17 +57,15 @@ def fetch_posts_for_day(query: str, date: str, subreddit: str = "stocks", limit:
         date (str): Date string (YYYY-MM-DD).
         subreddit (str): Subreddit to search in.
         limit (int): Maximum number of results to return.
+        engine (FetchEngine): Pooled, rate-limited client. Plain requests if None.
 
     Returns:
         List[dict]: List of Reddit post dicts.
     """
-    token = get_access_token()
-    headers = {"Authorization": f"bearer {token}", "User-Agent": USER_AGENT}
-
     after = int(datetime.strptime(date, "%Y-%m-%d").timestamp())
     before = int((datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).timestamp())
 
-    url = f"https://oauth.reddit.com/r/{subreddit}/search"
+    url = f"{API_URL}/r/{subreddit}/search"
     params = {
         "q": query,
         "sort": "top",
@@ -64,7 +76,14 @@ def fetch_posts_for_day(query: str, date: str, subreddit: str = "stocks", limit:
         "t": "day"
     }
 
-    response = requests.get(url, headers=headers, params=params)
+    http = engine or requests
+    headers = {"Authorization": f"bearer {get_access_token()}", "User-Agent": USER_AGENT}
+    response = http.get(url, headers=headers, params=params)
+    if response.status_code == 401:
+        # token revoked or expired early
+        _TOKEN_CACHE.invalidate()
+        headers["Authorization"] = f"bearer {get_access_token()}"
+        response = http.get(url, headers=headers, params=params)
     if response.status_code != 200:
         raise Exception(f"[Reddit API] Error: {response.status_code} - {response.text}")
 
@@ -84,7 +103,8 @@ def save_posts(posts: List[dict], date: str, query: str):
     with open(filename, "w") as f:
         json.dump(posts, f, indent=2)
 
-def fetch_range(query: str, start_date: str, end_date: str, subreddit: str = "stocks"):
+def fetch_range(query: str, start_date: str, end_date: str, subreddit: str = "stocks",
+                manifest=None, refresh: bool = False, engine: FetchEngine = None):
     """
     Fetches Reddit posts for a range of dates.
 
@@ -93,15 +113,34 @@ def fetch_range(query: str, start_date: str, end_date: str, subreddit: str = "st
         start_date (str): Start date (YYYY-MM-DD).
         end_date (str): End date (YYYY-MM-DD).
         subreddit (str): Subreddit to search in.
+        manifest (Optional[FetchManifest]): If given, only days missing from the
+            manifest are fetched and each outcome is recorded in it.
+        refresh (bool): Refetch every day even if the manifest has it.
+        engine (FetchEngine): Shared engine; days are fetched concurrently up to
+            its worker limit. A sequential engine is created if None.
     """
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if manifest is not None:
+        days = manifest.missing_days(SOURCE, query, start_date, end_date, refresh=refresh)
+    else:
+        days = date_range(start_date, end_date)
 
-    for delta in range((end - start).days + 1):
-        day = (start + timedelta(days=delta)).strftime("%Y-%m-%d")
+    def fetch_day(day):
         print(f"Fetching Reddit posts for {query} on {day}...")
-        try:
-            posts = fetch_posts_for_day(query, day, subreddit)
-            save_posts(posts, day, query)
-        except Exception as e:
-            print(f"Error fetching {day}: {e}")
\ No newline at end of file
+        posts = fetch_posts_for_day(query, day, subreddit, engine=engine)
+        save_posts(posts, day, query)
+        return posts
+
+    owns_engine = engine is None
+    engine = engine or FetchEngine.for_source(SOURCE, max_workers=1)
+    try:
+        for day, posts, error in engine.map(fetch_day, days):
+            if error is not None:
+                print(f"Error fetching {day}: {error}")
+            if manifest is not None:
+                if error is None:
+                    manifest.record(SOURCE, query, day, len(posts))
+                else:
+                    manifest.record(SOURCE, query, day, status="failed")
+    finally:
+        if owns_engine:
+            engine.close()
@@ -18,11 +18,33 @@ from datetime import datetime, timedelta
 from typing import List
 from dotenv import load_dotenv
 
+from pipeline.manifest import date_range
+from scripts.fetch_engine import FetchEngine
+
 load_dotenv()
 BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+SOURCE = "twitter"
+SEARCH_URL = "https://api.twitter.com/2/tweets/search/recent"
 SAVE_DIR = "data/raw/twitter"
 os.makedirs(SAVE_DIR, exist_ok=True)
 
+def _request_tweets(query: str, date: str, max_results: int = 100, engine: FetchEngine = None) -> List[dict]:
+    next_day = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
+    params = {
+        "query": query + " lang:en -is:retweet",
+        "start_time": f"{date}T00:00:00Z",
+        "end_time": f"{next_day}T00:00:00Z",
+        "max_results": min(max_results, 100),
+        "tweet.fields": "created_at,author_id,text"
+    }
+
+    response = (engine or requests).get(SEARCH_URL, headers=headers, params=params)
+    response.raise_for_status()
+    data = response.json()
+    return data.get("data", [])
+
 def fetch_tweets_for_day(query: str, date: str, max_results: int = 100) -> List[dict]:
     """
     Fetches tweets for a specific day using Twitter API v2 Recent Search endpoint.
@@ -35,23 +57,8 @@ def fetch_tweets_for_day(query: str, date: str, max_results: int = 100) -> List[
     Returns:
         List[dict]: List of tweet objects with created_at, text, and author_id fields.
     """
-    next_day = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
-    url = "https://api.twitter.com/2/tweets/search/recent"
-
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
-    params = {
-        "query": query + " lang:en -is:retweet",
-        "start_time": f"{date}T00:00:00Z",
-        "end_time": f"{next_day}T00:00:00Z",
-        "max_results": min(max_results, 100),
-        "tweet.fields": "created_at,author_id,text"
-    }
-
     try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
+        return _request_tweets(query, date, max_results)
     except requests.RequestException as e:
         print(f"[Twitter API] Error fetching {query} on {date}: {e}")
         return []
@@ -69,7 +76,8 @@ def save_tweets(tweets: List[dict], date: str, query: str):
     with open(filename, "w") as f:
         json.dump(tweets, f, indent=2)
 
-def fetch_range(query: str, start_date: str, end_date: str, max_tweets_per_day: int = 100):
+def fetch_range(query: str, start_date: str, end_date: str, max_tweets_per_day: int = 100,
+                manifest=None, refresh: bool = False, engine: FetchEngine = None):
     """
     Fetches tweets for a query across a date range and saves each day's results.
 
@@ -78,11 +86,35 @@ def fetch_range(query: str, start_date: str, end_date: str, max_tweets_per_day:
         start_date (str): Start date (YYYY-MM-DD).
         end_date (str): End date (YYYY-MM-DD).
         max_tweets_per_day (int): Max tweets to fetch per day.
+        manifest (Optional[FetchManifest]): If given, only days missing from the
+            manifest are fetched and each outcome is recorded in it.
+        refresh (bool): Refetch every day even if the manifest has it.
+        engine (FetchEngine): Shared engine; days are fetched concurrently up to
+            its worker limit. A sequential engine is created if None.
     """
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    for delta in range((end - start).days + 1):
-        day = (start + timedelta(days=delta)).strftime("%Y-%m-%d")
+    if manifest is not None:
+        days = manifest.missing_days(SOURCE, query, start_date, end_date, refresh=refresh)
+    else:
+        days = date_range(start_date, end_date)
+
+    def fetch_day(day):
         print(f"[Twitter API] Fetching {query} on {day}")
-        tweets = fetch_tweets_for_day(query, day, max_tweets_per_day)
-        save_tweets(tweets, day, query)
\ No newline at end of file
+        tweets = _request_tweets(query, day, max_tweets_per_day, engine=engine)
+        save_tweets(tweets, day, query)
+        return tweets
+
+    owns_engine = engine is None
+    engine = engine or FetchEngine.for_source(SOURCE, max_workers=1)
+    try:
+        for day, tweets, error in engine.map(fetch_day, days):
+            # on error, keep whatever is already on disk for this day
+            if error is not None:
+                print(f"[Twitter API] Error fetching {query} on {day}: {error}")
+            if manifest is not None:
+                if error is None:
+                    manifest.record(SOURCE, query, day, len(tweets))
+                else:
+                    manifest.record(SOURCE, query, day, status="failed")
+    finally:
+        if owns_engine:
+            engine.close()
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.backtest import walk_forward, walk_forward_splits
+
+
+@pytest.mark.parametrize("window", ["expanding", "rolling"])
+@pytest.mark.parametrize("embargo", [1, 3])
+def test_training_rows_stay_embargo_dates_before_test_rows(window, embargo):
+    # a panel: several tickers share each date, and a few dates are missing tickers
+    days = pd.bdate_range("2022-01-03", periods=120).to_numpy()
+    rng = np.random.default_rng(0)
+    dates = np.sort(np.repeat(days, rng.integers(1, 5, len(days))))
+    unique_dates = np.unique(dates)
+
+    folds = walk_forward_splits(dates, min_train=40, retrain_every=15, window=window, embargo=embargo)
+
+    assert folds
+    for train_start, train_stop, test_start, test_stop in folds:
+        last_train = np.searchsorted(unique_dates, dates[train_stop - 1])
+        first_test = np.searchsorted(unique_dates, dates[test_start])
+        # at least `embargo` distinct dates lie strictly between train and test
+        assert first_test - last_train - 1 >= embargo
+        assert not np.isin(dates[test_start:test_stop], dates[train_start:train_stop]).any()
+
+
+def test_walk_forward_rejects_embargo_below_horizon():
+    X, y = np.zeros((10, 2)), np.zeros(10)
+    dates = pd.bdate_range("2022-01-03", periods=10)
+    with pytest.raises(ValueError):
+        walk_forward(X, y, dates, horizon=5, embargo=1, min_train=2, retrain_every=2)
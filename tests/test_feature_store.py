@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import feature_store
+from pipeline.feature_store import load_features, panel_features
+from pipeline.features import build_panel_dataset
+
+
+def _sources(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2024-01-01", periods=n_days)
+    tickers = ["AAA", "BBB", "CCC"]
+    prices = pd.DataFrame(100 * np.exp(rng.normal(0, 0.01, (n_days, 3)).cumsum(axis=0)),
+                          index=days, columns=tickers)
+    # sparse news, so sentiment has to be forward-filled across the append boundary
+    rows = [(d, t, rng.normal()) for d in days for t in tickers if rng.random() < 0.3]
+    sentiment = pd.DataFrame(rows, columns=["date", "ticker", "sentiment"])
+    return prices, sentiment
+
+
+def _until(prices, sentiment, n_days):
+    end = prices.index[n_days - 1]
+    return prices.iloc[:n_days], sentiment[sentiment["date"] <= end]
+
+
+def _assert_same(actual, expected):
+    for got, want in zip(actual, expected):
+        np.testing.assert_array_equal(np.asarray(got), np.asarray(want))
+
+
+@pytest.mark.parametrize("fits", [True, False])
+def test_append_matches_a_fresh_build_and_keeps_earlier_versions(tmp_path, monkeypatch, fits):
+    prices, sentiment = _sources(90)
+    store = str(tmp_path)
+
+    first = panel_features(*_until(prices, sentiment, 60), lookback=5, horizon=1, store_root=store)
+    before = [np.array(a) for a in first.load()]
+
+    if not fits:
+        # force the header-fit fallback: every grown header is one byte too long
+        grown = feature_store._grown_header
+        monkeypatch.setattr(feature_store, "_grown_header",
+                            lambda path, rows: (grown(path, rows)[0] + b" ", grown(path, rows)[1]))
+    second = panel_features(prices, sentiment, lookback=5, horizon=1, store_root=store)
+
+    assert second.key == first.key and second.version == first.version + 1
+    generations = {v["version"]: v["generation"] for v in feature_store._load_meta(
+        os.path.join(store, first.key))["versions"]}
+    assert (generations[second.version] == generations[first.version]) == fits
+    _assert_same(second.load(), build_panel_dataset(prices, sentiment, lookback=5, horizon=1))
+    _assert_same(load_features(first.key, first.version, store), before)
@@ -0,0 +1,28 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from pipeline.online import IncrementalLinearRegression, update_online_model
+
+
+@pytest.mark.parametrize("name", ["online_model", "online_model.npz"])
+def test_daily_updates_match_a_full_refit(tmp_path, name):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X @ np.array([0.5, -1.0, 0.2, 0.0]) + 0.1 + rng.normal(0, 0.05, len(X))
+    path = str(tmp_path / name)
+
+    for day in np.array_split(np.arange(len(X)), 6):
+        model = update_online_model(path, X[day], y[day])
+
+    reference = LinearRegression().fit(X, y)
+    assert model.n_seen_ == len(X)
+    assert os.path.exists(str(tmp_path / "online_model.npz"))
+    np.testing.assert_allclose(model.coef_, reference.coef_, atol=1e-10)
+    assert model.intercept_ == pytest.approx(reference.intercept_, abs=1e-10)
+
+    reloaded = IncrementalLinearRegression.load(path)
+    assert reloaded.n_seen_ == len(X)
+    np.testing.assert_allclose(reloaded.predict(X), reference.predict(X), atol=1e-10)
@@ -0,0 +1,104 @@
+import json
+import os
+from datetime import date, timedelta
+
+from pipeline.streaming import DirectoryWatcher
+
+
+def _write_dump(raw_root, ticker, day, titles):
+    path = os.path.join(raw_root, "newsapi", f"{ticker}_{day}.json")
+    with open(path, "w") as f:
+        json.dump([{"publishedAt": f"{day}T09:00:00Z", "title": t, "description": "", "content": ""}
+                   for t in titles], f)
+    return path
+
+
+def test_evicted_files_are_not_resubmitted(tmp_path):
+    raw_root = str(tmp_path)
+    os.makedirs(os.path.join(raw_root, "newsapi"))
+    for k in range(5):
+        _write_dump(raw_root, "AAPL", f"2025-06-1{k}", [f"headline {k}"])
+
+    submitted = []
+    watcher = DirectoryWatcher(raw_root, submitted.extend, max_files=2)
+    watcher.prime()
+
+    assert watcher.poll() == 0
+    assert watcher.poll() == 0
+    assert submitted == []
+
+
+def test_new_items_in_a_rewritten_file_are_submitted(tmp_path):
+    raw_root = str(tmp_path)
+    os.makedirs(os.path.join(raw_root, "newsapi"))
+    path = _write_dump(raw_root, "AAPL", "2025-06-10", ["first"])
+
+    submitted = []
+    watcher = DirectoryWatcher(raw_root, submitted.extend)
+    watcher.prime()
+    _write_dump(raw_root, "AAPL", "2025-06-10", ["first", "second"])
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+    assert watcher.poll() == 1
+    assert [item["title"] for item in submitted] == ["second"]
+
+
+def _touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_rewritten_evicted_file_only_submits_new_items(tmp_path):
+    raw_root = str(tmp_path)
+    os.makedirs(os.path.join(raw_root, "newsapi"))
+    paths = [_write_dump(raw_root, "AAPL", f"2025-06-1{k}", [f"headline {k}", f"other {k}"]) for k in range(5)]
+
+    submitted = []
+    watcher = DirectoryWatcher(raw_root, submitted.extend, max_files=2)
+    watcher.prime()
+
+    # an evicted file comes back with one new item, reordered
+    k = next(k for k, path in enumerate(paths) if path not in watcher._seen)
+    _write_dump(raw_root, "AAPL", f"2025-06-1{k}", ["new", f"other {k}", f"headline {k}"])
+    _touch_later(paths[k])
+
+    assert watcher.poll() == 1
+    assert [item["title"] for item in submitted] == ["new"]
+
+
+def test_partially_written_file_is_retried_without_an_mtime_change(tmp_path):
+    raw_root = str(tmp_path)
+    os.makedirs(os.path.join(raw_root, "newsapi"))
+    path = os.path.join(raw_root, "newsapi", "AAPL_2025-06-10.json")
+    with open(path, "w") as f:
+        f.write('[{"title": "cut o')
+
+    submitted = []
+    watcher = DirectoryWatcher(raw_root, submitted.extend)
+    assert watcher.poll() == 0
+
+    mtime = os.stat(path).st_mtime_ns
+    _write_dump(raw_root, "AAPL", "2025-06-10", ["complete"])
+    os.utime(path, ns=(mtime, mtime))
+
+    assert watcher.poll() == 1
+    assert [item["title"] for item in submitted] == ["complete"]
+
+
+def test_state_of_deleted_and_aged_out_files_is_dropped(tmp_path):
+    raw_root = str(tmp_path)
+    os.makedirs(os.path.join(raw_root, "newsapi"))
+    today = date.today()
+    recent = _write_dump(raw_root, "AAPL", today.isoformat(), ["recent"])
+    gone = _write_dump(raw_root, "AAPL", (today - timedelta(days=1)).isoformat(), ["gone"])
+    _write_dump(raw_root, "AAPL", (today - timedelta(days=30)).isoformat(), ["old"])
+
+    submitted = []
+    watcher = DirectoryWatcher(raw_root, submitted.extend, max_files=1, max_age_days=7)
+    assert watcher.poll() == 2
+
+    os.remove(gone)
+    watcher.poll()
+
+    assert set(watcher._mtimes) == {recent}
+    assert set(watcher._seen) | set(watcher._compacted) == {recent}